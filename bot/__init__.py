@@ -1,3 +1,4 @@
 from .rate_limiter import limiter  # API sınırı için yama uygulanır
+from . import exchange_info  # get_symbol_info bellekten yanıtlanır
 
 __all__ = ["limiter"]
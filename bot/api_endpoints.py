@@ -0,0 +1,126 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Gecikmeye gore secilecek REST taban adresleri (sadece mainnet icin gecerlidir)
+API_ENDPOINTS = [
+    u.strip().rstrip("/")
+    for u in os.getenv(
+        "API_ENDPOINTS",
+        "https://api.binance.com,https://api1.binance.com,https://api2.binance.com,"
+        "https://api3.binance.com,https://api4.binance.com",
+    ).split(",")
+    if u.strip()
+]
+# Karar yolundaki GET istekleri p95 gecikmeyi asinca ikinci adrese yedek istek gonderilsin mi
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+# Yedek istek gonderilebilecek imzasiz ve hafif uc noktalar (/api/ sonrasi yol)
+HEDGE_PATHS = {
+    "v3/ticker/price",
+    "v3/ticker/bookTicker",
+    "v3/avgPrice",
+    "v3/klines",
+    "v3/uiKlines",
+    "v3/depth",
+}
+# Yedek istek gondermeden once en az beklenecek sure (saniye)
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+# Hata alan adresin tekrar secilmeden once dinlendirilecegi sure (saniye)
+ENDPOINT_COOLDOWN = float(os.getenv("ENDPOINT_COOLDOWN", "30"))
+
+_SAMPLES = 50
+_MIN_SAMPLES = 20
+_ALPHA = 0.2
+
+
+class EndpointStats:
+    """Tek taban adresin gecikme ornekleri ve saglik durumu."""
+
+    __slots__ = ("base", "ewma", "samples", "failures", "down_until", "requests")
+
+    def __init__(self, base: str):
+        self.base = base
+        self.ewma: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=_SAMPLES)
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class EndpointRouter:
+    """REST isteklerini en hizli saglikli taban adrese yonlendir.
+
+    Her adresin gecikmesi ustel hareketli ortalama ile izlenir; hic
+    denenmemis adresler once secilir ki olculebilsin. Bozulma hatasi veren
+    adres ``cooldown`` saniye boyunca secilmez.
+    """
+
+    def __init__(self, bases: List[str], cooldown: float = ENDPOINT_COOLDOWN):
+        self.endpoints: Dict[str, EndpointStats] = {b: EndpointStats(b) for b in bases}
+        self.cooldown = cooldown
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.order_retries = 0
+
+    def base_of(self, uri: str) -> Optional[str]:
+        """Adres yonlendirilen tabanlardan biriyle basliyorsa o tabani dondur."""
+        for base in self.endpoints:
+            if uri.startswith(base + "/"):
+                return base
+        return None
+
+    @staticmethod
+    def rewrite(uri: str, old: str, new: str) -> str:
+        return new + uri[len(old):]
+
+    def ranked(self, now: Optional[float] = None) -> List[str]:
+        """Saglikli adresler once, her grup kendi icinde gecikmeye gore sirali."""
+        now = time.monotonic() if now is None else now
+
+        def key(stats: EndpointStats):
+            return (stats.down_until > now, stats.ewma if stats.ewma is not None else -1.0)
+
+        return [s.base for s in sorted(self.endpoints.values(), key=key)]
+
+    def pick(self) -> str:
+        return self.ranked()[0]
+
+    def hedge_delay(self, base: str) -> Optional[float]:
+        """Yedek istek icin bekleme suresi; yeterli ornek yoksa None."""
+        if not HEDGE_ENABLED or len(self.endpoints) < 2:
+            return None
+        p95 = self.endpoints[base].p95()
+        if p95 is None:
+            return None
+        return max(p95, HEDGE_MIN_DELAY)
+
+    def record(self, base: str, latency: float) -> None:
+        stats = self.endpoints[base]
+        stats.requests += 1
+        stats.samples.append(latency)
+        stats.ewma = latency if stats.ewma is None else stats.ewma + _ALPHA * (latency - stats.ewma)
+        stats.failures = 0
+
+    def fail(self, base: str, now: Optional[float] = None) -> None:
+        stats = self.endpoints[base]
+        stats.requests += 1
+        stats.failures += 1
+        stats.down_until = (time.monotonic() if now is None else now) + self.cooldown
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            base: {
+                "ewma": s.ewma,
+                "p95": s.p95(),
+                "failures": s.failures,
+                "requests": s.requests,
+            }
+            for base, s in self.endpoints.items()
+        }
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+# Kullanıcı akışı canlıyken hesabın REST ile yeniden eşitlenme aralığı (saniye)
+BALANCE_RECONCILE_SECONDS = float(os.getenv("BALANCE_RECONCILE_SECONDS", "900"))
+
+
+class BalanceBook:
+    """Kullanıcı akışı olaylarıyla güncel tutulan bakiye defteri.
+
+    Defter bir kez ``get_account`` ile doldurulur, sonrasında
+    ``outboundAccountPosition`` ve ``balanceUpdate`` olaylarıyla güncellenir.
+    Akış bağlı değilken ya da bir varlık için emir dolduğu halde hesap olayı
+    henüz gelmediyse istekler REST API'ye yönlendirilir.
+    """
+
+    def __init__(self, client, reconcile_seconds: float = BALANCE_RECONCILE_SECONDS):
+        self.client = client
+        self.reconcile_seconds = reconcile_seconds
+        self.balances: Dict[str, Tuple[float, float]] = {}
+        self._updated: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self.live = False
+        self.seeded_at = 0.0
+        self._seeding: Optional[asyncio.Task] = None
+        # Eşitleme sürerken gelen olaylar; görüntü yazıldıktan sonra yeniden uygulanır
+        self._during_seed: Optional[List[dict]] = None
+        self._stale_during_seed: Set[str] = set()
+        self.hits = 0
+        self.rest_calls = 0
+
+    def _store(self, account: dict) -> None:
+        self.balances = {
+            b["asset"]: (float(b.get("free", 0)), float(b.get("locked", 0)))
+            for b in account.get("balances", [])
+        }
+        self._updated = {}
+        self._stale.clear()
+        self.seeded_at = time.monotonic()
+
+    async def _fetch_account(self) -> dict:
+        self.rest_calls += 1
+        self._during_seed = []
+        self._stale_during_seed = set()
+        try:
+            account = await self.client.get_account()
+        finally:
+            pending, self._during_seed = self._during_seed, None
+        self._store(account)
+        # İstek uçuştayken gelen olaylar görüntüden yeni olabilir; üzerine yazılmasın
+        taken = int(account.get("updateTime", 0))
+        for msg in pending:
+            if _event_stamp(msg) > taken:
+                self._apply(msg)
+        self._stale.update(self._stale_during_seed)
+        self._stale_during_seed = set()
+        return account
+
+    async def seed(self) -> dict:
+        """Hesabı REST ile çekip defteri baştan doldur; eşzamanlı çağrılar birleşir."""
+        task = self._seeding
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch_account())
+            self._seeding = task
+        return await asyncio.shield(task)
+
+    def set_live(self, live: bool) -> None:
+        """Kullanıcı akışı bağlantı durumunu bildir."""
+        self.live = live
+
+    async def _fresh(self) -> bool:
+        """Akış canlıysa defteri gerekirse eşitleyip kullanılabilir olduğunu bildir."""
+        if not self.live:
+            return False
+        if not self.seeded_at or time.monotonic() - self.seeded_at >= self.reconcile_seconds:
+            await self.seed()
+        return True
+
+    def mark_stale(self, *assets: str) -> None:
+        """Emri dolan varlıkların bakiyesi hesap olayı gelene kadar REST'ten okunur."""
+        assets = [a for a in assets if a]
+        self._stale.update(assets)
+        if self._during_seed is not None:
+            self._stale_during_seed.update(assets)
+
+    def apply(self, msg: dict) -> bool:
+        """Hesap olayını deftere işle; bakiye olayı değilse False dön."""
+        handled = self._apply(msg)
+        if handled and self._during_seed is not None:
+            self._during_seed.append(msg)
+        return handled
+
+    def _apply(self, msg: dict) -> bool:
+        event = msg.get("e")
+        if event == "outboundAccountPosition":
+            stamp = int(msg.get("u", msg.get("E", 0)))
+            for item in msg.get("B", []):
+                asset = item["a"]
+                self.balances[asset] = (float(item["f"]), float(item["l"]))
+                self._updated[asset] = stamp
+                self._stale.discard(asset)
+            return True
+        if event == "balanceUpdate":
+            asset = msg["a"]
+            # Aynı değişikliği içeren hesap olayı zaten işlendiyse tekrar ekleme
+            if int(msg.get("T", 0)) <= self._updated.get(asset, -1):
+                return True
+            free, locked = self.balances.get(asset, (0.0, 0.0))
+            self.balances[asset] = (free + float(msg["d"]), locked)
+            self._updated[asset] = int(msg.get("T", 0))
+            return True
+        return False
+
+    async def get_asset_balance(self, asset: str) -> dict:
+        """``AsyncClient.get_asset_balance`` ile aynı biçimde bakiye döndür."""
+        if await self._fresh() and asset not in self._stale:
+            self.hits += 1
+            free, locked = self.balances.get(asset, (0.0, 0.0))
+            return {"asset": asset, "free": f"{free:.8f}", "locked": f"{locked:.8f}"}
+        self.rest_calls += 1
+        return await self.client.get_asset_balance(asset=asset)
+
+    async def get_account(self) -> dict:
+        """``AsyncClient.get_account`` ile aynı biçimde hesap döndür."""
+        if await self._fresh() and not self._stale:
+            self.hits += 1
+            return {
+                "balances": [
+                    {"asset": a, "free": f"{f:.8f}", "locked": f"{l:.8f}"}
+                    for a, (f, l) in self.balances.items()
+                ]
+            }
+        return await self.seed()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "rest_calls": self.rest_calls}
+
+
+def _event_stamp(msg: dict) -> int:
+    """Olayın hesap güncelleme zamanı (ms); ``get_account`` ``updateTime`` ile karşılaştırılır."""
+    if msg.get("e") == "outboundAccountPosition":
+        return int(msg.get("u", msg.get("E", 0)))
+    return int(msg.get("T", msg.get("E", 0)))
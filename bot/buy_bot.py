@@ -13,14 +13,15 @@ except Exception:  # pragma: no cover - talib is optional in tests
     talib = None
 
 from binance import AsyncClient
+from bot.balance_book import BalanceBook
+from bot.rate_limiter import PRIORITY_BACKGROUND, concurrency, prioritized
 from bot.utils import (
     FifoTracker,
-    extract_min_notional,
     extract_min_qty,
-    extract_max_qty,
     log,
     floor_to_precision,
     seconds_until_next_six_hour,
+    symbol_filters,
     load_env,
 )
 from bot.messages import t
@@ -224,8 +225,10 @@ def meets_rsi_keltner(highs, lows, closes):
 
 
 class BuyBot:
-    def __init__(self, client: AsyncClient):
+    def __init__(self, client: AsyncClient, balances: Optional[BalanceBook] = None):
         self.client = client
+        # SellBot ile birlikte çalışırken kullanıcı akışıyla güncellenen defter paylaşılır
+        self.balances = balances or BalanceBook(client)
         self.api_down = False
         self.current_ip = None
         self.db = sqlite3.connect(BUY_DB_PATH, check_same_thread=False)
@@ -384,6 +387,7 @@ class BuyBot:
             await self.check_api()
             await asyncio.sleep(60)
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def update_top_symbols(self):
         """USDT hacmi en yüksek sembolleri belirle."""
         try:
@@ -447,6 +451,7 @@ class BuyBot:
             await self.update_top_symbols()
         return list(self.top_symbols)
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def select_rsi_keltner(self):
         """Yeni RSI-Keltner stratejisini saglayan ilk sembol."""
         symbols = await self.fetch_symbols()
@@ -480,6 +485,7 @@ class BuyBot:
         except Exception:
             return False
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def fetch_all_trades(self, symbol: str):
         """Tüm geçmiş işlemleri baştan sona sayfalayarak getir."""
         all_trades = []
@@ -501,22 +507,21 @@ class BuyBot:
             await asyncio.sleep(0.2)
         return all_trades
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def select_losers(self):
         """Zarardaki tüm pozisyonları kayıp miktarına göre sırala."""
         try:
-            account = await self.client.get_account()
+            account = await self.balances.get_account()
         except Exception:
             return None
 
-        sem = asyncio.Semaphore(5)
-
         async def handle_balance(bal):
             asset = bal.get("asset")
             qty = float(bal.get("free", 0)) + float(bal.get("locked", 0))
             if asset in ("USDT", "BUSD") or qty <= 0:
                 return None
             symbol = f"{asset}USDT"
-            async with sem:
+            async with concurrency:
                 try:
                     info, ticker = await asyncio.gather(
                         self.client.get_symbol_info(symbol),
@@ -608,21 +613,25 @@ class BuyBot:
                         return False
         except Exception:
             pass
-        min_notional = max(extract_min_notional(info), 5)
+        filters = symbol_filters(info)
+        min_notional = max(filters.min_notional, 5)
         if not check_loss:
             min_notional = max(min_notional, MIN_FOLLOW_NOTIONAL)
-        max_qty = extract_max_qty(info)
+        max_qty = filters.max_qty
         notional = usdt_amount
         if notional / price > max_qty:
             log(f"{symbol} maxQty {max_qty} ile sinirlandi")
             notional = max_qty * price
+        if notional > filters.market_max_notional:
+            log(f"{symbol} maxNotional {filters.market_max_notional} ile sinirlandi")
+            notional = filters.market_max_notional
         if notional < min_notional:
             reason = "miktar yetersiz"
             self.last_skip_reason = reason
             log(f"{symbol} icin {reason}")
             return False
         try:
-            bal = await self.client.get_asset_balance(asset="USDT")
+            bal = await self.balances.get_asset_balance(asset="USDT")
             available = float(bal.get("free", 0))
         except Exception:
             available = 0.0
@@ -718,7 +727,7 @@ class BuyBot:
         self._cleanup_recent_sells()
         await self.sync_time()
         try:
-            balance = await self.client.get_asset_balance(asset="USDT")
+            balance = await self.balances.get_asset_balance(asset="USDT")
             usdt = float(balance.get("free", 0))
         except Exception:
             usdt = 0.0
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from binance.exceptions import BinanceAPIException
+
+from bot.utils import backoff_delay, log
+
+# Art arda bu kadar hata alinan uc nokta ailesi icin devre acilir
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+# Devre acik kalma suresinin tabani ve ust siniri (saniye); her acilista iki katina cikar
+BREAKER_BASE_SECONDS = float(os.getenv("BREAKER_BASE_SECONDS", "2"))
+BREAKER_MAX_SECONDS = float(os.getenv("BREAKER_MAX_SECONDS", "120"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Sunucu tarafi bozulma sayilan Binance hata kodlari (bilinmeyen hata, zaman asimi, limit)
+_DEGRADED_CODES = {-1000, -1001, -1003, -1006, -1007, -1008}
+
+
+class CircuitOpenError(ConnectionError):
+    """Devre acikken istek gonderilmeden reddedildi."""
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(f"{family} istekleri gecici olarak durduruldu ({retry_in:.1f}s)")
+        self.family = family
+        self.retry_in = retry_in
+
+
+def is_degraded(exc: BaseException) -> bool:
+    """Hata API'nin bozulduguna mi isaret ediyor (is kurali hatalari sayilmaz)."""
+    if isinstance(exc, BinanceAPIException):
+        return exc.status_code >= 500 or exc.status_code in (418, 429) or exc.code in _DEGRADED_CODES
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError))
+
+
+def endpoint_family(uri: str) -> str:
+    """Devre kesicinin izledigi uc nokta ailesi: order, account ya da market."""
+    path = uri.split("?", 1)[0]
+    if "/api/" not in path:
+        return "sapi"
+    path = path.split("/api/", 1)[1]
+    if path.startswith(("v3/order", "v3/openOrders", "v3/allOrders")):
+        return "order"
+    if path.startswith(("v3/account", "v3/myTrades", "v3/userDataStream")):
+        return "account"
+    return "market"
+
+
+class CircuitBreaker:
+    """Tek uc nokta ailesinin kapali / acik / yari acik durum makinesi.
+
+    Kapaliyken art arda ``failures`` hata gorulunce devre acilir ve rastgele
+    yayilan ustel bir sure boyunca istekler gonderilmeden reddedilir. Sure
+    dolunca tek bir deneme istegine izin verilir (yari acik); basariliysa
+    devre kapanir, degilse daha uzun bir sure icin yeniden acilir.
+    """
+
+    def __init__(
+        self,
+        family: str,
+        failures: int = BREAKER_FAILURES,
+        base: float = BREAKER_BASE_SECONDS,
+        maximum: float = BREAKER_MAX_SECONDS,
+    ):
+        self.family = family
+        self.failure_limit = failures
+        self.base = base
+        self.maximum = maximum
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.rejected = 0
+
+    def retry_in(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return max(self.open_until - now, 0.0)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Istek gonderilebilir mi; yari acik durumda sadece ilk deneme gecer."""
+        now = time.monotonic() if now is None else now
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self.probing = False
+            log(f"{self.family} devre kesici yarı açık, deneme isteği gönderiliyor")
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def reject(self) -> CircuitOpenError:
+        self.rejected += 1
+        return CircuitOpenError(self.family, self.retry_in())
+
+    def success(self) -> None:
+        """Istek yanit aldi (is kurali hatasi da olsa API calisiyor)."""
+        if self.state != CLOSED:
+            log(f"{self.family} devre kesici kapandı")
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.probing = False
+
+    def failure(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state == CLOSED and self.failures < self.failure_limit:
+            return
+        self.trips += 1
+        delay = backoff_delay(self.trips, base=self.base, maximum=self.maximum)
+        self.state = OPEN
+        self.open_until = now + delay
+        self.probing = False
+        log(f"{self.family} devre kesici açıldı ({self.failures} hata), {delay:.1f}s sonra denenecek")
+
+    def abandon(self) -> None:
+        """Deneme istegi iptal edildi; sonraki istek yeniden denesin."""
+        self.probing = False
+
+
+class BreakerBoard:
+    """Uc nokta ailesi basina devre kesiciler."""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        breaker = self.breakers.get(family)
+        if breaker is None:
+            breaker = self.breakers[family] = CircuitBreaker(family, **self._kwargs)
+        return breaker
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "state": b.state,
+                "failures": b.failures,
+                "trips": b.trips,
+                "rejected": b.rejected,
+                "retry_in": b.retry_in(),
+            }
+            for name, b in self.breakers.items()
+        }
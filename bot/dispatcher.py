@@ -0,0 +1,229 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from bot.utils import log
+
+# Websocket fiyatlarini degerlendiren sabit is parcacigi sayisi
+TICK_WORKERS = int(os.getenv("TICK_WORKERS", "4"))
+
+TickHandler = Callable[[str, float], Awaitable[None]]
+
+
+class TickDispatcher:
+    """Her sembol icin sadece en guncel fiyati degerlendiren is havuzu.
+
+    Gelen fiyat sembolun "son fiyat" yuvasina yazilir. Sembol zaten kuyrukta
+    ise eski fiyatin uzerine yazilir ve kuyruk buyumez; boylece yavas bir
+    REST cagrisi diger sembollerin akisini bekletmez.
+    """
+
+    def __init__(self, handler: TickHandler, workers: int = TICK_WORKERS):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._latest: Dict[str, Tuple[float, float]] = {}
+        self._busy: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.last_queue_age = 0.0
+        self.max_queue_age = 0.0
+        self.max_latency = 0.0
+
+    def _ensure_workers(self) -> None:
+        """Calisan event loop'a bagli kuyrugu ve iscileri hazirla."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = []
+            self._busy.clear()
+            for symbol in self._latest:
+                self._queue.put_nowait(symbol)
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, symbol: str, price: float) -> None:
+        """Yeni fiyati yuvaya yaz; gerekirse sembolu kuyruga al."""
+        self._ensure_workers()
+        self.received += 1
+        pending = self._latest.get(symbol)
+        if pending is not None:
+            self.coalesced += 1
+            self._latest[symbol] = (price, pending[1])
+            return
+        self._latest[symbol] = (price, time.monotonic())
+        if symbol not in self._busy:
+            self._queue.put_nowait(symbol)
+
+    def discard(self, symbol: str) -> None:
+        """Takipten cikan sembolun bekleyen fiyatini at."""
+        if self._latest.pop(symbol, None) is not None:
+            self.dropped += 1
+
+    def pending(self) -> List[str]:
+        """Degerlendirme bekleyen semboller."""
+        return list(self._latest)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+            "pending": len(self._latest),
+            "last_queue_age": self.last_queue_age,
+            "max_queue_age": self.max_queue_age,
+            "max_latency": self.max_latency,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            symbol = await self._queue.get()
+            slot = self._latest.pop(symbol, None)
+            if slot is None:
+                continue
+            price, since = slot
+            age = time.monotonic() - since
+            self.last_queue_age = age
+            self.max_queue_age = max(self.max_queue_age, age)
+            self._busy.add(symbol)
+            try:
+                await self.handler(symbol, price)
+            except Exception as exc:
+                log(f"{symbol} fiyat degerlendirme hatasi: {exc}")
+            finally:
+                self._busy.discard(symbol)
+                self.evaluated += 1
+                self.max_latency = max(self.max_latency, time.monotonic() - since)
+                if symbol in self._latest:
+                    self._queue.put_nowait(symbol)
+
+    async def stop(self) -> None:
+        """Iscileri durdur."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+# Kullanici akisi olaylarini isleyen is parcacigi sayisi
+EVENT_WORKERS = int(os.getenv("EVENT_WORKERS", "4"))
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+
+class OrderedEventQueue:
+    """Ayni anahtarin olaylarini sirayla, farkli anahtarlari paralel isleyen kuyruk.
+
+    Bir sembolun olaylari ayni anda tek bir iscide islenir; boylece dolum
+    sirasi korunurken yavas bir REST zenginlestirmesi diger sembolleri ve
+    websocket okumasini bekletmez.
+    """
+
+    def __init__(self, handler: EventHandler, workers: int = EVENT_WORKERS):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._pending: Dict[str, Deque[Tuple[dict, float]]] = {}
+        self._depth = 0
+        self._ready: Optional[asyncio.Queue] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._ready is None or self._loop is not loop:
+            self._loop = loop
+            self._ready = asyncio.Queue()
+            self._idle = asyncio.Event()
+            self._tasks = []
+            for key in self._pending:
+                self._ready.put_nowait(key)
+        if not self._depth:
+            self._idle.set()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, key: str, event: dict) -> None:
+        """Olayi anahtarinin kuyruguna ekle."""
+        self._ensure_workers()
+        queue = self._pending.get(key)
+        if queue is None:
+            queue = self._pending[key] = deque()
+            self._ready.put_nowait(key)
+        queue.append((event, time.monotonic()))
+        self._depth += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._idle.clear()
+
+    def depth(self) -> int:
+        """Islenmeyi bekleyen olay sayisi."""
+        return self._depth
+
+    async def join(self) -> None:
+        """Kuyruktaki tum olaylar islenene kadar bekle."""
+        if not self._depth:
+            return
+        self._ensure_workers()
+        await self._idle.wait()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "processed": self.processed,
+            "depth": self._depth,
+            "max_depth": self.max_depth,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            queue = self._pending.get(key)
+            if not queue:
+                self._pending.pop(key, None)
+                continue
+            event, since = queue.popleft()
+            try:
+                await self.handler(event)
+            except Exception as exc:
+                log(f"{key} olay isleme hatasi: {exc}")
+            finally:
+                self._depth -= 1
+                self.processed += 1
+                self.last_latency = time.monotonic() - since
+                self.max_latency = max(self.max_latency, self.last_latency)
+                if queue:
+                    self._ready.put_nowait(key)
+                else:
+                    self._pending.pop(key, None)
+                if not self._depth:
+                    self._idle.set()
+
+    async def stop(self) -> None:
+        """Iscileri durdur."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
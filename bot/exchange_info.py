@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from bot.rate_limiter import PRIORITY_BACKGROUND, SharedPriority, response_cache, shared_priority
+from bot.utils import detached_task, log
+
+# Sembol bilgilerinin hizli yeniden baslatma icin saklandigi dosya; varsayilan
+# olarak diger calisma durumu gibi alim veritabaninin yaninda tutulur
+EXCHANGE_INFO_PATH = os.getenv("EXCHANGE_INFO_PATH") or os.path.join(
+    os.path.dirname(os.getenv("BUY_DB_PATH", "buy.db")), "exchange_info.json"
+)
+# exchangeInfo'nun yenilenme araligi (saniye)
+EXCHANGE_INFO_REFRESH = float(os.getenv("EXCHANGE_INFO_REFRESH", "21600"))
+
+
+class ExchangeInfoCache:
+    """``exchangeInfo`` yanitini bellekte ve diskte tutan sembol sozlugu.
+
+    Ilk kullanimda diskten, dosya yoksa ya da suresi gectiyse REST'ten
+    yuklenir. Suresi gecen veri arka planda yenilenirken eskisi kullanilmaya
+    devam eder; filtre hatasi (-1013) alindiginda ise bir sonraki sorgu
+    yenilemeyi bekler. Es zamanli yenilemeler tek istekte birlesir.
+    """
+
+    def __init__(self, client, path: str = EXCHANGE_INFO_PATH, refresh_seconds: float = EXCHANGE_INFO_REFRESH):
+        self.client = client
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.symbols: Dict[str, dict] = {}
+        self.filters: Dict[str, Dict[str, dict]] = {}
+        self.loaded_at = 0.0
+        self._invalid = False
+        self._disk_checked = False
+        self._refreshing: Optional[asyncio.Task] = None
+        self._refresh_priority: Optional[SharedPriority] = None
+        self.hits = 0
+        self.refreshes = 0
+
+    def _index(self, symbols, loaded_at: float) -> None:
+        self.symbols = {s["symbol"]: s for s in symbols}
+        self.filters = {
+            name: {f["filterType"]: f for f in s.get("filters", [])}
+            for name, s in self.symbols.items()
+        }
+        self.loaded_at = loaded_at
+
+    def _expired(self) -> bool:
+        return time.time() - self.loaded_at >= self.refresh_seconds
+
+    def load_from_disk(self) -> bool:
+        """Diskteki kopyayi yukle; dosya yoksa ya da bozuksa False."""
+        self._disk_checked = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            self._index(data["symbols"], float(data["saved_at"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def _save(self, payload: dict) -> None:
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            log(f"Sembol bilgileri diske yazılamadı: {exc}")
+
+    async def _fetch(self, shared: SharedPriority) -> None:
+        # Önbellekteki eski exchangeInfo yanıtı yenilemeyi boşa çıkarmasın
+        response_cache.invalidate("v3/exchangeInfo")
+        with shared_priority(shared):
+            info = await self.client.get_exchange_info()
+        now = time.time()
+        self._index(info.get("symbols", []), now)
+        self._invalid = False
+        self.refreshes += 1
+        payload = {"saved_at": now, "symbols": info.get("symbols", [])}
+        if self.path:
+            await asyncio.get_running_loop().run_in_executor(None, self._save, payload)
+
+    def _start(self, shared: SharedPriority) -> asyncio.Task:
+        self._refresh_priority = shared
+        self._refreshing = detached_task(self._fetch(shared))
+        return self._refreshing
+
+    async def refresh(self) -> None:
+        """exchangeInfo'yu REST'ten yeniden al; es zamanli cagrilar birlesir.
+
+        Yenilemeyi bekleyen cagiranin onceligi yenileme istegine tasinir;
+        arka planda baslamis bir yenileme bu sayede one alinir.
+        """
+        caller = SharedPriority.for_caller()
+        task = self._refreshing
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._start(caller)
+        elif self._refresh_priority is not None:
+            self._refresh_priority.merge(caller)
+        await asyncio.shield(task)
+
+    def invalidate(self) -> None:
+        """Filtreler degismis olabilir; sonraki sorgu guncel veriyi beklesin."""
+        self._invalid = True
+
+    async def _ensure(self) -> None:
+        if not self.symbols and not self._disk_checked and self.path:
+            self.load_from_disk()
+        if not self.symbols or self._invalid:
+            await self.refresh()
+        elif self._expired():
+            task = self._refreshing
+            if task is None or task.done():
+                self._start(SharedPriority(PRIORITY_BACKGROUND)).add_done_callback(_log_refresh_error)
+
+    async def get_symbol_info(self, symbol: str) -> Optional[dict]:
+        """``AsyncClient.get_symbol_info`` ile ayni sonucu bellekten dondur."""
+        await self._ensure()
+        self.hits += 1
+        return self.symbols.get(symbol)
+
+    async def symbol_filters(self, symbol: str) -> Dict[str, dict]:
+        """Sembol filtreleri ``filterType`` anahtariyla; sembol yoksa bos sozluk."""
+        await self._ensure()
+        return self.filters.get(symbol, {})
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        log(f"Sembol bilgileri yenilenemedi: {task.exception()}")
+
+
+def cache_for(client) -> ExchangeInfoCache:
+    """Istemciye bagli onbellegi dondur; testnet ayri dosya kullanir."""
+    cache = getattr(client, "_exchange_info_cache", None)
+    if cache is None:
+        path = EXCHANGE_INFO_PATH
+        if path and getattr(client, "testnet", False):
+            root, ext = os.path.splitext(path)
+            path = f"{root}.testnet{ext}"
+        cache = ExchangeInfoCache(client, path)
+        client._exchange_info_cache = cache
+    return cache
+
+
+_original_create_order = AsyncClient.create_order
+
+
+async def _cached_get_symbol_info(self, symbol):
+    return await cache_for(self).get_symbol_info(symbol)
+
+
+async def _create_order(self, **params):
+    try:
+        return await _original_create_order(self, **params)
+    except BinanceAPIException as exc:
+        if exc.code == -1013:
+            cache_for(self).invalidate()
+        raise
+
+
+AsyncClient.get_symbol_info = _cached_get_symbol_info
+AsyncClient.create_order = _create_order
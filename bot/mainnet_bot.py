@@ -24,8 +24,8 @@ async def main():
     if token and TELEGRAM_ENABLED:
         setup_telegram_menu(token)
     client = await AsyncClient.create(API_KEY, API_SECRET)
-    buy_bot = BuyBot(client)
     sell_bot = SellBot(client)
+    buy_bot = BuyBot(client, balances=sell_bot.balances)
     if TELEGRAM_ENABLED:
         start_listener(asyncio.get_running_loop(), sell_bot, buy_bot)
 
@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bot.utils import backoff_delay, detached_task, log
+
+# Emir defteri aynasi istege baglidir; her sembol icin ek bir @depth akisi acar
+ORDER_BOOK_ENABLED = os.getenv("ORDER_BOOK_ENABLED", "false").lower() == "true"
+# Yeniden esitlemede alinan anlik goruntu derinligi (100 ve alti en dusuk agirlik)
+ORDER_BOOK_SNAPSHOT_LIMIT = int(os.getenv("ORDER_BOOK_SNAPSHOT_LIMIT", "100"))
+# Esitlenmemis defter icin biriktirilecek en fazla fark olayi; asilirsa tampon bastan baslar
+ORDER_BOOK_BUFFER_LIMIT = int(os.getenv("ORDER_BOOK_BUFFER_LIMIT", "1000"))
+# Basarisiz anlik goruntu denemeleri arasindaki en uzun bekleme (saniye)
+ORDER_BOOK_RETRY_MAX = float(os.getenv("ORDER_BOOK_RETRY_MAX", "60"))
+
+
+class BookSide:
+    """Fiyat sirali tek taraf; en iyi seviye listenin basindadir."""
+
+    __slots__ = ("levels", "keys", "sign")
+
+    def __init__(self, descending: bool):
+        self.levels: Dict[float, float] = {}
+        self.keys: List[float] = []
+        self.sign = -1.0 if descending else 1.0
+
+    def clear(self) -> None:
+        self.levels.clear()
+        self.keys.clear()
+
+    def set(self, price: float, qty: float) -> None:
+        key = self.sign * price
+        if qty <= 0:
+            if self.levels.pop(price, None) is not None:
+                idx = bisect_left(self.keys, key)
+                if idx < len(self.keys) and self.keys[idx] == key:
+                    del self.keys[idx]
+            return
+        if price not in self.levels:
+            insort(self.keys, key)
+        self.levels[price] = qty
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.keys:
+            return None
+        price = self.sign * self.keys[0]
+        return price, self.levels[price]
+
+    def walk(self, qty: float) -> Tuple[float, float]:
+        """``qty`` miktar bu taraftan alinirsa (dolan miktar, toplam quote)."""
+        filled = 0.0
+        quote = 0.0
+        for key in self.keys:
+            price = self.sign * key
+            take = min(self.levels[price], qty - filled)
+            filled += take
+            quote += take * price
+            if filled >= qty:
+                break
+        return filled, quote
+
+
+class OrderBook:
+    """Tek sembolun yerel L2 emir defteri."""
+
+    __slots__ = ("bids", "asks", "last_update_id", "synced", "buffer")
+
+    def __init__(self):
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.buffer: List[dict] = []
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        for price, qty in snapshot.get("bids", []):
+            self.bids.set(float(price), float(qty))
+        for price, qty in snapshot.get("asks", []):
+            self.asks.set(float(price), float(qty))
+        self.last_update_id = int(snapshot["lastUpdateId"])
+
+    def apply(self, event: dict) -> bool:
+        """Fark olayini uygula; sira bozuksa False dondur."""
+        first, last = int(event["U"]), int(event["u"])
+        if last <= self.last_update_id:
+            return True
+        if first > self.last_update_id + 1:
+            return False
+        for price, qty in event.get("b", []):
+            self.bids.set(float(price), float(qty))
+        for price, qty in event.get("a", []):
+            self.asks.set(float(price), float(qty))
+        self.last_update_id = last
+        return True
+
+
+class OrderBookMirror:
+    """``@depth`` fark akisi ve anlik goruntu ile tutulan emir defterleri.
+
+    Binance'in onerdigi sirayla calisir: esitlenmemis defter icin olaylar
+    biriktirilir, REST anlik goruntusu alinir, eski olaylar atilir ve kalanlar
+    uygulanir. Guncelleme kimliklerinde bosluk gorulurse defter yeniden
+    esitlenir.
+    """
+
+    def __init__(self, client, snapshot_limit: int = ORDER_BOOK_SNAPSHOT_LIMIT):
+        self.client = client
+        self.snapshot_limit = snapshot_limit
+        self.books: Dict[str, OrderBook] = {}
+        self._resyncing: Set[str] = set()
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.resyncs = 0
+
+    def reset(self, symbols: Iterable[str]) -> None:
+        """Akis (yeniden) baglandi; defterler yeniden esitlenmeli."""
+        for symbol in symbols:
+            self.books[symbol] = OrderBook()
+
+    def forget(self, keep: Iterable[str]) -> None:
+        keep = set(keep)
+        for symbol in [s for s in self.books if s not in keep]:
+            del self.books[symbol]
+            self._failures.pop(symbol, None)
+            self._retry_at.pop(symbol, None)
+            task = self._tasks.pop(symbol, None)
+            if task is not None:
+                task.cancel()
+
+    def stop(self) -> None:
+        """Suren esitleme gorevlerini iptal et."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def apply_diff(self, event: dict) -> bool:
+        """Fark olayini isle; yeniden esitleme gerekiyorsa True dondur."""
+        book = self.books.get(event.get("s"))
+        if book is None:
+            return False
+        if not book.synced:
+            if len(book.buffer) >= ORDER_BOOK_BUFFER_LIMIT:
+                # Esitleme uzun suredir basarisiz; eski olaylar zaten kullanilamaz
+                book.buffer = []
+            book.buffer.append(event)
+            symbol = event["s"]
+            if symbol in self._resyncing:
+                return False
+            return time.monotonic() >= self._retry_at.get(symbol, 0.0)
+        if not book.apply(event):
+            log(f"{event['s']} emir defteri sirasi bozuldu, yeniden esitleniyor")
+            book.synced = False
+            book.buffer = [event]
+            return True
+        return False
+
+    async def resync(self, symbol: str) -> None:
+        """Anlik goruntuyu alip biriken fark olaylarini uzerine uygula."""
+        if symbol in self._resyncing:
+            return
+        self._resyncing.add(symbol)
+        try:
+            snapshot = await self.client.get_order_book(symbol=symbol, limit=self.snapshot_limit)
+            book = self.books.get(symbol)
+            if book is None:
+                return
+            book.load_snapshot(snapshot)
+            pending, book.buffer = book.buffer, []
+            for event in pending:
+                if not book.apply(event):
+                    # Goruntu olaylardan daha eski kaldi; bekleme sonrasi tekrar denenir
+                    book.buffer = [event]
+                    self._backoff(symbol)
+                    return
+            book.synced = True
+            self.resyncs += 1
+            self._failures.pop(symbol, None)
+            self._retry_at.pop(symbol, None)
+        except Exception as exc:
+            log(f"{symbol} emir defteri alinamadi: {exc}")
+            self._backoff(symbol)
+        finally:
+            self._resyncing.discard(symbol)
+
+    def _backoff(self, symbol: str) -> None:
+        """Basarisiz esitlemeden sonra sonraki denemeyi artan surede ertele."""
+        failures = self._failures.get(symbol, 0) + 1
+        self._failures[symbol] = failures
+        self._retry_at[symbol] = time.monotonic() + backoff_delay(failures, maximum=ORDER_BOOK_RETRY_MAX)
+
+    def schedule_resync(self, symbol: str) -> None:
+        """Sembol icin tek bir esitleme gorevi baslat; gorev referansi saklanir."""
+        task = self._tasks.get(symbol)
+        if task is not None and not task.done():
+            return
+        task = detached_task(self.resync(symbol))
+        self._tasks[symbol] = task
+        task.add_done_callback(functools.partial(self._resync_done, symbol))
+
+    def _resync_done(self, symbol: str, task: asyncio.Task) -> None:
+        if self._tasks.get(symbol) is task:
+            del self._tasks[symbol]
+        if not task.cancelled() and task.exception() is not None:  # pragma: no cover - resync hatalari yakalar
+            log(f"{symbol} emir defteri esitleme gorevi hatasi: {task.exception()}")
+
+    def _book(self, symbol: str) -> Optional[OrderBook]:
+        book = self.books.get(symbol)
+        if book is None or not book.synced:
+            return None
+        return book
+
+    def best_bid(self, symbol: str) -> Optional[Tuple[float, float]]:
+        book = self._book(symbol)
+        return book.bids.best() if book else None
+
+    def best_ask(self, symbol: str) -> Optional[Tuple[float, float]]:
+        book = self._book(symbol)
+        return book.asks.best() if book else None
+
+    def estimate_sell(self, symbol: str, qty: float) -> Optional[Tuple[float, float]]:
+        """Piyasa satisinin tahmini ortalama fiyati ve en iyi alisa gore kayma orani.
+
+        Defter esitlenmemisse ya da miktar defterdeki derinligi asiyorsa None.
+        """
+        book = self._book(symbol)
+        if book is None or qty <= 0:
+            return None
+        best = book.bids.best()
+        if best is None:
+            return None
+        filled, quote = book.bids.walk(qty)
+        if filled + 1e-12 < qty:
+            return None
+        avg = quote / filled
+        return avg, (best[0] - avg) / best[0]
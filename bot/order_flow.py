@@ -0,0 +1,142 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+# aggTrade akisindan hacim tutulsun mu; kapaliysa hacim REST ile hesaplanir
+ORDER_FLOW_ENABLED = os.getenv("ORDER_FLOW_ENABLED", "true").lower() == "true"
+# Son islem halkasinda tutulan islem sayisi (son hedef hacim kontrolu)
+ORDER_FLOW_RING_SIZE = int(os.getenv("ORDER_FLOW_RING_SIZE", "60"))
+
+WINDOWS = (60, 300, 900)
+_SPAN = max(WINDOWS)
+
+
+class SymbolFlow:
+    """Tek sembolun saniyelik kovalarda tutulan alici/satici hacmi.
+
+    Her pencere icin toplamlar kova zamani ilerledikce dusulur; okuma
+    pencere uzunlugundan bagimsiz sabit surededir.
+    """
+
+    __slots__ = ("buy", "sell", "head", "totals", "ring", "ring_buy", "ring_sell", "started")
+
+    def __init__(self, ring_size: int = ORDER_FLOW_RING_SIZE):
+        self.buy = [0.0] * _SPAN
+        self.sell = [0.0] * _SPAN
+        self.head = 0
+        self.totals: Dict[int, list] = {w: [0.0, 0.0] for w in WINDOWS}
+        self.ring: Deque[Tuple[float, bool]] = deque(maxlen=ring_size)
+        self.ring_buy = 0.0
+        self.ring_sell = 0.0
+        self.started: Optional[float] = None
+
+    def _advance(self, second: int) -> None:
+        if second <= self.head:
+            return
+        if second - self.head >= _SPAN:
+            self.buy = [0.0] * _SPAN
+            self.sell = [0.0] * _SPAN
+            for total in self.totals.values():
+                total[0] = total[1] = 0.0
+            self.head = second
+            return
+        for sec in range(self.head + 1, second + 1):
+            for window, total in self.totals.items():
+                slot = (sec - window) % _SPAN
+                total[0] -= self.buy[slot]
+                total[1] -= self.sell[slot]
+            slot = sec % _SPAN
+            self.buy[slot] = 0.0
+            self.sell[slot] = 0.0
+        self.head = second
+
+    def add(self, price: float, qty: float, buyer_maker: bool, now: float) -> None:
+        second = int(now)
+        self._advance(second)
+        age = self.head - second
+        if age >= _SPAN:
+            return
+        quote = price * qty
+        slot = second % _SPAN
+        side = 1 if buyer_maker else 0
+        if buyer_maker:
+            self.sell[slot] += quote
+        else:
+            self.buy[slot] += quote
+        for window, total in self.totals.items():
+            if age < window:
+                total[side] += quote
+        if len(self.ring) == self.ring.maxlen:
+            old_qty, old_maker = self.ring[0]
+            if old_maker:
+                self.ring_sell -= old_qty
+            else:
+                self.ring_buy -= old_qty
+        self.ring.append((qty, buyer_maker))
+        if buyer_maker:
+            self.ring_sell += qty
+        else:
+            self.ring_buy += qty
+
+    def volumes(self, window: int, now: float) -> Tuple[float, float]:
+        self._advance(int(now))
+        buy, sell = self.totals[window]
+        return max(buy, 0.0), max(sell, 0.0)
+
+
+class OrderFlowStore:
+    """``@aggTrade`` akisiyla beslenen sembol bazli hacim deposu.
+
+    Akis bir sembol icin pencere suresi kadar kesintisiz calismadiysa veri
+    eksik sayilir ve ``None`` doner; cagiran REST yoluna dusmelidir.
+    """
+
+    def __init__(self, ring_size: int = ORDER_FLOW_RING_SIZE):
+        self.ring_size = ring_size
+        self.flows: Dict[str, SymbolFlow] = {}
+
+    def mark_connected(self, symbols: Iterable[str], now: Optional[float] = None) -> None:
+        """Akis (yeniden) baglandi; kesinti oncesi eksik veri isinmayi yeniden baslatir."""
+        now = time.time() if now is None else now
+        for symbol in symbols:
+            flow = self.flows.get(symbol)
+            if flow is None:
+                flow = self.flows[symbol] = SymbolFlow(self.ring_size)
+            flow.started = now
+            flow.ring.clear()
+            flow.ring_buy = flow.ring_sell = 0.0
+
+    def forget(self, keep: Iterable[str]) -> None:
+        """Takip edilmeyen sembollerin verisini sil."""
+        keep = set(keep)
+        for symbol in [s for s in self.flows if s not in keep]:
+            del self.flows[symbol]
+
+    def add_trade(
+        self, symbol: str, price: float, qty: float, buyer_maker: bool, now: Optional[float] = None
+    ) -> None:
+        flow = self.flows.get(symbol)
+        if flow is None:
+            return
+        flow.add(price, qty, buyer_maker, time.time() if now is None else now)
+
+    def volumes(
+        self, symbol: str, minutes: int = 5, now: Optional[float] = None
+    ) -> Optional[Tuple[float, float]]:
+        """Son ``minutes`` dakikadaki alici ve satici quote hacmi; veri eksikse None."""
+        window = minutes * 60
+        flow = self.flows.get(symbol)
+        if window not in WINDOWS or flow is None or flow.started is None:
+            return None
+        now = time.time() if now is None else now
+        if now - flow.started < window:
+            return None
+        return flow.volumes(window, now)
+
+    def recent(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """Son islem halkasindaki alici ve satici miktari; halka dolmadiysa None."""
+        flow = self.flows.get(symbol)
+        if flow is None or len(flow.ring) < flow.ring.maxlen:
+            return None
+        return max(flow.ring_buy, 0.0), max(flow.ring_sell, 0.0)
@@ -0,0 +1,295 @@
+import asyncio
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from bot.utils import backoff_delay, detached_task, log
+
+# Tek bir websocket baglantisina yazilacak en fazla akis sayisi.
+# Binance 1024 akisa izin verse de URL uzunlugu daha once sorun cikarir.
+PRICE_STREAMS_PER_CONNECTION = int(os.getenv("PRICE_STREAMS_PER_CONNECTION", "200"))
+# Bu kadar saniye mesaj gelmeyen baglanti kopmus sayilip yeniden kurulur
+STREAM_STALE_SECONDS = float(os.getenv("STREAM_STALE_SECONDS", "30"))
+RECONNECT_BACKOFF_MAX = float(os.getenv("RECONNECT_BACKOFF_MAX", "60"))
+
+# Fiyat akisi turleri: tam 24s istatistik, hafif miniTicker, en iyi alis/satis
+# (bookTicker) veya tum piyasayi tek akista veren miniTicker dizisi.
+FEED_TICKER = "ticker"
+FEED_MINI_TICKER = "miniTicker"
+FEED_BOOK_TICKER = "bookTicker"
+FEED_ALL_MINI_TICKER = "allMiniTicker"
+FEED_TYPES = (FEED_TICKER, FEED_MINI_TICKER, FEED_BOOK_TICKER, FEED_ALL_MINI_TICKER)
+ALL_MARKET_STREAM = "!miniTicker@arr"
+
+
+def resolve_feed(name: Optional[str]) -> str:
+    """Ortam degiskenindeki akis turunu dogrula, bilinmiyorsa ticker kullan."""
+    for feed in FEED_TYPES:
+        if name and name.lower() == feed.lower():
+            return feed
+    if name:
+        log(f"Bilinmeyen PRICE_FEED degeri '{name}', ticker kullanilacak")
+    return FEED_TICKER
+
+
+PRICE_FEED = resolve_feed(os.getenv("PRICE_FEED", FEED_TICKER))
+
+
+def stream_names(symbols: Iterable[str], feed: str = FEED_TICKER) -> List[str]:
+    """Semboller icin secilen akis turune gore websocket akis adlarini uret."""
+    if feed == FEED_ALL_MINI_TICKER:
+        return [ALL_MARKET_STREAM]
+    return [f"{s.lower()}@{feed}" for s in symbols]
+
+
+def trade_stream_names(symbols: Iterable[str]) -> List[str]:
+    """Hacim deposu icin sembol bazli ``@aggTrade`` akis adlari."""
+    return [f"{s.lower()}@aggTrade" for s in symbols]
+
+
+def depth_stream_names(symbols: Iterable[str]) -> List[str]:
+    """Emir defteri aynasi icin 100 ms'lik ``@depth`` fark akisi adlari."""
+    return [f"{s.lower()}@depth@100ms" for s in symbols]
+
+
+def extract_price(item: dict, feed: str = FEED_TICKER) -> Optional[float]:
+    """Akis mesajindan karar icin kullanilacak fiyati cikar.
+
+    ``bookTicker`` son islem fiyati icermez; satis tarafi icin en iyi alis
+    fiyati (``b``) kullanilir.
+    """
+    value = item.get("b") if feed == FEED_BOOK_TICKER else item.get("c")
+    if value is None:
+        return None
+    return float(value)
+
+
+@dataclass
+class ShardStatus:
+    """Tek bir fiyat baglantisinin saglik bilgisi."""
+
+    connected: bool = False
+    last_message: float = 0.0
+    messages: int = 0
+    restarts: int = 0
+    last_error: str = ""
+
+
+@dataclass
+class PriceShard:
+    """Bir websocket baglantisina atanmis sembol grubu."""
+
+    index: int
+    symbols: Set[str] = field(default_factory=set)
+    status: ShardStatus = field(default_factory=ShardStatus)
+    task: Optional[asyncio.Task] = None
+
+
+Listener = Callable[[List[str], ShardStatus], Awaitable[None]]
+
+
+class ShardedPriceStream:
+    """Fiyat akisini en fazla ``max_streams`` akis iceren baglantilara bol."""
+
+    def __init__(
+        self,
+        listener: Listener,
+        max_streams: int = PRICE_STREAMS_PER_CONNECTION,
+        feed: str = FEED_TICKER,
+    ):
+        self.listener = listener
+        self.max_streams = max(1, max_streams)
+        self.feed = feed
+        self.shards: List[PriceShard] = []
+        self._next_index = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _guard(self) -> asyncio.Lock:
+        """Baglanti degisikliklerini siralayan kilit; her olay dongusu icin ayri."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def symbols(self) -> Set[str]:
+        """Su anda dinlenen tum semboller."""
+        result: Set[str] = set()
+        for shard in self.shards:
+            result |= shard.symbols
+        return result
+
+    def health(self) -> List[Dict]:
+        """Her baglantinin durumunu sozluk listesi olarak dondur."""
+        return [
+            {
+                "index": shard.index,
+                "symbols": len(shard.symbols),
+                "connected": shard.status.connected,
+                "last_message": shard.status.last_message,
+                "messages": shard.status.messages,
+                "restarts": shard.status.restarts,
+                "last_error": shard.status.last_error,
+            }
+            for shard in self.shards
+        ]
+
+    def _new_shard(self) -> PriceShard:
+        shard = PriceShard(self._next_index)
+        self._next_index += 1
+        self.shards.append(shard)
+        return shard
+
+    def _rebalance(self, wanted: Set[str]):
+        """Sembolleri baglantilara dagit; degisen ve kaldirilan gruplari dondur.
+
+        Var olan atamalar korunur, boylece sadece icerigi degisen baglantilar
+        yeniden kurulur.
+        """
+        changed: Set[int] = set()
+        removed: List[PriceShard] = []
+        assigned: Set[str] = set()
+        for shard in self.shards:
+            gone = shard.symbols - wanted
+            if gone:
+                shard.symbols -= gone
+                changed.add(shard.index)
+            assigned |= shard.symbols
+        for shard in [s for s in self.shards if not s.symbols]:
+            self.shards.remove(shard)
+            changed.discard(shard.index)
+            removed.append(shard)
+
+        # Cok sayida sembol ciktiysa az dolu baglantilari digerlerine aktar
+        needed = math.ceil(len(wanted) / self.max_streams) if wanted else 0
+        while len(self.shards) > max(needed, 1):
+            smallest = min(self.shards, key=lambda s: len(s.symbols))
+            self.shards.remove(smallest)
+            changed.discard(smallest.index)
+            removed.append(smallest)
+            moving = sorted(smallest.symbols)
+            for shard in sorted(self.shards, key=lambda s: len(s.symbols)):
+                free = self.max_streams - len(shard.symbols)
+                if free <= 0 or not moving:
+                    continue
+                shard.symbols.update(moving[:free])
+                moving = moving[free:]
+                changed.add(shard.index)
+
+        new = sorted(wanted - assigned)
+        while new:
+            candidates = [s for s in self.shards if len(s.symbols) < self.max_streams]
+            shard = (
+                min(candidates, key=lambda s: len(s.symbols))
+                if candidates
+                else self._new_shard()
+            )
+            free = self.max_streams - len(shard.symbols)
+            shard.symbols.update(new[:free])
+            new = new[free:]
+            changed.add(shard.index)
+        return [s for s in self.shards if s.index in changed], removed
+
+    async def update(self, symbols: Iterable[str]) -> None:
+        """Takip edilen semboller degistiginde baglantilari yeniden dagit.
+
+        Es zamanli cagrilar sirayla islenir; aksi halde durdurulmakta olan bir
+        baglantinin yerine iki dinleyici baslatilip biri sahipsiz kalabilir.
+        """
+        wanted = set(symbols)
+        async with self._guard():
+            if self.feed == FEED_ALL_MINI_TICKER:
+                await self._update_all_market(wanted)
+                return
+            changed, removed = self._rebalance(wanted)
+            for shard in removed:
+                await self._stop_shard(shard)
+            for shard in changed:
+                await self._start_shard(shard)
+            for shard in self.shards:
+                if shard.task is None or shard.task.done():
+                    await self._start_shard(shard)
+
+    async def _update_all_market(self, wanted: Set[str]) -> None:
+        """Tum piyasa akisi tek baglantidir; sembol degisimi yeniden baglanti gerektirmez."""
+        if not wanted:
+            await self._stop_all()
+            return
+        if not self.shards:
+            self._new_shard()
+        shard = self.shards[0]
+        shard.symbols = wanted
+        if shard.task is None or shard.task.done():
+            await self._start_shard(shard)
+
+    async def stop(self) -> None:
+        """Tum baglantilari kapat."""
+        async with self._guard():
+            await self._stop_all()
+
+    async def _stop_all(self) -> None:
+        for shard in self.shards:
+            await self._stop_shard(shard)
+        self.shards.clear()
+
+    async def _stop_shard(self, shard: PriceShard) -> None:
+        task = shard.task
+        shard.task = None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception:  # pragma: no cover - gorev zaten hata ile bitti
+            pass
+
+    async def _start_shard(self, shard: PriceShard) -> None:
+        await self._stop_shard(shard)
+        if shard.status.messages or shard.status.last_error:
+            shard.status.restarts += 1
+        # Baglanti, yeniden baslatan cagiranin (arka plan taramasi vb.) onceligini tasimasin
+        shard.task = detached_task(self._run_shard(shard))
+
+    async def _run_shard(self, shard: PriceShard) -> None:
+        """Baglantiyi calistir; hata olursa artan bekleme ile yeniden kur."""
+        failures = 0
+        while shard.symbols:
+            received = shard.status.messages
+            try:
+                await self.listener(sorted(shard.symbols), shard.status)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                shard.status.last_error = str(exc)
+                log(f"Fiyat baglantisi #{shard.index} hatasi: {exc}")
+            finally:
+                shard.status.connected = False
+            failures = 1 if shard.status.messages > received else failures + 1
+            shard.status.restarts += 1
+            await asyncio.sleep(backoff_delay(failures, maximum=RECONNECT_BACKOFF_MAX))
+
+    async def check_stale(self, stale_after: float = STREAM_STALE_SECONDS) -> int:
+        """Sessiz kalan ya da duran baglantilari yeniden kur; kurulan sayiyi dondur."""
+        restarted = 0
+        async with self._guard():
+            now = time.monotonic()
+            for shard in list(self.shards):
+                status = shard.status
+                dead = shard.task is None or shard.task.done()
+                silent = status.connected and now - status.last_message > stale_after
+                if not (dead or silent):
+                    continue
+                if silent:
+                    log(
+                        f"Fiyat baglantisi #{shard.index} {now - status.last_message:.0f} sn sessiz, "
+                        "yeniden baglaniliyor"
+                    )
+                await self._start_shard(shard)
+                restarted += 1
+        return restarted
@@ -1,81 +1,1026 @@
 import asyncio
+import functools
+import json
+import os
 import time
 import re
-from typing import Optional
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
+import aiohttp
 from binance import AsyncClient
 from binance.exceptions import BinanceAPIException
+from bot.api_endpoints import API_ENDPOINTS, HEDGE_PATHS, EndpointRouter
+from bot.circuit_breaker import BreakerBoard, CircuitOpenError, endpoint_family, is_degraded
+from bot.response_cache import RESPONSE_CACHE_ENABLED, ResponseCache
+from bot.utils import backoff_delay, log
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Aynı makinedeki bot süreçlerinin ortak ağırlık penceresi dosyası; boşsa her süreç kendi sayar
+RATE_LIMIT_SHARED_FILE = os.getenv("RATE_LIMIT_SHARED_FILE", "")
+# REST isteklerinin dağıtılacağı çıkışlar: "direct", kaynak IP ya da proxy URL'si (virgülle)
+EGRESS_ROUTES = os.getenv("EGRESS_ROUTES", "")
+
+
+def _symbol_count(params: dict) -> int:
+    """İstekte sembol yoksa tüm piyasa (0), varsa sembol sayısı."""
+    if params.get("symbol"):
+        return 1
+    symbols = params.get("symbols")
+    if not symbols:
+        return 0
+    if isinstance(symbols, str):
+        try:
+            return len(json.loads(symbols))
+        except ValueError:
+            return len(symbols.split(","))
+    return len(symbols)
+
+
+def _ticker_24hr_weight(params: dict) -> int:
+    count = _symbol_count(params)
+    if count == 0 or count > 100:
+        return 80
+    if count > 20:
+        return 40
+    return 2
+
+
+def _depth_weight(params: dict) -> int:
+    limit = int(params.get("limit", 100))
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+# Spot uç noktalarının istek ağırlıkları; parametreye bağlı olanlar fonksiyondur.
+# Anahtar (HTTP metodu, /api/ sonrası yol) şeklindedir, metot "*" ise hepsine uyar.
+WeightRule = Union[int, Callable[[dict], int]]
+ENDPOINT_WEIGHTS: Dict[Tuple[str, str], WeightRule] = {
+    ("*", "v3/ping"): 1,
+    ("*", "v3/time"): 1,
+    ("*", "v3/exchangeInfo"): 20,
+    ("*", "v3/account"): 20,
+    ("*", "v3/myTrades"): lambda p: 5 if p.get("orderId") else 20,
+    ("*", "v3/klines"): 2,
+    ("*", "v3/uiKlines"): 2,
+    ("*", "v3/avgPrice"): 2,
+    ("*", "v3/aggTrades"): 4,
+    ("*", "v3/trades"): 25,
+    ("*", "v3/historicalTrades"): 25,
+    ("*", "v3/depth"): _depth_weight,
+    ("*", "v3/ticker/24hr"): _ticker_24hr_weight,
+    ("*", "v3/ticker/price"): lambda p: 2 if _symbol_count(p) == 1 else 4,
+    ("*", "v3/ticker/bookTicker"): lambda p: 2 if _symbol_count(p) == 1 else 4,
+    ("get", "v3/order"): 4,
+    ("post", "v3/order"): 1,
+    ("delete", "v3/order"): 1,
+    ("*", "v3/openOrders"): lambda p: 6 if p.get("symbol") else 80,
+    ("*", "v3/allOrders"): 20,
+    ("*", "v3/userDataStream"): 2,
+}
+
+
+def endpoint_weight(method: str, uri: str, params: Optional[dict] = None) -> int:
+    """İsteğin gönderilmeden önce ayrılacak ağırlığını tablodan hesapla."""
+    path = uri.split("?", 1)[0]
+    if "/api/" not in path:
+        return 1
+    path = path.split("/api/", 1)[1]
+    rule = ENDPOINT_WEIGHTS.get((method.lower(), path)) or ENDPOINT_WEIGHTS.get(("*", path))
+    if rule is None:
+        return 1
+    if callable(rule):
+        try:
+            return rule(params or {})
+        except (TypeError, ValueError):
+            return 1
+    return rule
+
+
+# İstek öncelikleri: küçük değer daha önceliklidir
+PRIORITY_ORDER = 0
+PRIORITY_DECISION = 1
+PRIORITY_INTERACTIVE = 2
+PRIORITY_BACKGROUND = 3
+PRIORITY_NAMES = {
+    PRIORITY_ORDER: "order",
+    PRIORITY_DECISION: "decision",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def _share(name: str, default: str) -> float:
+    return min(1.0, max(0.0, float(os.getenv(name, default))))
+
+
+# Her önceliğin kullanabileceği en yüksek limit oranı; kalan pay üst önceliklere ayrılır
+PRIORITY_SHARES = {
+    PRIORITY_ORDER: 1.0,
+    PRIORITY_DECISION: _share("PRIORITY_DECISION_SHARE", "0.9"),
+    PRIORITY_INTERACTIVE: _share("PRIORITY_INTERACTIVE_SHARE", "0.85"),
+    PRIORITY_BACKGROUND: _share("PRIORITY_BACKGROUND_SHARE", "0.7"),
+}
+
+# Hesap bazlı emir sınırları: pencere uzunluğu (saniye) -> en fazla emir
+ORDER_LIMITS = {
+    10: int(os.getenv("ORDER_LIMIT_10S", "100")),
+    86400: int(os.getenv("ORDER_LIMIT_1D", "200000")),
+}
+
+# Sonucu belirsiz kalan emrin gönderileceği en fazla adres sayısı
+ORDER_ENDPOINT_ATTEMPTS = int(os.getenv("ORDER_ENDPOINT_ATTEMPTS", "2"))
+# Sonucu belirsiz emrin borsada aranacağı en uzun süre (saniye)
+ORDER_STATUS_TIMEOUT = float(os.getenv("ORDER_STATUS_TIMEOUT", "10"))
+# Bulunamayınca yeniden gönderilebilecek emir türleri; MARKET emri geç işlenebileceği için varsayılan boş
+ORDER_RESEND_TYPES = {
+    t.strip().upper() for t in os.getenv("ORDER_RESEND_TYPES", "").split(",") if t.strip()
+}
+
+# Başlangıç taramalarında eşzamanlı istek sayısı; ağırlık kullanımına göre ayarlanır
+CONCURRENCY_LIMIT = int(os.getenv("CONCURRENCY_LIMIT", "5"))
+CONCURRENCY_MAX = int(os.getenv("CONCURRENCY_MAX", "20"))
+# Kullanılan ağırlık limitin bu oranının altındaysa eşzamanlılık artırılır
+CONCURRENCY_TARGET_RATIO = float(os.getenv("CONCURRENCY_TARGET_RATIO", "0.6"))
+# Bu oranın üstünde ya da 429/418 alındığında eşzamanlılık yarıya indirilir
+CONCURRENCY_BACKOFF_RATIO = float(os.getenv("CONCURRENCY_BACKOFF_RATIO", "0.85"))
+
+# Etiketlenmemiş istekler (None) karar önceliğinde sayılır; ancak yedek istek
+# yalnızca açıkça karar olarak etiketlenen çağrılara gönderilir
+request_priority: ContextVar[Optional[int]] = ContextVar("request_priority", default=None)
+
+
+class SharedPriority:
+    """Birden çok çağıranın beklediği (birleştirilmiş) isteğin önceliği.
+
+    Paylaşılan istek ilk çağıranın bağlamından bağımsız çalışır; daha
+    öncelikli biri katıldığında ``raise_to`` ile yükseltilir ve sıradaki
+    limiter bekleyişi de yeni önceliğe taşınır.
+    """
+
+    __slots__ = ("level", "listeners")
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = level
+        self.listeners: List[Callable[[int], None]] = []
+
+    @classmethod
+    def for_caller(cls) -> "SharedPriority":
+        """Çağıranın önceliğiyle başla; çağıran da paylaşılan bir istekse ona bağlan."""
+        shared = cls(_tagged_priority())
+        parent = _shared_priority.get()
+        if parent is not None:
+            parent.listeners.append(shared.raise_to)
+        return shared
+
+    def effective(self) -> int:
+        return PRIORITY_DECISION if self.level is None else self.level
+
+    def raise_to(self, level: Optional[int]) -> None:
+        new = PRIORITY_DECISION if level is None else level
+        if new < self.effective():
+            self.level = level
+            for listener in list(self.listeners):
+                listener(new)
+        elif new == self.effective() and self.level is None:
+            # Açık etiket (ör. karar) etiketsiz çağrıyla aynı sırada ama yedek isteğe uygun
+            self.level = level
+
+    def merge(self, other: "SharedPriority") -> None:
+        self.raise_to(other.level)
+
+
+_shared_priority: ContextVar[Optional[SharedPriority]] = ContextVar("shared_priority", default=None)
+
+
+@contextmanager
+def shared_priority(shared: SharedPriority):
+    """Blok içindeki istekler paylaşılan önceliği kullansın."""
+    token = _shared_priority.set(shared)
+    try:
+        yield
+    finally:
+        _shared_priority.reset(token)
+
+
+def _tagged_priority() -> Optional[int]:
+    shared = _shared_priority.get()
+    if shared is not None:
+        return shared.level
+    return request_priority.get()
+
+
+def current_priority() -> int:
+    """Geçerli isteğin önceliği; etiket yoksa karar önceliği."""
+    level = _tagged_priority()
+    return PRIORITY_DECISION if level is None else level
+
+T = TypeVar("T")
+
+
+@contextmanager
+def priority(level: int):
+    """Blok içindeki (ve blokta başlatılan görevlerdeki) istekleri bu öncelikle etiketle."""
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+async def with_priority(coro: Awaitable[T], level: int) -> T:
+    """Verilen coroutine'i seçilen öncelikle çalıştır."""
+    with priority(level):
+        return await coro
+
+
+def prioritized(level: int):
+    """Metodun yaptığı tüm istekleri verilen öncelikle etiketleyen dekoratör."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with priority(level):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class SharedWindow:
+    """Aynı IP'yi kullanan süreçlerin ortak ağırlık penceresi ve ban bilgisi.
+
+    Durum kilitli bir JSON dosyasında tutulur; her ayırma dosya kilidi
+    altında okunup yazıldığından süreçler tek bir IP bütçesi gibi davranır.
+    Süreçler arasında karşılaştırılabilmesi için zamanlar duvar saatidir.
+    Kayıtlar ``BUCKET`` saniyelik dilimlerde birleştirilerek dosya küçük tutulur.
+    """
+
+    BUCKET = 0.1
+
+    def __init__(self, path: str, interval: float = 60):
+        self.path = path
+        self.interval = interval
+
+    @contextmanager
+    def _state(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                raw = fh.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                entries = [e for e in state.get("entries", []) if e[0] > time.time() - self.interval]
+                state["entries"] = entries
+                state.setdefault("ban_until", 0.0)
+                yield state
+                fh.seek(0)
+                fh.truncate()
+                json.dump(state, fh)
+                fh.flush()
+            finally:
+                fh.seek(0)
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _add(self, state: dict, weight: int, now: float) -> None:
+        entries = state["entries"]
+        if entries and now - entries[-1][0] < self.BUCKET:
+            entries[-1][1] += weight
+        else:
+            entries.append([now, weight])
+
+    def try_reserve(self, weight: int, ceiling: float) -> Tuple[bool, int, Optional[float]]:
+        """Ağırlığı ortak pencereye yazmayı dene.
+
+        (ayrıldı mı, penceredeki toplam, yer açılacak duvar saati) döner.
+        """
+        now = time.time()
+        with self._state() as state:
+            entries = state["entries"]
+            used = sum(w for _, w in entries)
+            if now < state["ban_until"]:
+                return False, used, state["ban_until"]
+            if used + weight <= ceiling or used == 0:
+                self._add(state, weight, now)
+                return True, used + weight, None
+            return False, used, entries[0][0] + self.interval
+
+    def raise_to(self, used: int) -> int:
+        """Toplamı sunucunun bildirdiği değere çek (sadece yukarı)."""
+        now = time.time()
+        with self._state() as state:
+            current = sum(w for _, w in state["entries"])
+            if used > current:
+                self._add(state, used - current, now)
+                current = used
+            return current
+
+    def set_ban_until(self, wall_time: float) -> None:
+        with self._state() as state:
+            state["ban_until"] = max(state["ban_until"], wall_time)
+
 
 class RequestLimiter:
-    """6000 ağırlık/1 dk kuralını korumak için basit sayaç."""
+    """6000 ağırlık/1 dk kuralını korumak için öncelikli kayan pencere.
+
+    Her ayrılan ağırlık zaman damgasıyla tutulur ve tam ``interval`` saniye
+    sonra pencereden düşer. Sığmayan istekler öncelik sırasına göre FIFO
+    kuyruğunda bekler; pencereden ağırlık düştüğü anda sıradaki bekleyenler
+    uyandırılır. Düşük öncelikli istekler limitin sadece kendi payı kadarını
+    kullanabilir; böylece emirler ve satış kararları için her zaman yer kalır.
+    ``shared`` verilirse pencere ve ban süresi diğer süreçlerle paylaşılır.
+    """
 
-    def __init__(self, limit=6000, interval=60):
+    def __init__(
+        self,
+        limit=6000,
+        interval=60,
+        shares: Optional[Dict[int, float]] = None,
+        shared: Optional[SharedWindow] = None,
+    ):
         self.limit = limit
         self.interval = interval
+        self.shares = dict(PRIORITY_SHARES if shares is None else shares)
+        self.deferred: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
         self.used = 0
-        self.reset = time.monotonic()
         self.ban_until = 0.0
-        # Kilit import sirasinda olusursa calisan event loop farkli olabilir.
-        # Bu nedenle ilk kullanimda olusturmak icin None atiyoruz.
-        self.lock: Optional[asyncio.Lock] = None
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._waiters: Dict[int, Deque[Tuple[asyncio.Future, int]]] = {}
+        self.shared = shared
+        self._wake_at = 0.0
+        # Uyandırıcı görev çalışan event loop'a bağlı; ilk bekleyende oluşturulur
+        self._drainer: Optional[asyncio.Task] = None
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.interval
+        while self._window and self._window[0][0] <= cutoff:
+            self.used -= self._window.popleft()[1]
+        if not self._window:
+            self.used = 0
+
+    def _reserve(self, weight: int, now: float) -> None:
+        self._window.append((now, weight))
+        self.used += weight
+
+    def _try_reserve(self, weight: int, level: int, now: float) -> bool:
+        ceiling = self.limit * self.shares.get(level, 1.0)
+        if self.shared is not None:
+            ok, self.used, wake = self.shared.try_reserve(weight, ceiling)
+            if wake is not None:
+                self._wake_at = now + max(wake - time.time(), 0)
+            return ok
+        self._prune(now)
+        # Boş pencerede paydan büyük tek istek de geçebilmeli
+        if self.used + weight <= ceiling or self.used == 0:
+            self._reserve(weight, now)
+            return True
+        return False
+
+    def _next_wakeup(self, now: float) -> float:
+        if self.shared is not None:
+            return self._wake_at - now
+        return self._window[0][0] + self.interval - now if self._window else 0
+
+    def _queued(self, level: int) -> bool:
+        """Aynı ya da daha öncelikli bekleyen var mı (sıra atlanmasın)."""
+        return any(queue for p, queue in self._waiters.items() if p <= level)
 
-    def _ensure_lock(self) -> asyncio.Lock:
-        """Her cagri oncesi mevcut event loop'a bagli kilidi dondur."""
-        if self.lock is None:
-            self.lock = asyncio.Lock()
-        return self.lock
+    def _release(self, now: float) -> None:
+        """Sığan bekleyenleri öncelik ve geliş sırasıyla uyandır."""
+        for level in sorted(self._waiters):
+            queue = self._waiters[level]
+            while queue:
+                future, weight = queue[0]
+                if future.done():
+                    queue.popleft()
+                    continue
+                if not self._try_reserve(weight, level, now):
+                    # Sıranın başı sığmıyorsa arkasındakiler ve alt öncelikler de beklesin
+                    return
+                queue.popleft()
+                future.set_result(None)
+
+    async def _drain(self) -> None:
+        while any(self._waiters.values()):
+            now = time.monotonic()
+            if now < self.ban_until:
+                await asyncio.sleep(self.ban_until - now)
+                continue
+            self._release(now)
+            if not any(self._waiters.values()):
+                break
+            # En eski kayıt pencereden düşene kadar bekle
+            await asyncio.sleep(max(self._next_wakeup(now), 0.001))
+
+    def load(self) -> float:
+        """Penceredeki ağırlığın limite oranı."""
+        if self.shared is None:
+            self._prune(time.monotonic())
+        return self.used / self.limit
+
+    def _ensure_drainer(self) -> None:
+        task = self._drainer
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._drainer = asyncio.ensure_future(self._drain())
 
     async def update_used(self, used: int) -> None:
-        lock = self._ensure_lock()
-        async with lock:
-            self.used = used
+        """Sunucunun bildirdiği ağırlıkla yerel sayacı uzlaştır.
+
+        Ağırlık istek öncesinde ayrıldığından başlık sadece sayacı yukarı
+        çekebilir; aynı IP'yi kullanan başka süreçler bu şekilde hesaba katılır.
+        """
+        if self.shared is not None:
+            self.used = self.shared.raise_to(used)
+            return
+        now = time.monotonic()
+        self._prune(now)
+        if used > self.used:
+            self._reserve(used - self.used, now)
 
     async def set_ban_until(self, timestamp: float) -> None:
-        lock = self._ensure_lock()
-        async with lock:
-            self.ban_until = timestamp
+        self.ban_until = timestamp
+        if self.shared is not None:
+            self.shared.set_ban_until(time.time() + timestamp - time.monotonic())
 
-    async def acquire(self, weight=1):
-        lock = self._ensure_lock()
-        async with lock:
+    async def acquire(self, weight=1, level: Optional[int] = None):
+        """Ağırlığı ayır; sığmıyorsa sıraya girip yer açılınca uyandırılmayı bekle."""
+        if level is None:
+            level = current_priority()
+        now = time.monotonic()
+        if now < self.ban_until:
+            await asyncio.sleep(max(self.ban_until - now, 0))
             now = time.monotonic()
-            if now < self.ban_until:
-                await asyncio.sleep(max(self.ban_until - now, 0))
-                now = time.monotonic()
-            if now - self.reset >= self.interval:
-                self.used = 0
-                self.reset = now
-            if self.used + weight > self.limit:
-                wait = self.interval - (now - self.reset)
-                await asyncio.sleep(max(wait, 0))
-                self.used = 0
-                self.reset = time.monotonic()
-            self.used += weight
-
-limiter = RequestLimiter()
+        if not self._queued(level) and self._try_reserve(weight, level, now):
+            return
+        self.deferred[level] = self.deferred.get(level, 0) + 1
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, weight)
+        self._waiters.setdefault(level, deque()).append(entry)
+        self._ensure_drainer()
+        shared = _shared_priority.get()
+        if shared is None:
+            await future
+            return
+        promote = functools.partial(self._promote, entry)
+        shared.listeners.append(promote)
+        try:
+            await future
+        finally:
+            shared.listeners.remove(promote)
+
+    def _promote(self, entry: Tuple[asyncio.Future, int], level: int) -> None:
+        """Bekleyeni daha öncelikli kuyruğa taşı (paylaşılan isteğe öncelikli biri katıldı)."""
+        for current, queue in self._waiters.items():
+            if current > level and entry in queue:
+                queue.remove(entry)
+                self._waiters.setdefault(level, deque()).append(entry)
+                self._release(time.monotonic())
+                return
+
+class AdaptiveConcurrency:
+    """``X-MBX-USED-WEIGHT-1M`` başlığıyla ayarlanan eşzamanlılık sınırı (AIMD).
+
+    Kullanılan ağırlık hedefin altındayken her yanıtta sınır yavaşça artar,
+    limite yaklaşıldığında ya da 429/418 alındığında yarıya iner. Kesintiler
+    arka arkaya gelen yanıtlarla katlanmasın diye en fazla ``cooldown``
+    saniyede bir uygulanır. ``async with`` ile slot alınır.
+    """
+
+    def __init__(
+        self,
+        initial: int = CONCURRENCY_LIMIT,
+        maximum: int = CONCURRENCY_MAX,
+        target: float = CONCURRENCY_TARGET_RATIO,
+        backoff: float = CONCURRENCY_BACKOFF_RATIO,
+        cooldown: float = 1.0,
+    ):
+        self.maximum = max(1, maximum)
+        self.limit = float(min(max(1, initial), self.maximum))
+        self.target = target
+        self.backoff_ratio = backoff
+        self.cooldown = cooldown
+        self.inflight = 0
+        self.cuts = 0
+        self._last_cut = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def allowed(self) -> int:
+        return max(1, int(self.limit))
+
+    def observe(self, used: int, limit: int) -> None:
+        """Yanıt başlığındaki ağırlık kullanımına göre sınırı güncelle."""
+        if limit <= 0:
+            return
+        ratio = used / limit
+        if ratio >= self.backoff_ratio:
+            self.backoff()
+        elif ratio < self.target:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def backoff(self) -> None:
+        now = time.monotonic()
+        if now - self._last_cut < self.cooldown:
+            return
+        self._last_cut = now
+        self.cuts += 1
+        self.limit = max(1.0, self.limit / 2)
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self.allowed:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.inflight += 1
+            future.set_result(None)
+
+    async def __aenter__(self):
+        if not self._waiters and self.inflight < self.allowed:
+            self.inflight += 1
+            return self
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Slot verildikten sonra iptal edildiyse slotu geri bırak
+            if future.done() and not future.cancelled():
+                self.inflight -= 1
+                self._wake()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.inflight -= 1
+        self._wake()
+
+
+class OrderRateLimiter:
+    """Hesap bazlı emir sayısı sınırları (10 sn ve 1 gün).
+
+    Binance bu sayaçları saate hizalı sabit pencerelerde tutar ve her emir
+    yanıtında ``X-MBX-ORDER-COUNT-10S`` / ``-1D`` başlıklarıyla bildirir.
+    Emirler gönderilmeden önce sayılır; dolu pencerede pencere bitene kadar
+    beklenir, böylece toplu satışlar yarıda -1015 hatasıyla kesilmez.
+    """
+
+    HEADERS = {10: "X-MBX-ORDER-COUNT-10S", 86400: "X-MBX-ORDER-COUNT-1D"}
+
+    def __init__(self, limits: Optional[Dict[int, int]] = None):
+        self.limits = dict(ORDER_LIMITS if limits is None else limits)
+        self.counts: Dict[int, Tuple[float, int]] = {}
+        self.waits = 0
+
+    def _count(self, interval: int, now: float) -> Tuple[float, int]:
+        start = now - now % interval
+        window, count = self.counts.get(interval, (start, 0))
+        if window != start:
+            window, count = start, 0
+        return window, count
+
+    def _wait(self, now: float) -> float:
+        wait = 0.0
+        for interval, limit in self.limits.items():
+            window, count = self._count(interval, now)
+            if count >= limit:
+                wait = max(wait, window + interval - now)
+        return wait
+
+    async def acquire(self) -> None:
+        """Bir emir hakkı ayır; pencere doluysa yenilenene kadar bekle."""
+        counted = False
+        while True:
+            now = time.time()
+            wait = self._wait(now)
+            if wait <= 0:
+                for interval in self.limits:
+                    window, count = self._count(interval, now)
+                    self.counts[interval] = (window, count + 1)
+                return
+            if not counted:
+                counted = True
+                self.waits += 1
+            await asyncio.sleep(wait)
+
+    def update(self, headers) -> None:
+        """Emir yanıtındaki sayaç başlıklarıyla yerel sayıları uzlaştır."""
+        now = time.time()
+        for interval, name in self.HEADERS.items():
+            if interval not in self.limits:
+                continue
+            try:
+                reported = int(headers.get(name, 0))
+            except (TypeError, ValueError):
+                continue
+            window, count = self._count(interval, now)
+            self.counts[interval] = (window, max(count, reported))
+
+    def exhaust(self, interval: int = 10) -> None:
+        """-1015 alındı; pencere bitene kadar yeni emir gönderme."""
+        if interval in self.limits:
+            window, _ = self._count(interval, time.time())
+            self.counts[interval] = (window, self.limits[interval])
+
+
+class Egress:
+    """REST trafiğinin çıktığı tek bir adres ve bu adrese ait limit sayacı.
+
+    ``local_addr`` verilirse istekler bu kaynak IP'den bağlanan ayrı bir
+    oturumla, ``proxy`` verilirse bu proxy üzerinden gönderilir; ikisi de
+    yoksa istemcinin kendi oturumu kullanılır.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local_addr: Optional[str] = None,
+        proxy: Optional[str] = None,
+        limiter: Optional[RequestLimiter] = None,
+    ):
+        self.name = name
+        self.local_addr = local_addr
+        self.proxy = proxy
+        self.limiter = limiter or RequestLimiter()
+        self.requests = 0
+        self._sessions: Dict[int, aiohttp.ClientSession] = {}
+
+    @classmethod
+    def parse(cls, spec: str) -> "Egress":
+        """``direct``, kaynak IP (``10.0.0.2``) ya da proxy URL'si (``http://..``)."""
+        spec = spec.strip()
+        shared = None
+        if RATE_LIMIT_SHARED_FILE:
+            suffix = re.sub(r"[^A-Za-z0-9.]+", "_", spec)
+            shared = SharedWindow(f"{RATE_LIMIT_SHARED_FILE}.{suffix}")
+        limiter = RequestLimiter(shared=shared)
+        if spec == "direct":
+            return cls(spec, limiter=limiter)
+        if "://" in spec:
+            return cls(spec, proxy=spec, limiter=limiter)
+        return cls(spec, local_addr=spec, limiter=limiter)
+
+    def load(self) -> float:
+        """Doluluk oranı; ban altındaki çıkış en sona kalır."""
+        if self.limiter.ban_until > time.monotonic():
+            return float("inf")
+        return self.limiter.load()
+
+    def bind(self, client):
+        """İsteği bu çıkıştan gönderecek istemci görünümünü döndür."""
+        if self.local_addr is None and self.proxy is None:
+            return client
+        session = client.session
+        if self.local_addr is not None:
+            session = self._sessions.get(id(client))
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(local_addr=(self.local_addr, 0)),
+                    headers=client._get_headers(),
+                    **client._session_params,
+                )
+                self._sessions[id(client)] = session
+        return _EgressClient(client, session, self.proxy or client.https_proxy)
+
+    async def close(self, client) -> None:
+        session = self._sessions.pop(id(client), None)
+        if session is not None:
+            await session.close()
+
+
+class _EgressClient:
+    """Oturumu ve proxy'si değiştirilmiş istemci; diğer her şey asıl istemciden okunur."""
+
+    def __init__(self, client, session, proxy):
+        self._client = client
+        self.session = session
+        self.https_proxy = proxy
+        self.response = None
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class EgressRouter:
+    """İstekleri en az dolu çıkışa yönlendir.
+
+    Emirler API anahtarının IP kısıtlamasıyla uyumlu kalması için her zaman
+    ilk (birincil) çıkıştan gönderilir.
+    """
+
+    def __init__(self, egresses: List[Egress]):
+        self.egresses = egresses
+
+    @property
+    def primary(self) -> Egress:
+        return self.egresses[0]
+
+    def pick(self, level: int) -> Egress:
+        if level == PRIORITY_ORDER or len(self.egresses) == 1:
+            return self.primary
+        return min(self.egresses, key=Egress.load)
+
+    def stats(self) -> Dict[str, int]:
+        return {e.name: e.requests for e in self.egresses}
+
+
+def _build_router() -> EgressRouter:
+    specs = [s for s in EGRESS_ROUTES.split(",") if s.strip()]
+    if not specs:
+        return EgressRouter(
+            [
+                Egress(
+                    "direct",
+                    limiter=RequestLimiter(
+                        shared=SharedWindow(RATE_LIMIT_SHARED_FILE) if RATE_LIMIT_SHARED_FILE else None
+                    ),
+                )
+            ]
+        )
+    return EgressRouter([Egress.parse(spec) for spec in specs])
+
+
+router = _build_router()
+# Birincil çıkışın sayacı; tek IP kullanan kurulumlarda tek sayaç budur
+limiter = router.primary.limiter
+order_limiter = OrderRateLimiter()
+concurrency = AdaptiveConcurrency()
+breakers = BreakerBoard()
+response_cache = ResponseCache()
+endpoints = EndpointRouter(API_ENDPOINTS)
 _original_request = AsyncClient._request
+_original_close_connection = AsyncClient.close_connection
+
+async def _note_api_error(exc: BinanceAPIException, egress_limiter: RequestLimiter, is_order: bool) -> None:
+    """Ban ve emir sınırı hatalarını ilgili sayaçlara işle."""
+    if exc.code == -1003 or exc.status_code in (418, 429):
+        concurrency.backoff()
+    if exc.code == -1003:
+        match = re.search(r"until (\d+)", str(exc))
+        if match:
+            ts_ms = int(match.group(1))
+            await egress_limiter.set_ban_until(time.monotonic() + max(0, ts_ms / 1000 - time.time()))
+        else:
+            await egress_limiter.set_ban_until(time.monotonic() + egress_limiter.interval)
+    elif exc.code == -1015 and is_order:
+        order_limiter.exhaust()
+
 
 async def _limited_request(self, method, uri: str, signed: bool, force_params: bool=False, **kwargs):
-    weight = kwargs.pop("weight", 1)
-    await limiter.acquire(weight)
+    if RESPONSE_CACHE_ENABLED and not signed and method.lower() == "get":
+        shared = SharedPriority.for_caller()
+
+        async def send():
+            # Paylaşılan istek bekleyenlerin en yüksek önceliğiyle çalışır
+            with shared_priority(shared):
+                return await _routed_request(self, method, uri, signed, force_params=force_params, **kwargs)
+
+        return await response_cache.fetch(uri, kwargs.get("data"), send, shared)
+    return await _routed_request(self, method, uri, signed, force_params=force_params, **kwargs)
+
+
+def _is_order(method: str, uri: str) -> bool:
+    return method.lower() == "post" and uri.split("?", 1)[0].endswith("/v3/order")
+
+
+def _hedgeable(method: str, uri: str, signed: bool) -> bool:
+    """Yedek istek yalnızca açıkça karar etiketli, imzasız ve hafif GET'lere gönderilir."""
+    if signed or method.lower() != "get" or _tagged_priority() != PRIORITY_DECISION:
+        return False
+    path = uri.split("?", 1)[0]
+    return "/api/" in path and path.split("/api/", 1)[1] in HEDGE_PATHS
+
+
+def _copy_kwargs(kwargs: dict) -> dict:
+    """Kütüphane imzalarken parametreleri yerinde değiştirdiği için her deneme kopya alır."""
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        return dict(kwargs, data=dict(data))
+    return dict(kwargs)
+
+
+def _status_unknown(exc: BaseException) -> bool:
+    """Emrin borsaya ulaşıp ulaşmadığı bilinmiyor (zaman aşımı, bağlantı ya da 5xx)."""
+    if isinstance(exc, BinanceAPIException):
+        return exc.status_code >= 500
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+async def _timed_request(self, base: str, method, uri: str, signed: bool, force_params: bool, kwargs: dict):
+    start = time.monotonic()
     try:
-        result = await _original_request(self, method, uri, signed, force_params=force_params, **kwargs)
-    except BinanceAPIException as exc:
-        if exc.code == -1003:
-            match = re.search(r"until (\d+)", str(exc))
-            if match:
-                ts_ms = int(match.group(1))
-                await limiter.set_ban_until(time.monotonic() + max(0, ts_ms / 1000 - time.time()))
-            else:
-                await limiter.set_ban_until(time.monotonic() + limiter.interval)
+        result = await _send_request(self, method, uri, signed, force_params=force_params, **_copy_kwargs(kwargs))
+    except Exception as exc:
+        if is_degraded(exc) and not isinstance(exc, CircuitOpenError):
+            endpoints.fail(base)
+        raise
+    endpoints.record(base, time.monotonic() - start)
+    return result
+
+
+async def _routed_request(self, method, uri: str, signed: bool, force_params: bool=False, **kwargs):
+    current = endpoints.base_of(uri)
+    if current is None:
+        return await _send_request(self, method, uri, signed, force_params=force_params, **kwargs)
+    if _is_order(method, uri):
+        return await _send_order(self, uri, current, signed, force_params, kwargs)
+    base = endpoints.pick()
+    delay = None
+    if _hedgeable(method, uri, signed):
+        delay = endpoints.hedge_delay(base)
+    if delay is None:
+        target = endpoints.rewrite(uri, current, base)
+        return await _timed_request(self, base, method, target, signed, force_params, kwargs)
+    return await _hedged_request(self, method, uri, current, base, delay, signed, force_params, kwargs)
+
+
+async def _hedged_request(
+    self, method, uri: str, current: str, first: str, delay: float, signed: bool, force_params: bool, kwargs: dict
+):
+    """İlk adres p95 süresinde yanıt vermezse ikinci adrese de sor; önce gelen kazanır."""
+    primary = asyncio.ensure_future(
+        _timed_request(self, first, method, endpoints.rewrite(uri, current, first), signed, force_params, kwargs)
+    )
+    tasks = {primary}
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            second = next(b for b in endpoints.ranked() if b != first)
+            endpoints.hedges += 1
+            tasks.add(
+                asyncio.ensure_future(
+                    _timed_request(
+                        self, second, method, endpoints.rewrite(uri, current, second), signed, force_params, kwargs
+                    )
+                )
+            )
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None:
+                    if task is not primary:
+                        endpoints.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _find_order(self, symbol: str, client_id: str) -> Optional[dict]:
+    """Durumu bilinmeyen emri istemci kimliğiyle sorgula; yoksa None."""
+    with priority(PRIORITY_ORDER):
+        try:
+            return await self.get_order(symbol=symbol, origClientOrderId=client_id)
+        except BinanceAPIException as exc:
+            if exc.code == -2013:
+                return None
+            raise
+
+
+async def _await_order(self, symbol: str, client_id: str) -> Optional[dict]:
+    """Emri ``ORDER_STATUS_TIMEOUT`` boyunca artan aralıklarla ara; bulunamazsa None.
+
+    Durumu bilinmeyen emir hâlâ eşleştirme motorunda olabilir; tek bir -2013
+    yanıtı emrin borsaya ulaşmadığını göstermez.
+    """
+    deadline = time.monotonic() + ORDER_STATUS_TIMEOUT
+    attempt = 0
+    while True:
+        try:
+            existing = await _find_order(self, symbol, client_id)
+        except Exception as exc:
+            if not (_status_unknown(exc) or isinstance(exc, CircuitOpenError)):
+                raise
+            existing = None
+        if existing is not None:
+            return existing
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(backoff_delay(attempt, maximum=2.0), remaining))
+
+
+async def _send_order(self, uri: str, current: str, signed: bool, force_params: bool, kwargs: dict):
+    """Emri en hızlı adrese gönder; sonuç bilinmiyorsa emri borsada ara.
+
+    Emir süre dolana kadar bulunamazsa yalnızca ``ORDER_RESEND_TYPES``
+    içindeki türler aynı ``newClientOrderId`` ile başka adresten yeniden
+    gönderilir; diğerlerinde (varsayılan olarak tümü) özgün hata yükseltilir.
+    """
+    data = kwargs.get("data")
+    if isinstance(data, dict) and not data.get("newClientOrderId"):
+        data["newClientOrderId"] = "fb" + uuid.uuid4().hex[:22]
+    client_id = data.get("newClientOrderId") if isinstance(data, dict) else None
+    resend = isinstance(data, dict) and str(data.get("type", "")).upper() in ORDER_RESEND_TYPES
+    attempts = endpoints.ranked()[:max(1, ORDER_ENDPOINT_ATTEMPTS)]
+    for attempt, base in enumerate(attempts):
+        target = endpoints.rewrite(uri, current, base)
+        try:
+            return await _timed_request(self, base, "post", target, signed, force_params, kwargs)
+        except Exception as exc:
+            if client_id is None or not _status_unknown(exc):
+                raise
+            log(f"{data.get('symbol')} emri {base} üzerinde belirsiz kaldı ({exc}), sorgulanıyor")
+            existing = await _await_order(self, data.get("symbol"), client_id)
+            if existing is not None:
+                return existing
+            if not resend or attempt == len(attempts) - 1:
+                log(f"{data.get('symbol')} emrinin durumu bilinmiyor ({client_id}), yeniden gönderilmedi")
+                raise
+            endpoints.order_retries += 1
+
+
+async def _await_breaker(breaker) -> None:
+    """Devre yarı açılıp bu istek deneme olarak geçebilene ya da devre kapanana kadar bekle."""
+    while not breaker.allow():
+        await asyncio.sleep(max(breaker.retry_in(), 0.05))
+
+
+async def _send_request(self, method, uri: str, signed: bool, force_params: bool=False, **kwargs):
+    weight = kwargs.pop("weight", None)
+    if weight is None:
+        weight = endpoint_weight(method, uri, kwargs.get("data"))
+    level = current_priority()
+    is_order = _is_order(method, uri)
+    if is_order:
+        level = PRIORITY_ORDER
+    breaker = breakers.get(endpoint_family(uri))
+    # Emirler devre açıkken de gönderilir; arka plan ve etkileşimli istekler
+    # ağırlık harcamadan reddedilir, karar istekleri devrenin denenmesini bekler
+    if not breaker.allow() and level != PRIORITY_ORDER:
+        if level >= PRIORITY_INTERACTIVE:
+            raise breaker.reject()
+        await _await_breaker(breaker)
+    if is_order:
+        await order_limiter.acquire()
+    egress = router.pick(level)
+    egress_limiter = egress.limiter
+    await egress_limiter.acquire(weight, level)
+    egress.requests += 1
+    target = egress.bind(self)
+    try:
+        result = await _original_request(target, method, uri, signed, force_params=force_params, **kwargs)
+    except Exception as exc:
+        if is_degraded(exc):
+            breaker.failure()
+        else:
+            breaker.success()
+        if isinstance(exc, BinanceAPIException):
+            await _note_api_error(exc, egress_limiter, is_order)
+        raise
+    except BaseException:
+        breaker.abandon()
         raise
     else:
+        breaker.success()
         used = 0
         try:
-            used = int(self.response.headers.get("X-MBX-USED-WEIGHT-1M", 0))
+            used = int(target.response.headers.get("X-MBX-USED-WEIGHT-1M", 0))
         except Exception:
             pass
         if used:
-            await limiter.update_used(used)
+            await egress_limiter.update_used(used)
+            concurrency.observe(used, egress_limiter.limit)
+        if is_order:
+            order_limiter.update(target.response.headers)
         return result
+    finally:
+        if target is not self:
+            self.response = target.response
+
+
+async def _close_connection(self):
+    for egress in router.egresses:
+        await egress.close(self)
+    await _original_close_connection(self)
+
 
 AsyncClient._request = _limited_request
+AsyncClient.close_connection = _close_connection
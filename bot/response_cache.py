@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from bot.utils import detached_task, interval_to_seconds, seconds_until_candle_close
+
+# Imzasiz GET yanitlari onbellege alinsin ve ayni anda yapilan istekler birlestirilsin mi
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+# Fiyat/ticker yanitlarinin gecerlilik suresi (saniye)
+RESPONSE_CACHE_TICKER_TTL = float(os.getenv("RESPONSE_CACHE_TICKER_TTL", "1"))
+# exchangeInfo yanitinin gecerlilik suresi (saniye)
+RESPONSE_CACHE_EXCHANGE_INFO_TTL = float(os.getenv("RESPONSE_CACHE_EXCHANGE_INFO_TTL", "3600"))
+
+_MAX_ENTRIES = 2048
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _ticker_ttl(params: dict) -> float:
+    return RESPONSE_CACHE_TICKER_TTL
+
+
+def _klines_ttl(params: dict) -> float:
+    """Acik mum kapanana kadar; sinira cok yakin yanitlar saklanmaz.
+
+    Sinirdan hemen sonra sunucu yeni mumu henuz eklememis olabilir.
+    """
+    interval = params.get("interval")
+    if not interval:
+        return 0.0
+    try:
+        remaining = seconds_until_candle_close(interval)
+        step = interval_to_seconds(interval)
+    except (KeyError, ValueError):
+        return 0.0
+    if remaining < 1 or step - remaining < 1:
+        return 0.0
+    return remaining
+
+
+def _exchange_info_ttl(params: dict) -> float:
+    return RESPONSE_CACHE_EXCHANGE_INFO_TTL
+
+
+# /api/ sonrasi yol -> gecerlilik suresi; listede olmayan GET'ler sadece birlestirilir
+CACHE_RULES: Dict[str, Callable[[dict], float]] = {
+    "v3/ticker/price": _ticker_ttl,
+    "v3/ticker/bookTicker": _ticker_ttl,
+    "v3/ticker/24hr": _ticker_ttl,
+    "v3/avgPrice": _ticker_ttl,
+    "v3/klines": _klines_ttl,
+    "v3/uiKlines": _klines_ttl,
+    "v3/exchangeInfo": _exchange_info_ttl,
+}
+
+
+def _path(uri: str) -> str:
+    path = uri.split("?", 1)[0]
+    return path.split("/api/", 1)[1] if "/api/" in path else path
+
+
+class ResponseCache:
+    """Imzasiz GET yanitlari icin TTL onbellegi ve istek birlestirici.
+
+    Ayni anahtarla (yol + parametreler) ucusta bir istek varsa yeni cagiran
+    ayni sonucu bekler. Basarili yanitlar kurala gore belirlenen sure boyunca
+    saklanir; hatalar saklanmaz. Donen nesne tum cagiranlar arasinda
+    paylasildigindan salt okunur kabul edilmelidir.
+
+    Paylasilan istek ilk cagiranin baglamini devralmaz. ``state`` verilirse
+    (``merge`` yontemi olan nesne) sonradan katilanlarin durumu ucustaki
+    istegin durumuyla birlestirilir; rate_limiter bunu oncelik icin kullanir.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Callable[[dict], float]]] = None):
+        self.rules = dict(CACHE_RULES if rules is None else rules)
+        self.entries: Dict[Key, Tuple[float, object]] = {}
+        self._inflight: Dict[Key, asyncio.Task] = {}
+        self._states: Dict[Key, object] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(uri: str, params: Optional[dict]) -> Key:
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return uri.split("?", 1)[0], items
+
+    def _store(self, key: Key, expires: float, value) -> None:
+        now = time.monotonic()
+        if len(self.entries) >= _MAX_ENTRIES:
+            self.entries = {k: e for k, e in self.entries.items() if e[0] > now}
+            if len(self.entries) >= _MAX_ENTRIES:
+                self.entries.clear()
+        self.entries[key] = (expires, value)
+
+    async def fetch(
+        self,
+        uri: str,
+        params: Optional[dict],
+        send: Callable[[], Awaitable],
+        state=None,
+    ):
+        """Onbellekte gecerli yanit varsa onu, yoksa (birlestirilmis) istek sonucunu dondur."""
+        key = self.key(uri, params)
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            del self.entries[key]
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            shared = self._states.get(key)
+            if shared is not None and state is not None:
+                shared.merge(state)
+            return await asyncio.shield(task)
+        self.misses += 1
+        rule = self.rules.get(_path(uri))
+        ttl = rule(params or {}) if rule else 0.0
+        expires = time.monotonic() + ttl
+
+        async def run():
+            try:
+                value = await send()
+                if ttl > 0:
+                    self._store(key, expires, value)
+                return value
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+                    self._states.pop(key, None)
+
+        task = detached_task(run())
+        self._inflight[key] = task
+        if state is not None:
+            self._states[key] = state
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def invalidate(self, path: str) -> None:
+        """``/api/`` sonrasi yolu verilen uc noktanin saklanan yanitlarini sil."""
+        for key in [k for k in self.entries if _path(k[0]) == path]:
+            del self.entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.coalesced + self.misses
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+        }
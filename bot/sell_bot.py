@@ -9,15 +9,44 @@ from bot.utils import (
     FifoTracker,
     get_current_utc_iso,
     log,
-    extract_step_size,
     extract_min_qty,
     extract_min_notional,
-    floor_to_step,
+    quantize_orders,
+    symbol_filters,
     seconds_until_next_midnight,
+    seconds_until_candle_close,
+    backoff_delay,
     load_env,
 )
+from bot.balance_book import BalanceBook
+from bot.dispatcher import OrderedEventQueue, TickDispatcher
+from bot.order_book import ORDER_BOOK_ENABLED, OrderBookMirror
+from bot.order_flow import ORDER_FLOW_ENABLED, OrderFlowStore
+from bot.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_DECISION,
+    breakers,
+    concurrency,
+    endpoints,
+    prioritized,
+    response_cache,
+)
+from bot.triggers import TriggerBook
+from bot.ws_parse import PriceParser, Tick, Trade
+from bot.price_stream import (
+    FEED_ALL_MINI_TICKER,
+    PRICE_FEED,
+    PRICE_STREAMS_PER_CONNECTION,
+    RECONNECT_BACKOFF_MAX,
+    STREAM_STALE_SECONDS,
+    ShardedPriceStream,
+    ShardStatus,
+    depth_stream_names,
+    stream_names,
+    trade_stream_names,
+)
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timezone
 
 import requests
@@ -47,11 +76,18 @@ MIN_FOLLOW_NOTIONAL = float(os.getenv("MIN_FOLLOW_NOTIONAL", "5"))
 CANDLE_INTERVAL = os.getenv("CANDLE_INTERVAL", "1m")
 TARGET_STEPS = int(os.getenv("TARGET_STEPS", "3"))
 GROUP_SIZE = int(os.getenv("GROUP_SIZE", "10"))
-CONCURRENCY_LIMIT = int(os.getenv("CONCURRENCY_LIMIT", "5"))
 BUY_DB_PATH = os.getenv("BUY_DB_PATH", "buy.db")
 STOP_LOSS_ENABLED = os.getenv("STOP_LOSS_ENABLED", "false").lower() == "true"
 ATR_PERIOD = int(os.getenv("ATR_PERIOD", "14"))
 STOP_LOSS_MULTIPLIER = float(os.getenv("STOP_LOSS_MULTIPLIER", "1.0"))
+# Kullanıcı akışı bu kadar saniye sessiz kalırsa yeniden bağlanılır (0 kapatır).
+# Akış işlem olmadığında doğal olarak sessizdir; varsayılan listenKey yenileme
+# aralığından (5 dk) ve anahtarın geçerlilik süresinden (60 dk) uzundur, böylece
+# sakin bir hesapta saatte en fazla bir yeniden bağlanma ve bakiye eşitlemesi olur.
+USER_STREAM_STALE_SECONDS = float(os.getenv("USER_STREAM_STALE_SECONDS", "3900"))
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "5"))
+# Bu süre içinde websocket fiyatı gelmeyen semboller REST ile kontrol edilir
+STALE_TICK_SECONDS = float(os.getenv("STALE_TICK_SECONDS", "60"))
 
 
 def _ema(values, period):
@@ -138,6 +174,60 @@ class Position:
     targets_str: str = ""
     extreme_logged: bool = False
     hit_top_target: bool = False
+    last_trade_id: int = -1
+    ladder: Optional["TargetLadder"] = None
+
+
+@dataclass
+class TargetLadder:
+    """Pozisyonun hedef merdiveni; girdileri değişmedikçe yeniden hesaplanmaz."""
+
+    key: tuple
+    steps: List[float]
+    targets: List[float]
+    base_price: float
+    extreme_price: float
+
+
+def build_ladder(
+    avg_price: float, vol: float, open_price: Optional[float], btc_above_sma7: bool
+) -> TargetLadder:
+    """Ortalama maliyet, mum oynaklığı, açılış fiyatı ve BTC rejimine göre hedefleri hesapla."""
+    base = FEE_BUY + FEE_SELL + MIN_PROFIT
+    key = (avg_price, vol, open_price, btc_above_sma7, base, TARGET_STEPS)
+    steps = [base]
+    if btc_above_sma7 and vol > base:
+        steps.extend(
+            base + (vol - base) * i / TARGET_STEPS for i in range(1, TARGET_STEPS + 1)
+        )
+    steps = sorted(set(steps))
+    base_price = avg_price
+    if btc_above_sma7 and open_price and open_price > avg_price:
+        base_price = base_price + ((open_price - base_price) / 2)
+    targets = [base_price * (1 + s) for s in steps]
+    return TargetLadder(key, steps, targets, base_price, base_price * (1 + steps[-1] * 5))
+
+
+def last_trade_id(trades) -> int:
+    """İşlem listesindeki en büyük işlem kimliği; liste boşsa -1."""
+    return max((int(t.get("id", -1)) for t in trades), default=-1)
+
+
+def order_fill_price(order: dict) -> Optional[float]:
+    """Emir yanıtındaki gerçekleşme fiyatı.
+
+    Yeniden denenen emirlerde sorgu yanıtı ``fills`` içermez; bu durumda
+    ortalama fiyat gerçekleşen miktar ve tutardan hesaplanır.
+    """
+    fills = order.get("fills") or []
+    if fills:
+        return float(fills[0]["price"])
+    executed = float(order.get("executedQty", 0) or 0)
+    quote = float(order.get("cummulativeQuoteQty", 0) or 0)
+    if executed > 0 and quote > 0:
+        return quote / executed
+    return None
+
 
 class SellBot:
     def __init__(self, client: AsyncClient):
@@ -155,7 +245,26 @@ class SellBot:
         self.btc_above_sma7 = False
         self.group_index = 0
         self.start_notified = False
-        self.price_socket_task = None
+        self.bsm = None
+        self.price_stream: Optional[ShardedPriceStream] = None
+        self.dispatcher = TickDispatcher(self._evaluate_tick)
+        self.triggers = TriggerBook()
+        self.price_parser = PriceParser(PRICE_FEED)
+        self.last_tick: Dict[str, float] = {}
+        self.balances = BalanceBook(client)
+        self.user_events = OrderedEventQueue(self.handle_msg)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._rerun_price: Dict[str, Optional[float]] = {}
+        self._pending_sells: Set[str] = set()
+        self.joined_evaluations = 0
+        self.rerun_evaluations = 0
+        self.duplicate_sells = 0
+        self.fallback_count = 0
+        self.order_flow = OrderFlowStore()
+        self.order_book = OrderBookMirror(client)
+        self._candle_inputs: Dict[str, Tuple[float, float, Optional[float]]] = {}
+        self.ladder_listeners: List = []
+        self.user_stream_last_message = 0.0
 
     def _save_recent_sell(self, symbol: str, dt: datetime) -> None:
         self.buy_db.execute(
@@ -191,53 +300,220 @@ class SellBot:
         """API durumunu dakikada bir izle."""
         while True:
             await self.check_api()
+            self.log_stream_stats()
             await asyncio.sleep(60)
 
-    async def restart_price_socket(self) -> None:
-        """Takip edilen semboller değiştiğinde fiyat akışını yenile."""
-        if self.price_socket_task:
-            self.price_socket_task.cancel()
+    def log_stream_stats(self) -> None:
+        """Fiyat akışı, kullanıcı olayları ve REST katmanı (devre kesici, önbellek, adres) metriklerini yaz."""
+        events = self.user_events.stats()
+        if events["processed"] or events["depth"]:
+            log(
+                f"Kullanıcı olayları: işlenen={events['processed']}, bekleyen={events['depth']} "
+                f"(maks {events['max_depth']}), gecikme={events['last_latency']:.3f}s "
+                f"(maks {events['max_latency']:.3f}s)"
+            )
+        circuit = breakers.stats()
+        if any(b["state"] != "closed" or b["rejected"] for b in circuit.values()):
+            log(
+                "Devre kesiciler: "
+                + ", ".join(
+                    f"{name}={b['state']} (reddedilen={b['rejected']}, açılma={b['trips']}, "
+                    f"kalan={b['retry_in']:.1f}s)"
+                    for name, b in circuit.items()
+                )
+            )
+        cache = response_cache.stats()
+        if cache["misses"]:
+            log(
+                f"REST önbelleği: isabet={cache['hits']}, birleşen={cache['coalesced']}, "
+                f"istek={cache['misses']}, oran={cache['hit_rate']:.0%}"
+            )
+        routes = endpoints.stats()
+        if any(r["requests"] for r in routes.values()):
+            log(
+                "REST adresleri: "
+                + ", ".join(
+                    f"{base.split('//')[-1].split('.')[0]}="
+                    + (f"{r['ewma'] * 1000:.0f}ms" if r["ewma"] is not None else "-")
+                    + (f" (hata {r['failures']})" if r["failures"] else "")
+                    for base, r in routes.items()
+                )
+                + f", yedek istek={endpoints.hedges} (kazanan {endpoints.hedge_wins}), "
+                f"yeniden denenen emir={endpoints.order_retries}"
+            )
+        stats = self.dispatcher.stats()
+        if not stats["received"]:
+            return
+        log(
+            f"Fiyat akışı: alınan={stats['received']}, birleşen={stats['coalesced']}, "
+            f"atılan={stats['dropped']}, bekleyen={stats['pending']}, "
+            f"kuyruk süresi={stats['last_queue_age']:.3f}s (maks {stats['max_queue_age']:.3f}s), "
+            f"maks gecikme={stats['max_latency']:.3f}s, "
+            f"eşik atlanan={self.triggers.skipped}, tetiklenen={self.triggers.woken}, "
+            f"birleşen değerlendirme={self.joined_evaluations}, "
+            f"tekrar çalışan={self.rerun_evaluations}, engellenen satış={self.duplicate_sells}"
+        )
+
+    def stale_symbols(self, max_age: float = STREAM_STALE_SECONDS) -> List[str]:
+        """Son ``max_age`` saniyede websocket fiyatı gelmeyen takip edilen semboller."""
+        now = time.monotonic()
+        return [
+            s for s in self.positions if now - self.last_tick.get(s, 0.0) > max_age
+        ]
+
+    async def monitor_streams(self) -> None:
+        """Sessiz kalan fiyat bağlantılarını yeniden kur."""
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            if self.price_stream is None:
+                continue
             try:
-                await self.price_socket_task
-            except asyncio.CancelledError:
-                pass
+                restarted = await self.price_stream.check_stale()
+            except Exception as exc:
+                log(f"Akış denetimi hatası: {exc}")
+                continue
+            if restarted:
+                log(
+                    f"{restarted} fiyat bağlantısı yeniden kuruldu, "
+                    f"fiyatsız sembol={len(self.stale_symbols())}"
+                )
+
+    async def restart_price_socket(self) -> None:
+        """Takip edilen semboller değiştiğinde fiyat akışını yeniden dağıt."""
         if not getattr(self, "bsm", None):
             return
-        if self.positions:
-            self.price_socket_task = asyncio.create_task(
-                self.listen_price_socket(self.bsm)
+        if self.price_stream is None:
+            per_symbol = 1 + self._order_flow_active() + self._order_book_active()
+            self.price_stream = ShardedPriceStream(
+                self._price_listener,
+                max_streams=PRICE_STREAMS_PER_CONNECTION // per_symbol,
+                feed=PRICE_FEED,
             )
-        else:
-            self.price_socket_task = None
-
-    async def listen_price_socket(self, bsm: BinanceSocketManager):
-        """Tüm semboller için anlık fiyat güncellemelerini dinle."""
-        if not self.positions:
+        await self.price_stream.update(self.positions.keys())
+        self.order_flow.forget(self.positions.keys())
+        self.order_book.forget(self.positions.keys())
+        for symbol in self.dispatcher.pending():
+            if symbol not in self.positions:
+                self.dispatcher.discard(symbol)
+
+    @staticmethod
+    def _order_flow_active() -> bool:
+        """Hacim deposu sembol bazlı akışlarla beslenebiliyor mu."""
+        return ORDER_FLOW_ENABLED and PRICE_FEED != FEED_ALL_MINI_TICKER
+
+    @staticmethod
+    def _order_book_active() -> bool:
+        """Emir defteri aynası sembol bazlı akışlarla beslenebiliyor mu."""
+        return ORDER_BOOK_ENABLED and PRICE_FEED != FEED_ALL_MINI_TICKER
+
+    async def _price_listener(self, symbols: List[str], status: ShardStatus) -> None:
+        await self.listen_price_socket(self.bsm, symbols, status)
+
+    async def listen_price_socket(
+        self,
+        bsm: BinanceSocketManager,
+        symbols: Optional[List[str]] = None,
+        status: Optional[ShardStatus] = None,
+    ):
+        """Verilen semboller için anlık fiyat güncellemelerini dinle."""
+        if symbols is None:
+            symbols = list(self.positions.keys())
+        if not symbols:
             return
-        streams = [s.lower() + "@ticker" for s in self.positions.keys()]
+        streams = stream_names(symbols, PRICE_FEED)
+        if self._order_flow_active():
+            streams += trade_stream_names(symbols)
+        if self._order_book_active():
+            streams += depth_stream_names(symbols)
         path = "/".join(streams)
         async with bsm._get_socket(path) as stream:
-            log("Fiyat websocket bağlandı")
+            self.price_parser.install(stream)
+            log(f"Fiyat websocket bağlandı ({len(streams)} akış)")
+            if status is not None:
+                status.connected = True
+                status.last_error = ""
+                status.last_message = time.monotonic()
+            # Kopukluk sırasında kaçan mumlar nedeniyle eşikler yeniden hesaplanmalı
+            for symbol in symbols:
+                self.triggers.invalidate(symbol)
+            if self._order_flow_active():
+                self.order_flow.mark_connected(symbols)
+            if self._order_book_active():
+                self.order_book.reset(symbols)
             while True:
                 msg = await stream.recv()
-                if isinstance(msg, dict):
-                    msg = [msg]
-                for item in msg:
-                    symbol = item.get("s")
-                    if symbol in self.positions:
-                        price = float(item.get("c", 0))
-                        position = self.positions[symbol]
-                        await self._check_symbol(symbol, position, price=price)
+                now = time.monotonic()
+                if status is not None:
+                    status.last_message = now
+                    status.messages += 1
+                for item in self.price_parser.normalize(msg):
+                    if type(item) is Trade:
+                        self.order_flow.add_trade(
+                            item.symbol, item.price, item.qty, item.buyer_maker, item.time
+                        )
+                        continue
+                    if not isinstance(item, Tick):
+                        if isinstance(item, dict) and item.get("e") == "depthUpdate":
+                            if self.order_book.apply_diff(item):
+                                self.order_book.schedule_resync(item["s"])
+                            continue
+                        if isinstance(item, dict) and item.get("e") == "error":
+                            log(f"Fiyat websocket hatası: {item.get('m')}")
+                            raise ConnectionError(item.get("m"))
+                        continue
+                    if item.symbol in self.positions and item.price:
+                        self.last_tick[item.symbol] = now
+                        self.dispatcher.submit(item.symbol, item.price)
+
+    async def _evaluate_tick(self, symbol: str, price: float) -> None:
+        """Dağıtıcıdan gelen en güncel fiyatı değerlendir."""
+        position = self.positions.get(symbol)
+        if position is None:
+            return
+        await self._check_symbol(symbol, position, price=price)
 
     async def _check_symbol(
         self, symbol: str, position: Position, price: Optional[float] = None
     ) -> None:
+        """Sembol zaten değerlendiriliyorsa ona katıl; yeni fiyat varsa bir kez daha çalıştır."""
+        running = self._inflight.get(symbol)
+        if running is not None and running.get_loop() is asyncio.get_running_loop():
+            self.joined_evaluations += 1
+            if price is not None:
+                self._rerun_price[symbol] = price
+            await asyncio.shield(running)
+            return
+        done = asyncio.get_running_loop().create_future()
+        self._inflight[symbol] = done
+        try:
+            await self._evaluate_symbol(symbol, position, price)
+            while symbol in self._rerun_price:
+                newest = self._rerun_price.pop(symbol)
+                position = self.positions.get(symbol)
+                if position is None:
+                    break
+                self.rerun_evaluations += 1
+                await self._evaluate_symbol(symbol, position, newest)
+        finally:
+            self._rerun_price.pop(symbol, None)
+            self._inflight.pop(symbol, None)
+            done.set_result(None)
+
+    @prioritized(PRIORITY_DECISION)
+    async def _evaluate_symbol(
+        self, symbol: str, position: Position, price: Optional[float] = None
+    ) -> None:
+        # Websocket fiyatı hiçbir eşiği geçmediyse karar değişmez
+        if price is not None and not self.triggers.should_evaluate(
+            symbol, price, position.peak
+        ):
+            return
         qty = position.tracker.total_qty()
         if qty < position.min_qty:
             return
         avg_price = position.tracker.average_price()
         try:
-            bal = await self.client.get_asset_balance(asset=symbol.replace("USDT", ""))
+            bal = await self.balances.get_asset_balance(asset=symbol.replace("USDT", ""))
             wallet_qty = float(bal.get("free", 0)) + float(bal.get("locked", 0))
         except Exception:
             wallet_qty = qty
@@ -286,15 +562,19 @@ class SellBot:
     async def monitor_btc_sma(self):
         """BTC fiyatının SMA7 üzerindeki durumunu 15 dakikada bir güncelle."""
         while True:
-            self.btc_above_sma7 = await self.is_btc_above_sma7()
+            above = await self.is_btc_above_sma7()
+            if above != self.btc_above_sma7:
+                self.triggers.invalidate()
+            self.btc_above_sma7 = above
             now = datetime.now(timezone.utc)
             wait = (15 - (now.minute % 15)) * 60 - now.second
             await asyncio.sleep(max(wait, 0))
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def check_new_balances(self) -> None:
         """Cüzdanda bulunan yeni sembolleri tarayıp takibe ekle."""
         try:
-            account = await self.client.get_account()
+            account = await self.balances.get_account()
         except BinanceAPIException as exc:
             log(f"Yeni bakiye alınamadı: {exc}")
             return
@@ -302,10 +582,8 @@ class SellBot:
         balances = account.get("balances", [])
         old = set(self.positions.keys())
 
-        sem = asyncio.Semaphore(CONCURRENCY_LIMIT)
-
         async def scan_symbol(bal):
-            async with sem:
+            async with concurrency:
                 free = float(bal.get("free", 0))
                 locked = float(bal.get("locked", 0))
                 qty = free + locked
@@ -369,9 +647,11 @@ class SellBot:
 
                 if existing:
                     old_avg = existing.tracker.average_price()
+                    self.triggers.invalidate(symbol)
                     existing.tracker = tracker
                     existing.min_qty = min_qty
                     existing.min_notional = min_notional
+                    existing.last_trade_id = max(existing.last_trade_id, last_trade_id(trades))
                     avg = tracker.average_price()
                     if abs(avg - old_avg) > 1e-8:
                         log(f"{symbol} ortalama guncellendi: {avg:.8f}")
@@ -380,7 +660,9 @@ class SellBot:
                             f"💹 *Yeni Ortalama:* `{avg:.8f}`"
                         )
                 else:
-                    self.positions[symbol] = Position(tracker, min_qty, min_notional)
+                    self.positions[symbol] = Position(
+                        tracker, min_qty, min_notional, last_trade_id=last_trade_id(trades)
+                    )
                     avg = tracker.average_price()
                     log(
                         f"{symbol} bakiyesi bulundu: miktar={tracker.total_qty():.8f}, ortalama={avg:.8f}"
@@ -406,6 +688,7 @@ class SellBot:
             await self.restart_price_socket()
 
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def fetch_all_trades(self, symbol: str):
         """Tüm geçmiş işlemleri baştan sona sayfalayarak getir."""
         all_trades = []
@@ -433,7 +716,7 @@ class SellBot:
     async def get_total_usdt_value(self) -> float:
         """Tüm bakiyenin USDT karşılığını hesapla."""
         try:
-            account = await self.client.get_account()
+            account = await self.balances.get_account()
         except BinanceAPIException as exc:
             log(f"Bakiye alınamadı: {exc}")
             return 0.0
@@ -488,6 +771,7 @@ class SellBot:
         rows = cur.fetchall()
         return rows[::-1]
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def daily_balance_loop(self):
         """Her gün UTC-0'a göre gün sonunda bakiye raporu gönder."""
         while True:
@@ -534,25 +818,23 @@ class SellBot:
         asyncio.create_task(self.daily_balance_loop())
         asyncio.create_task(self.monitor_api())
         asyncio.create_task(self.monitor_btc_sma())
-        self.price_socket_task = asyncio.create_task(
-            self.listen_price_socket(bsm)
-        )
+        asyncio.create_task(self.monitor_streams())
+        await self.restart_price_socket()
         log("Kullanıcı websocket dinlemesi başladı")
 
+    @prioritized(PRIORITY_BACKGROUND)
     async def load_balances(self):
         """Başlangıçta mevcut bakiyeleri pozisyonlara ekle."""
         try:
-            account = await self.client.get_account()
+            account = await self.balances.get_account()
         except BinanceAPIException as exc:
             log(f"Bakiye alınamadı: {exc}")
             return
 
         balances = account.get("balances", [])
 
-        sem = asyncio.Semaphore(CONCURRENCY_LIMIT)
-
         async def load_symbol(bal):
-            async with sem:
+            async with concurrency:
                 free = float(bal.get("free", 0))
                 locked = float(bal.get("locked", 0))
                 qty = free + locked
@@ -614,7 +896,9 @@ class SellBot:
                     #log(f"{symbol} miktar {tracker.total_qty():.8f} veya notional {tracker.total_qty() * last_price:.8f} takip sınırının altında")
                     return
 
-                self.positions[symbol] = Position(tracker, min_qty, min_notional)
+                self.positions[symbol] = Position(
+                    tracker, min_qty, min_notional, last_trade_id=last_trade_id(trades)
+                )
                 avg = tracker.average_price()
                 log(f"{symbol} bakiyesi yüklendi: miktar={tracker.total_qty():.8f}, ortalama={avg:.8f}")
                 profit = (last_price - avg) * tracker.total_qty()
@@ -648,13 +932,93 @@ class SellBot:
                     self.api_down = True
 
     async def listen_user_socket(self, bsm: BinanceSocketManager):
-        async with bsm.user_socket() as stream:
-            log("Kullanıcı websocket bağlandı")
-            while True:
-                msg = await stream.recv()
-                await self.handle_msg(msg)
+        """Kullanıcı akışını dinle; kopunca bekleyip yeniden bağlan ve kaçan işlemleri al."""
+        failures = 0
+        connected_before = False
+        timeout = USER_STREAM_STALE_SECONDS or None
+        while True:
+            try:
+                async with bsm.user_socket() as stream:
+                    log("Kullanıcı websocket bağlandı")
+                    self.user_stream_last_message = time.monotonic()
+                    await self.balances.seed()
+                    self.balances.set_live(True)
+                    if connected_before:
+                        # Kopmadan önce alınan dolumlar işlenmeden kaçanlar sorgulanmamalı
+                        await self.user_events.join()
+                        await self.backfill_fills()
+                    connected_before = True
+                    failures = 0
+                    while True:
+                        msg = await asyncio.wait_for(stream.recv(), timeout)
+                        self.user_stream_last_message = time.monotonic()
+                        if msg.get("e") == "error":
+                            raise ConnectionError(msg.get("m"))
+                        self.route_user_event(msg)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                log(f"Kullanıcı websocket {timeout:.0f} sn sessiz, yeniden bağlanılıyor")
+            except Exception as exc:
+                log(f"Kullanıcı websocket hatası: {exc}")
+            finally:
+                self.balances.set_live(False)
+            failures += 1
+            await asyncio.sleep(backoff_delay(failures, maximum=RECONNECT_BACKOFF_MAX))
+
+    async def backfill_fills(self) -> None:
+        """Bağlantı kopukken gerçekleşen işlemleri son görülen işlem kimliğinden itibaren uygula."""
+        applied = 0
+        removed = False
+        for symbol, pos in list(self.positions.items()):
+            if pos.last_trade_id < 0:
+                continue
+            try:
+                trades = await self.client.get_my_trades(
+                    symbol=symbol, fromId=pos.last_trade_id + 1, limit=1000
+                )
+            except Exception as exc:
+                log(f"{symbol} kaçan işlemler alınamadı: {exc}")
+                continue
+            asset = symbol.replace("USDT", "")
+            for tr in sorted(trades, key=lambda x: int(x.get("id", 0))):
+                if int(tr.get("id", -1)) <= pos.last_trade_id:
+                    continue
+                t_qty = float(tr["qty"])
+                commission = float(tr.get("commission", 0))
+                if tr.get("isBuyer"):
+                    if tr.get("commissionAsset") == asset:
+                        t_qty -= commission
+                    pos.tracker.add_trade(t_qty, float(tr["price"]))
+                else:
+                    if tr.get("commissionAsset") == asset:
+                        t_qty += commission
+                    pos.tracker.sell(t_qty)
+                pos.last_trade_id = int(tr["id"])
+                applied += 1
+            self.triggers.invalidate(symbol)
+            if pos.tracker.total_qty() < pos.min_qty:
+                self.positions.pop(symbol, None)
+                removed = True
+        if applied:
+            log(f"Yeniden bağlantı sonrası {applied} kaçan işlem uygulandı")
+        if removed:
+            await self.restart_price_socket()
+
+    def route_user_event(self, msg) -> None:
+        """Bakiye olaylarını hemen uygula, emir raporlarını sembol sırasıyla kuyruğa al."""
+        if self.balances.apply(msg):
+            return
+        if msg.get("e") != "executionReport":
+            return
+        if msg.get("x") == "TRADE" or msg.get("X") == "FILLED":
+            # Hesap olayı gelene kadar bu varlıkların defterdeki bakiyesi eskidir
+            self.balances.mark_stale(msg["s"].replace("USDT", ""), "USDT", msg.get("N"))
+        self.user_events.submit(msg["s"], msg)
 
     async def handle_msg(self, msg):
+        if self.balances.apply(msg):
+            return
         if msg.get("e") != "executionReport":
             return
         symbol = msg["s"]
@@ -664,6 +1028,7 @@ class SellBot:
         price = float(msg.get("L", 0))
         commission = float(msg.get("n", 0))
         comm_asset = msg.get("N")
+        trade_id = int(msg.get("t", -1))
         log(f"Mesaj alindi: {side} {symbol} {qty} {status}")
         if side == "BUY" and status == "FILLED":
             await self.add_buy(symbol, qty, price, commission, comm_asset)
@@ -672,6 +1037,9 @@ class SellBot:
             await self.remove_qty(symbol, qty, commission, comm_asset)
             if before and symbol not in self.positions:
                 await self.restart_price_socket()
+        pos = self.positions.get(symbol)
+        if pos is not None and status == "FILLED":
+            pos.last_trade_id = max(pos.last_trade_id, trade_id)
 
     async def add_buy(self, symbol: str, qty: float, price: float, commission: float = 0.0, commission_asset: Optional[str] = None):
         info = await self.client.get_symbol_info(symbol)
@@ -688,6 +1056,7 @@ class SellBot:
         tracker = self.positions[symbol].tracker
         prev_qty = tracker.total_qty()
         tracker.add_trade(qty, price)
+        self.triggers.invalidate(symbol)
         avg = tracker.average_price()
         log(f"{symbol} alımı: miktar={qty:.8f}, fiyat={price:.8f}, ortalama={avg:.8f}")
         send_telegram(
@@ -726,6 +1095,7 @@ class SellBot:
         if commission_asset and commission_asset == symbol.replace("USDT", ""):
             sell_qty += commission
         tracker.sell(sell_qty)
+        self.triggers.invalidate(symbol)
         total = tracker.total_qty()
         if total < self.positions[symbol].min_qty:
             self.positions.pop(symbol, None)
@@ -744,7 +1114,12 @@ class SellBot:
                 log("BTC SMA25 altinda, tum pozisyonlar satiliyor")
                 await self.sell_all_positions()
                 return
-        items = list(self.positions.items())
+        # Akıştan taze fiyat gelen semboller zaten websocket ile değerlendiriliyor
+        stale = set(self.stale_symbols(STALE_TICK_SECONDS))
+        items = [(s, p) for s, p in self.positions.items() if s in stale]
+        if len(items) != self.fallback_count:
+            log(f"Fiyat akışı eski olan {len(items)}/{len(self.positions)} sembol REST ile kontrol ediliyor")
+            self.fallback_count = len(items)
         if not items:
             return
 
@@ -755,7 +1130,7 @@ class SellBot:
                 group_size = max(1, int(RATE_LIMIT_PER_MINUTE * CHECK_INTERVAL / 60))
         if group_size > 0:
             total_groups = math.ceil(len(items) / group_size)
-            start = self.group_index * group_size
+            start = (self.group_index % total_groups) * group_size
             items = items[start : start + group_size]
             self.group_index = (self.group_index + 1) % total_groups
         tasks = [self._check_symbol(sym, pos) for sym, pos in items]
@@ -763,19 +1138,16 @@ class SellBot:
             await asyncio.gather(*tasks)
 
     async def get_volatility(self, symbol: str) -> float:
-        """Son kapanmis mumun yuzde degisimini pozitif olarak dondur."""
-        try:
-            klines = await self.client.get_klines(
-                symbol=symbol, interval=CANDLE_INTERVAL, limit=2
-            )
-            if len(klines) < 2:
-                return 0.0
-            kline = klines[-2]
-            open_p = float(kline[1])
-            close_p = float(kline[4])
-            return abs(close_p - open_p) / open_p
-        except Exception:
+        """Son kapanmis mumun yuzde degisimini pozitif olarak dondur; API hatasi yukselir."""
+        klines = await self.client.get_klines(
+            symbol=symbol, interval=CANDLE_INTERVAL, limit=2
+        )
+        if len(klines) < 2:
             return 0.0
+        kline = klines[-2]
+        open_p = float(kline[1])
+        close_p = float(kline[4])
+        return abs(close_p - open_p) / open_p
 
     async def calculate_atr(self, symbol: str) -> float:
         """Verilen sembol icin ATR (Average True Range) hesapla."""
@@ -846,17 +1218,17 @@ class SellBot:
             return False
 
     async def get_last_open_price(self, symbol: str) -> Optional[float]:
-        """Son kapanmış mumun açılış fiyatını döndür."""
-        try:
-            klines = await self.client.get_klines(symbol=symbol, interval=CANDLE_INTERVAL, limit=2)
-            if len(klines) < 2:
-                return None
-            return float(klines[-2][1])
-        except Exception:
+        """Son kapanmış mumun açılış fiyatını döndür; API hatası yükselir."""
+        klines = await self.client.get_klines(symbol=symbol, interval=CANDLE_INTERVAL, limit=2)
+        if len(klines) < 2:
             return None
+        return float(klines[-2][1])
 
     async def get_recent_volumes(self, symbol: str, minutes: int = 5) -> Tuple[float, float]:
         """Belirtilen sembol için son `minutes` dakikadaki alış ve satış hacimlerini döndür."""
+        cached = self.order_flow.volumes(symbol, minutes)
+        if cached is not None:
+            return cached
         try:
             end = int(datetime.now(timezone.utc).timestamp() * 1000)
             start = end - minutes * 60 * 1000
@@ -878,8 +1250,9 @@ class SellBot:
             return 0.0, 0.0
 
     async def should_sell(self, symbol: str, last_price: float, avg_price: float) -> bool:
-        vol = await self.get_volatility(symbol)
-        base = FEE_BUY + FEE_SELL + MIN_PROFIT
+        # Eşikler sadece satış yapılmayan kararın sonunda yeniden yayınlanır
+        self.triggers.invalidate(symbol)
+        vol, open_price = await self.candle_inputs(symbol)
         pos = self.positions.get(symbol)
         if pos is None:
             return False
@@ -907,6 +1280,7 @@ class SellBot:
                 log(
                     f"{symbol} Keltner ust bandi asildi ancak hacim veya hedef kosullari saglanmadi"
                 )
+        stop_price = None
         if STOP_LOSS_ENABLED:
             atr = await self.calculate_atr(symbol)
             stop_price = avg_price - atr * STOP_LOSS_MULTIPLIER
@@ -915,31 +1289,9 @@ class SellBot:
                     f"{symbol} stop-loss seviyesi {stop_price:.8f} altinda, satis yapilacak"
                 )
                 return True
-        steps = [base]
-        if self.btc_above_sma7 and vol > base:
-            steps.extend(
-                base + (vol - base) * i / TARGET_STEPS for i in range(1, TARGET_STEPS + 1)
-            )
-        steps = sorted(set(steps))
-        open_price = await self.get_last_open_price(symbol)
-        base_price = avg_price
-        if (
-            self.btc_above_sma7
-            and open_price
-            and open_price > avg_price
-        ):
-            base_price = base_price + ((open_price-base_price)/2)
-        targets = [base_price * (1 + s) for s in steps]
-        target_str = ", ".join(f"{t:.8f}" for t in targets)
-        if target_str != pos.targets_str:
-            log(f"{symbol} hedef fiyatlar güncellendi: {target_str}")
-            pos.targets_str = target_str
-            pos.passed_steps.clear()
-            pos.hit_top_target = False
-            pos.peak = last_price
-        profit_ratio = (last_price - base_price) / base_price if base_price else 0
-        extreme_step = steps[-1]
-        if profit_ratio >= extreme_step * 5:
+        ladder = self.target_ladder(symbol, pos, avg_price, vol, open_price, last_price)
+        steps, targets = ladder.steps, ladder.targets
+        if last_price >= ladder.extreme_price:
             if not pos.extreme_logged:
                 log(
                     f"{symbol} kar hedefin 5 katini asti, hacim onaysiz satilacak"
@@ -956,9 +1308,13 @@ class SellBot:
 
         last_target = targets[-1]
         if last_price >= last_target:
-            trades = await self.client.get_recent_trades(symbol=symbol, limit=60)
-            buy_vol = sum(float(t["qty"]) for t in trades if not t["isBuyerMaker"])
-            sell_vol = sum(float(t["qty"]) for t in trades if t["isBuyerMaker"])
+            recent = self.order_flow.recent(symbol)
+            if recent is not None:
+                buy_vol, sell_vol = recent
+            else:
+                trades = await self.client.get_recent_trades(symbol=symbol, limit=60)
+                buy_vol = sum(float(t["qty"]) for t in trades if not t["isBuyerMaker"])
+                sell_vol = sum(float(t["qty"]) for t in trades if t["isBuyerMaker"])
             decision = sell_vol > buy_vol
             log(
                 f"{symbol} hacim kontrolu: satis={sell_vol:.4f}, alim={buy_vol:.4f}, karar={decision}"
@@ -969,30 +1325,158 @@ class SellBot:
         elif pos.hit_top_target and last_price < last_target:
             log(f"{symbol} en yuksek hedef altina dustu, satis yapilacak")
             return True
+        self._publish_triggers(
+            symbol, pos, last_price, targets, upper_band, stop_price, ladder.extreme_price
+        )
         return False
 
+    async def candle_inputs(self, symbol: str) -> Tuple[float, Optional[float]]:
+        """Son kapanan mumun oynaklığı ve açılışı; mum kapanana kadar önbellekten."""
+        cached = self._candle_inputs.get(symbol)
+        now = time.monotonic()
+        if cached is not None and now < cached[0]:
+            return cached[1], cached[2]
+        # Hata durumunda son bilinen (yoksa nötr) değer kullanılır ama saklanmaz;
+        # böylece tek bir başarısız istek merdiveni mum boyunca dondurmaz
+        failed = False
+        try:
+            vol = await self.get_volatility(symbol)
+        except Exception as exc:
+            log(f"{symbol} oynaklık alınamadı: {exc}")
+            vol, failed = (cached[1] if cached else 0.0), True
+        try:
+            open_price = await self.get_last_open_price(symbol)
+        except Exception as exc:
+            log(f"{symbol} mum açılışı alınamadı: {exc}")
+            open_price, failed = (cached[2] if cached else None), True
+        if failed:
+            return vol, open_price
+        expires = now + seconds_until_candle_close(CANDLE_INTERVAL)
+        self._candle_inputs[symbol] = (expires, vol, open_price)
+        return vol, open_price
+
+    def target_ladder(
+        self,
+        symbol: str,
+        pos: Position,
+        avg_price: float,
+        vol: float,
+        open_price: Optional[float],
+        last_price: float,
+    ) -> TargetLadder:
+        """Girdiler aynıysa mevcut merdiveni döndür, değiştiyse yenisini kurup yayınla."""
+        ladder = pos.ladder
+        base = FEE_BUY + FEE_SELL + MIN_PROFIT
+        key = (avg_price, vol, open_price, self.btc_above_sma7, base, TARGET_STEPS)
+        if ladder is not None and ladder.key == key:
+            return ladder
+        new = build_ladder(avg_price, vol, open_price, self.btc_above_sma7)
+        pos.ladder = new
+        if ladder is None or not _same_targets(new.targets, ladder.targets):
+            self._on_ladder_change(symbol, pos, new, last_price)
+        return new
+
+    def _on_ladder_change(
+        self, symbol: str, pos: Position, ladder: TargetLadder, last_price: float
+    ) -> None:
+        """Hedefler değişti: pozisyon durumunu sıfırla ve dinleyicilere bildir."""
+        pos.targets_str = ", ".join(f"{t:.8f}" for t in ladder.targets)
+        log(f"{symbol} hedef fiyatlar güncellendi: {pos.targets_str}")
+        pos.passed_steps.clear()
+        pos.hit_top_target = False
+        pos.peak = last_price
+        for listener in self.ladder_listeners:
+            listener(symbol, ladder)
+
+    def _publish_triggers(
+        self,
+        symbol: str,
+        pos: Position,
+        last_price: float,
+        targets,
+        upper_band: Optional[float],
+        stop_price: Optional[float],
+        extreme_price: float,
+    ) -> None:
+        """Kararı değiştirebilecek fiyat seviyelerini tetik indeksine yaz.
+
+        Üst Keltner bandı ve son hedef üzerinde karar hacme bağlı olduğundan
+        bu bölgede her fiyat tam değerlendirme tetikler. Mum verisine bağlı
+        eşikler mum kapanışında geçersiz olur.
+        """
+        levels = list(targets)
+        levels.append(extreme_price)
+        if upper_band is not None:
+            levels.append(upper_band)
+        if stop_price is not None:
+            levels.append(stop_price)
+        qty = pos.tracker.total_qty()
+        if qty > 0:
+            levels.append(pos.min_notional / qty)
+        armed_above = targets[-1]
+        if upper_band is not None:
+            armed_above = min(armed_above, upper_band)
+        self.triggers.publish(
+            symbol,
+            levels,
+            last_price,
+            armed_above=armed_above,
+            ttl=seconds_until_candle_close(CANDLE_INTERVAL),
+        )
+
     async def execute_sell(self, symbol: str, qty: float, notify: bool = True):
+        # Aynı sembol için gönderilmiş emir sonuçlanmadan ikinci satış gönderilmez
+        if symbol in self._pending_sells:
+            self.duplicate_sells += 1
+            log(f"{symbol} için bekleyen satış emri var, tekrar gönderilmedi")
+            return
+        self._pending_sells.add(symbol)
+        try:
+            await self._submit_sell(symbol, qty, notify)
+        finally:
+            self._pending_sells.discard(symbol)
+
+    async def _submit_sell(self, symbol: str, qty: float, notify: bool = True):
         info = await self.client.get_symbol_info(symbol)
-        step = extract_step_size(info)
-        min_q = extract_min_qty(info)
+        filters = symbol_filters(info)
         asset = symbol.replace("USDT", "")
         try:
-            bal = await self.client.get_asset_balance(asset=asset)
+            bal = await self.balances.get_asset_balance(asset=asset)
             wallet_qty = float(bal.get("free", 0)) + float(bal.get("locked", 0))
         except Exception:  # pragma: no cover - API hatası
             wallet_qty = qty
-        qty = floor_to_step(wallet_qty, min_q)
-        qty = floor_to_step(qty, step)
-        if qty < step or qty < self.positions[symbol].min_qty:
+        position = self.positions[symbol]
+        batch = quantize_orders([filters], [wallet_qty], [self._exit_price(symbol, position.last_price)])
+        qty = float(batch.qty[0])
+        if qty < filters.step_size or qty < position.min_qty:
             self.positions.pop(symbol, None)
             await self.restart_price_socket()
             #log(f"{symbol} bakiyesi yetersiz, takipten çıkarıldı")
             return
+        if not batch.ok[0]:
+            # Filtre hatasıyla reddedilecek emri göndermeden atla
+            notional = float(batch.notional[0])
+            if notional < filters.market_min_notional:
+                log(f"{symbol} satış tutarı {notional:.4f} USDT minimumun altında, toz bakiye takipten çıkarıldı")
+                self.positions.pop(symbol, None)
+                await self.restart_price_socket()
+            else:
+                log(f"{symbol} satış tutarı {notional:.4f} USDT filtre sınırları dışında, emir gönderilmedi")
+            return
+        estimate = self.order_book.estimate_sell(symbol, qty)
+        if estimate is not None:
+            log(
+                f"{symbol} defterden beklenen satış fiyatı={estimate[0]:.8f}, "
+                f"kayma={estimate[1] * 100:.3f}%"
+            )
         try:
             order = await self.client.create_order(
                 symbol=symbol, side="SELL", type="MARKET", quantity=qty
             )
-            price = float(order["fills"][0]["price"])
+            price = order_fill_price(order)
+            if price is None:
+                ticker = await self.client.get_symbol_ticker(symbol=symbol)
+                price = float(ticker["price"])
             avg_price = self.positions[symbol].tracker.average_price()
             profit = (price - avg_price) * qty
             percent = (price - avg_price) / avg_price * 100
@@ -1016,15 +1500,61 @@ class SellBot:
             log(f"{symbol} satış hatası: {exc}")
             send_telegram(t("sell_error", exc=exc))
 
+    def _exit_price(self, symbol: str, fallback: float) -> float:
+        """Piyasa satışının karşılanacağı fiyat: senkronsa defterin en iyi alışı."""
+        bid = self.order_book.best_bid(symbol)
+        return bid[0] if bid else fallback
+
     async def sell_all_positions(self) -> None:
-        """Tum pozisyonlari hemen sat."""
+        """Tum pozisyonlari hemen sat.
+
+        Emirlerden önce tüm pozisyonlar cüzdan bakiyesi ve güncel fiyatla tek
+        seferde yuvarlanıp filtrelerle denetlenir; toz kalanlar takipten çıkar.
+        """
         items = list(self.positions.items())
+        try:
+            infos = await asyncio.gather(*(self.client.get_symbol_info(s) for s, _ in items))
+            account = await self.balances.get_account()
+            wallet = {
+                b["asset"]: float(b.get("free", 0)) + float(b.get("locked", 0))
+                for b in account.get("balances", [])
+            }
+            tickers = await self.client.get_symbol_ticker()
+            prices = {t["symbol"]: float(t["price"]) for t in tickers}
+            filters = [symbol_filters(info or {}) for info in infos]
+            batch = quantize_orders(
+                filters,
+                [wallet.get(s.replace("USDT", ""), 0.0) for s, _ in items],
+                [self._exit_price(s, prices.get(s, pos.last_price)) for s, pos in items],
+            )
+            sellable = []
+            dropped = False
+            for item, f, qty, notional, ok in zip(items, filters, batch.qty, batch.notional, batch.ok):
+                symbol, pos = item
+                if ok:
+                    sellable.append(item)
+                elif qty < max(f.step_size, pos.min_qty) or notional < f.market_min_notional:
+                    log(f"{symbol} toplu satışta toz bakiye ({notional:.4f} USDT), takipten çıkarıldı")
+                    self.positions.pop(symbol, None)
+                    dropped = True
+                else:
+                    log(f"{symbol} toplu satışta atlandı, tutar {notional:.4f} USDT filtre sınırları dışında")
+            items = sellable
+            if dropped:
+                await self.restart_price_socket()
+        except Exception as exc:  # pragma: no cover - API hatasi
+            log(f"Toplu satış ön kontrolü yapılamadı: {exc}")
         for symbol, pos in items:
             try:
                 await self.execute_sell(symbol, pos.tracker.total_qty())
             except Exception as exc:  # pragma: no cover - API hatasi
                 log(f"{symbol} toplu satis hatasi: {exc}")
 
+def _same_targets(a, b) -> bool:
+    """Hedef listeleri kayan nokta gürültüsü dışında aynı mı."""
+    return len(a) == len(b) and all(math.isclose(x, y, rel_tol=1e-9) for x, y in zip(a, b))
+
+
 async def main():
     log("Bot başlatılıyor")
     client = await AsyncClient.create(API_KEY, API_SECRET, testnet=TESTNET)
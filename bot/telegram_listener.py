@@ -10,6 +10,7 @@ except Exception:  # pragma: no cover - library not installed
             self.command = [command]
             self.callback = callback
 
+from bot.rate_limiter import PRIORITY_INTERACTIVE, with_priority
 from bot.sell_bot import send_telegram
 from bot.utils import log
 from bot.messages import t
@@ -36,6 +37,11 @@ def _authorized(chat_id: str) -> bool:
     return not ALLOWED_IDS or chat_id in ALLOWED_IDS
 
 
+def _submit(coro, loop: asyncio.AbstractEventLoop):
+    """Komutun isteklerini etkileşimli öncelikle bot döngüsünde çalıştır."""
+    return asyncio.run_coroutine_threadsafe(with_priority(coro, PRIORITY_INTERACTIVE), loop)
+
+
 def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None) -> None:
     """Telegram bot komutlarini dinle."""
     telegram_enabled = os.getenv("TELEGRAM_ENABLED", "true").lower() == "true"
@@ -78,7 +84,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
         if sell_bot is None:
             send_telegram(t("summary_unavailable"), chat_id=chat_id)
             return
-        future = asyncio.run_coroutine_threadsafe(sell_bot.get_total_usdt_value(), loop)
+        future = _submit(sell_bot.get_total_usdt_value(), loop)
         value = future.result()
         send_telegram(f"Guncel toplam deger: {value:.2f} USDT", chat_id=chat_id)
 
@@ -119,7 +125,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
             return
         lines = []
         for sym, pos in sell_bot.positions.items():
-            future = asyncio.run_coroutine_threadsafe(
+            future = _submit(
                 sell_bot.client.get_symbol_ticker(symbol=sym), loop
             )
             try:
@@ -148,7 +154,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
             send_telegram(t("no_symbol_balance", symbol=symbol), chat_id=chat_id)
             return
         qty = position.tracker.total_qty()
-        future = asyncio.run_coroutine_threadsafe(sell_bot.execute_sell(symbol, qty), loop)
+        future = _submit(sell_bot.execute_sell(symbol, qty), loop)
         try:
             future.result()
         except Exception as exc:  # pragma: no cover - ağ hatası
@@ -169,7 +175,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
         if sell_bot is None:
             send_telegram(t("price_unavailable"), chat_id=chat_id)
             return
-        future = asyncio.run_coroutine_threadsafe(
+        future = _submit(
             sell_bot.client.get_symbol_ticker(symbol=symbol), loop
         )
         try:
@@ -187,7 +193,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
         if sell_bot is None:
             send_telegram(t("balance_unavailable"), chat_id=chat_id)
             return
-        future = asyncio.run_coroutine_threadsafe(
+        future = _submit(
             sell_bot.client.get_asset_balance(asset="USDT"), loop
         )
         try:
@@ -218,7 +224,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
                 send_telegram(t("amount_invalid"), chat_id=chat_id)
                 return
         if amount is None:
-            future = asyncio.run_coroutine_threadsafe(
+            future = _submit(
                 buy_bot.client.get_asset_balance(asset="USDT"), loop
             )
             try:
@@ -226,7 +232,7 @@ def start_listener(loop: asyncio.AbstractEventLoop, sell_bot=None, buy_bot=None)
                 amount = float(bal.get("free", 0))
             except Exception:
                 amount = 0.0
-        future = asyncio.run_coroutine_threadsafe(
+        future = _submit(
             buy_bot.execute_buy(symbol, amount), loop
         )
         try:
@@ -23,8 +23,8 @@ async def main():
     # if token:
     #     setup_telegram_menu(token)
     client = await AsyncClient.create(API_KEY, API_SECRET, testnet=True)
-    buy_bot = BuyBot(client)
     sell_bot = SellBot(client)
+    buy_bot = BuyBot(client, balances=sell_bot.balances)
     # start_listener(asyncio.get_running_loop(), sell_bot)
 
     await sell_bot.start()
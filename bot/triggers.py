@@ -0,0 +1,81 @@
+import math
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Optional
+
+
+class TriggerIndex:
+    """Bir pozisyonun aksiyon eşiklerini sıralı tutan küçük indeks.
+
+    Son tam değerlendirmedeki fiyat ile yeni fiyat arasında bir eşik yoksa
+    karar değişemez; kontrol iki ikili aramadan ibarettir.
+    """
+
+    __slots__ = ("levels", "price", "armed_above", "expires")
+
+    def __init__(
+        self,
+        levels: Iterable[float],
+        price: float,
+        armed_above: float = math.inf,
+        expires: float = math.inf,
+    ):
+        self.levels = sorted({lvl for lvl in levels if lvl and math.isfinite(lvl)})
+        self.price = price
+        self.armed_above = armed_above
+        self.expires = expires
+
+    def crossed(self, price: float) -> bool:
+        """Yeni fiyat bir eşiğe değdi ya da eşiği geçtiyse True."""
+        if price >= self.armed_above:
+            return True
+        levels = self.levels
+        return (
+            bisect_left(levels, self.price) != bisect_left(levels, price)
+            or bisect_right(levels, self.price) != bisect_right(levels, price)
+        )
+
+
+class TriggerBook:
+    """Sembol bazında tetik indekslerini ve atlanan değerlendirme sayısını tutar."""
+
+    def __init__(self):
+        self._index: Dict[str, TriggerIndex] = {}
+        self.woken = 0
+        self.skipped = 0
+
+    def publish(
+        self,
+        symbol: str,
+        levels: Iterable[float],
+        price: float,
+        armed_above: float = math.inf,
+        ttl: float = math.inf,
+    ) -> None:
+        """Tam değerlendirme sonrası pozisyonun güncel eşiklerini kaydet."""
+        expires = time.monotonic() + ttl if math.isfinite(ttl) else math.inf
+        self._index[symbol] = TriggerIndex(levels, price, armed_above, expires)
+
+    def get(self, symbol: str) -> Optional[TriggerIndex]:
+        return self._index.get(symbol)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Bir sembolün (veya hepsinin) eşiklerini geçersiz kıl."""
+        if symbol is None:
+            self._index.clear()
+        else:
+            self._index.pop(symbol, None)
+
+    def should_evaluate(self, symbol: str, price: float, peak: float) -> bool:
+        """Fiyat bir eşiği geçtiyse, tepe değiştiyse ya da indeks eskidiyse True."""
+        index = self._index.get(symbol)
+        if (
+            index is None
+            or price > peak
+            or index.crossed(price)
+            or time.monotonic() >= index.expires
+        ):
+            self.woken += 1
+            return True
+        self.skipped += 1
+        return False
@@ -1,6 +1,10 @@
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Coroutine, Dict, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import contextvars
 import os
+import random
+import numpy as np
 import requests
 from builtins import print as builtin_print
 from dotenv import load_dotenv
@@ -51,7 +55,7 @@ def log(message: str) -> None:
     print(f"[{convert_utc_to_env_timezone(utc)}] {message}")
 
 
-from decimal import Decimal, getcontext
+from decimal import ROUND_FLOOR, Decimal, getcontext
 
 
 class FifoTracker:
@@ -95,52 +99,167 @@ class FifoTracker:
         return float(sum(q for q, _ in self.trades))
 
 
+def _scaled(value) -> Tuple[int, int]:
+    """Ondalık metni (tam sayı, ondalık basamak) çiftine çevir: "0.00100" -> (1, 3)."""
+    d = Decimal(str(value)).normalize()
+    places = max(0, -d.as_tuple().exponent)
+    return int(d.scaleb(places)), places
+
+
+class SymbolFilters:
+    """Sembol filtrelerinin tek geçişte derlenmiş hali.
+
+    Adım ve tick boyutları ondalık basamak ölçeğinde tam sayı olarak tutulur;
+    yuvarlama kayan nokta hatası biriktirmeden tam sayı aritmetiğiyle yapılır.
+    ``filterType`` içermeyen eski biçimli filtreler yedek olarak okunur.
+    """
+
+    __slots__ = (
+        "step_size", "min_qty", "max_qty", "qty_scale", "step_units",
+        "tick_size", "min_price", "max_price", "price_scale", "tick_units",
+        "min_notional", "max_notional", "market_min_notional", "market_max_notional",
+    )
+
+    def __init__(self, step_size="1", min_qty="0", max_qty=None, tick_size="0",
+                 min_price="0", max_price=None, min_notional="0", max_notional=None,
+                 min_to_market: bool = True, max_to_market: bool = False):
+        self.step_size = float(step_size)
+        self.min_qty = float(min_qty)
+        self.max_qty = float(max_qty) if max_qty is not None else float("inf")
+        self.step_units, self.qty_scale = _scaled(step_size) if self.step_size > 0 else (0, 0)
+        self.tick_size = float(tick_size)
+        self.min_price = float(min_price)
+        # Binance sınırı kapatmak için 0 gönderir
+        self.max_price = float(max_price or 0) or float("inf")
+        self.tick_units, self.price_scale = _scaled(tick_size) if self.tick_size > 0 else (0, 0)
+        self.min_notional = float(min_notional)
+        self.max_notional = float(max_notional or 0) or float("inf")
+        self.market_min_notional = self.min_notional if min_to_market else 0.0
+        self.market_max_notional = self.max_notional if max_to_market else float("inf")
+
+    @classmethod
+    def from_info(cls, info: dict) -> "SymbolFilters":
+        lot = price = notional = None
+        fallback: Dict[str, str] = {}
+        for f in info.get("filters", []):
+            ftype = f.get("filterType")
+            if ftype == "LOT_SIZE":
+                lot = f
+            elif ftype == "PRICE_FILTER":
+                price = f
+            elif ftype == "NOTIONAL" or (ftype == "MIN_NOTIONAL" and notional is None):
+                notional = f
+            for key in ("stepSize", "minQty", "maxQty", "minNotional"):
+                if key in f:
+                    fallback.setdefault(key, f[key])
+        lot = lot or {}
+        price = price or {}
+        notional = notional or {}
+        if notional.get("filterType") == "NOTIONAL":
+            min_to_market = bool(notional.get("applyMinToMarket", True))
+            max_to_market = bool(notional.get("applyMaxToMarket", False))
+        else:
+            min_to_market = bool(notional.get("applyToMarket", True))
+            max_to_market = False
+        return cls(
+            step_size=lot.get("stepSize", fallback.get("stepSize", "1")),
+            min_qty=lot.get("minQty", fallback.get("minQty", "0")),
+            max_qty=lot.get("maxQty", fallback.get("maxQty")),
+            tick_size=price.get("tickSize", "0"),
+            min_price=price.get("minPrice", "0"),
+            max_price=price.get("maxPrice"),
+            min_notional=notional.get("minNotional", fallback.get("minNotional", "0")),
+            max_notional=notional.get("maxNotional"),
+            min_to_market=min_to_market,
+            max_to_market=max_to_market,
+        )
+
+    def floor_qty(self, qty: float) -> float:
+        """Miktarı adım boyutuna göre aşağı yuvarla."""
+        if not self.step_units:
+            return qty
+        units = int(Decimal(str(qty)).scaleb(self.qty_scale).to_integral_value(ROUND_FLOOR))
+        return (units - units % self.step_units) / 10 ** self.qty_scale
+
+    def floor_price(self, price: float) -> float:
+        """Fiyatı tick boyutuna göre aşağı yuvarla."""
+        if not self.tick_units:
+            return price
+        units = int(Decimal(str(price)).scaleb(self.price_scale).to_integral_value(ROUND_FLOOR))
+        return (units - units % self.tick_units) / 10 ** self.price_scale
+
+
+# Derlenmiş filtreler sembol bilgisi nesnesine göre saklanır; nesne değişince yeniden derlenir
+_FILTER_CACHE: Dict[int, Tuple[dict, SymbolFilters]] = {}
+
+
+def symbol_filters(info: dict) -> SymbolFilters:
+    """Sembol bilgisinin derlenmiş filtrelerini döndür."""
+    entry = _FILTER_CACHE.get(id(info))
+    if entry is not None and entry[0] is info:
+        return entry[1]
+    if len(_FILTER_CACHE) >= 4096:
+        _FILTER_CACHE.clear()
+    filters = SymbolFilters.from_info(info)
+    _FILTER_CACHE[id(info)] = (info, filters)
+    return filters
+
+
 def extract_step_size(info: dict) -> float:
     """Sembol bilgisinden adım miktarını güvenli şekilde çıkar."""
-    filters = info.get("filters", [])
-    for f in filters:
-        if f.get("filterType") == "LOT_SIZE" and "stepSize" in f:
-            return float(f["stepSize"])
-    for f in filters:
-        if "stepSize" in f:
-            return float(f["stepSize"])
-    return 1.0
+    return symbol_filters(info).step_size
 
 
 def extract_min_qty(info: dict) -> float:
     """Sembol bilgisinden minimum miktarı güvenli şekilde çıkar."""
-    filters = info.get("filters", [])
-    for f in filters:
-        if f.get("filterType") == "LOT_SIZE" and "minQty" in f:
-            return float(f["minQty"])
-    for f in filters:
-        if "minQty" in f:
-            return float(f["minQty"])
-    return 0.0
+    return symbol_filters(info).min_qty
 
 
 def extract_max_qty(info: dict) -> float:
     """Sembol bilgisinden maksimum miktarı güvenli şekilde çıkar."""
-    filters = info.get("filters", [])
-    for f in filters:
-        if f.get("filterType") == "LOT_SIZE" and "maxQty" in f:
-            return float(f["maxQty"])
-    for f in filters:
-        if "maxQty" in f:
-            return float(f["maxQty"])
-    return float("inf")
+    return symbol_filters(info).max_qty
 
 
 def extract_min_notional(info: dict) -> float:
     """Sembol bilgisinden minimum notional değerini güvenli şekilde çıkar."""
-    filters = info.get("filters", [])
-    for f in filters:
-        if f.get("filterType") == "MIN_NOTIONAL" and "minNotional" in f:
-            return float(f["minNotional"])
-    for f in filters:
-        if "minNotional" in f:
-            return float(f["minNotional"])
-    return 0.0
+    return symbol_filters(info).min_notional
+
+
+class QuantizedOrders(NamedTuple):
+    qty: np.ndarray
+    notional: np.ndarray
+    ok: np.ndarray
+
+
+def quantize_orders(filters: Sequence[SymbolFilters], qtys, prices) -> QuantizedOrders:
+    """Piyasa emri miktarlarını toplu olarak adıma yuvarla ve filtrelerle denetle.
+
+    Miktar ``maxQty`` ile sınırlanır; ``minQty`` ve piyasa emrine uygulanan
+    notional sınırlarını sağlamayanlar ``ok`` dizisinde False olur. Fiyatı
+    bilinmeyen (0) satırlarda notional denetimi yapılmaz.
+    """
+    qtys = np.asarray(qtys, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    steps = np.array([f.step_units for f in filters], dtype=np.int64)
+    factors = np.array([10.0 ** f.qty_scale for f in filters])
+    min_qty = np.array([f.min_qty for f in filters])
+    max_qty = np.array([f.max_qty for f in filters])
+    min_notional = np.array([f.market_min_notional for f in filters])
+    max_notional = np.array([f.market_max_notional for f in filters])
+
+    capped = np.minimum(qtys, max_qty)
+    scaled = capped * factors
+    # Çarpım birkaç ULP aşağıda kalabilir (0.29 * 1e8 = 28999999.999999996);
+    # tam sayıya bu kadar yakın değerler o tam sayıya çekilir
+    nearest = np.rint(scaled)
+    snap = np.abs(scaled - nearest) <= 4 * np.spacing(np.maximum(np.abs(scaled), 1.0))
+    units = np.where(snap, nearest, np.floor(scaled)).astype(np.int64)
+    units -= np.where(steps > 0, units % np.maximum(steps, 1), 0)
+    qty = np.where(steps > 0, units / factors, capped)
+    notional = qty * prices
+    known = prices > 0
+    ok = (qty > 0) & (qty >= min_qty) & (~known | ((notional >= min_notional) & (notional <= max_notional)))
+    return QuantizedOrders(qty, notional, ok)
 
 
 def floor_to_step(value: float, step: float) -> float:
@@ -178,6 +297,45 @@ def seconds_until_next_six_hour(now: Optional[datetime] = None) -> float:
     return (next_time - now).total_seconds()
 
 
+def backoff_delay(attempt: int, base: float = 1.0, maximum: float = 60.0) -> float:
+    """Üstel artan ve rastgele yayılan yeniden deneme bekleme süresi."""
+    delay = min(maximum, base * (2 ** max(attempt - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def detached_task(coro: Coroutine) -> asyncio.Task:
+    """Çağıranın bağlam değişkenlerini (istek önceliği vb.) devralmayan görev başlat."""
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+_INTERVAL_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def interval_to_seconds(interval: str) -> int:
+    """Binance mum aralığını ("1m", "4h", "1d") saniyeye çevir."""
+    unit = interval[-1]
+    amount = int(interval[:-1] or 1)
+    if unit == "M":
+        return amount * 30 * 86400
+    return amount * _INTERVAL_SECONDS[unit]
+
+
+def seconds_until_candle_close(interval: str, now: Optional[datetime] = None) -> float:
+    """UTC-0 saatine göre açık mumun kapanmasına kalan saniye."""
+    now = now or datetime.now(timezone.utc)
+    if interval.endswith("M"):
+        month = now.month + int(interval[:-1] or 1)
+        year = now.year + (month - 1) // 12
+        month = (month - 1) % 12 + 1
+        return (now.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0) - now).total_seconds()
+    step = interval_to_seconds(interval)
+    ts = now.timestamp()
+    if interval.endswith("w"):
+        # Haftalık mumlar pazartesi açılır; 1970-01-01 ise perşembedir
+        ts -= 4 * 86400
+    return step - (ts % step)
+
+
 def setup_telegram_menu(token: str) -> None:
     """Telegram botunda komut menüsünü ayarla."""
     url = f"https://api.telegram.org/bot{token}/setMyCommands"
@@ -0,0 +1,173 @@
+import json
+import os
+import re
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+try:  # pragma: no cover - opsiyonel hizli JSON kutuphanesi
+    import orjson
+except Exception:  # pragma: no cover - kurulu degilse standart json kullanilir
+    orjson = None
+
+from bot.price_stream import FEED_BOOK_TICKER, FEED_TICKER, extract_price
+
+# Hizli ayrisma kapatilirsa kutuphanenin sozluk ureten yolu kullanilir
+FAST_WS_PARSE = os.getenv("FAST_WS_PARSE", "true").lower() == "true"
+
+
+class Tick(NamedTuple):
+    """Dagitici icin gereken en kucuk fiyat kaydi."""
+
+    symbol: str
+    price: float
+
+
+class Trade(NamedTuple):
+    """``@aggTrade`` akisindan hacim deposu icin gereken alanlar."""
+
+    symbol: str
+    price: float
+    qty: float
+    buyer_maker: bool
+    # Islem zamani (``T``, saniye); yoksa alindigi an kullanilir
+    time: Optional[float] = None
+
+
+def json_loads(raw):
+    """orjson kuruluysa onu, degilse standart json'u kullan."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class PriceParser:
+    """Ham websocket metninden sadece sembol ve fiyat alanlarini cikar.
+
+    Binance fiyat mesajlari bosluksuz JSON'dur ve her nesnede ``s`` ile fiyat
+    alani birer kez bulunur. Bu nedenle 20 alanlik sozluk kurmak yerine iki
+    duz metin aramasi ile ``(sembol, fiyat)`` ciftleri okunur. Sayilar
+    tutmazsa ya da mesaj fiyat icermiyorsa (hata, abonelik cevabi vb.) tam
+    JSON ayristirmaya dusulur.
+    """
+
+    _symbol_pattern = re.compile(r'"s":"([^"]+)"')
+    _trade_pattern = re.compile(
+        r'"s":"([^"]+)".*?"p":"([^"]+)","q":"([^"]+)".*?"T":(\d+),"m":(true|false)'
+    )
+
+    def __init__(self, feed: str = FEED_TICKER):
+        self.feed = feed
+        field = "b" if feed == FEED_BOOK_TICKER else "c"
+        self._price_pattern = re.compile(r'"%s":"([^"]+)"' % field)
+
+    def parse(self, raw) -> list:
+        """Ham mesaji ``Tick`` listesine cevir; fiyat icermiyorsa sozluk dondur."""
+        if isinstance(raw, (bytes, bytearray)):
+            raw = raw.decode("utf-8")
+        if '"e":"aggTrade"' in raw:
+            match = self._trade_pattern.search(raw)
+            if match:
+                s, p, q, t, m = match.groups()
+                return [tuple.__new__(Trade, (s, float(p), float(q), m == "true", int(t) / 1000))]
+            return self.normalize(json_loads(raw))
+        if '"e":"depthUpdate"' in raw:
+            return [json_loads(raw)]
+        symbols = self._symbol_pattern.findall(raw)
+        if symbols:
+            prices = self._price_pattern.findall(raw)
+            if len(prices) == len(symbols):
+                new = tuple.__new__
+                return [new(Tick, (s, float(p))) for s, p in zip(symbols, prices)]
+        data = json_loads(raw)
+        if not isinstance(data, list):
+            data = [data]
+        return self.normalize(data)
+
+    def normalize(self, msg) -> List:
+        """Hazir ``Tick`` listesi ya da kutuphane sozlukleri icin ortak giris."""
+        if isinstance(msg, dict):
+            msg = [msg]
+        result = []
+        for item in msg:
+            if isinstance(item, (Tick, Trade)):
+                result.append(item)
+            elif isinstance(item, dict) and item.get("e") == "aggTrade":
+                trade_time = item.get("T")
+                result.append(
+                    Trade(
+                        item["s"], float(item["p"]), float(item["q"]), bool(item["m"]),
+                        int(trade_time) / 1000 if trade_time is not None else None,
+                    )
+                )
+            elif isinstance(item, dict) and item.get("e") == "depthUpdate":
+                result.append(item)
+            elif isinstance(item, dict) and "s" in item:
+                price = extract_price(item, self.feed)
+                if price is not None:
+                    result.append(Tick(item["s"], price))
+            else:
+                result.append(item)
+        return result
+
+    def install(self, stream) -> bool:
+        """Kutuphane soketinin JSON cozumleyicisini bu ayristiriciyla degistir."""
+        if not FAST_WS_PARSE or getattr(stream, "_is_binary", False):
+            return False
+        if not hasattr(stream, "_handle_message"):
+            return False
+        stream._handle_message = self.parse
+        return True
+
+
+def _sample_ticker(symbol: str, price: float) -> dict:
+    return {
+        "e": "24hrTicker", "E": 1700000000000, "s": symbol, "p": "0.0015",
+        "P": "1.50", "w": "0.0018", "x": "0.0009", "c": f"{price:.8f}",
+        "Q": "10", "b": "0.0024", "B": "10", "a": "0.0026", "A": "100",
+        "o": "0.0010", "h": "0.0025", "l": "0.0010", "v": "10000", "q": "18",
+        "O": 0, "C": 86400000, "F": 0, "L": 18150, "n": 18151,
+    }
+
+
+def _library_path(raw, feed: str) -> list:
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        data = [data]
+    return [(item.get("s"), extract_price(item, feed)) for item in data]
+
+
+def _orjson_path(raw, feed: str) -> list:
+    data = orjson.loads(raw)
+    if isinstance(data, dict):
+        data = [data]
+    return [(item.get("s"), extract_price(item, feed)) for item in data]
+
+
+def benchmark(symbols: int = 300, seconds: float = 1.0, messages: Optional[Iterable[str]] = None) -> dict:
+    """Kutuphane yolu ile hizli yolu saniyedeki mesaj sayisi olarak karsilastir."""
+    if messages is None:
+        compact = {"separators": (",", ":")}
+        array = json.dumps([_sample_ticker(f"S{i}USDT", i + 0.5) for i in range(symbols)], **compact)
+        single = json.dumps(_sample_ticker("BTCUSDT", 42000.5), **compact)
+        messages = {"!ticker@arr": (array, symbols), "tekil @ticker": (single, 1)}
+    parser = PriceParser(FEED_TICKER)
+    paths = {"kutuphane (json+dict)": lambda raw: _library_path(raw, FEED_TICKER)}
+    if orjson is not None:
+        paths["orjson+dict"] = lambda raw: _orjson_path(raw, FEED_TICKER)
+    paths["hizli yol"] = parser.parse
+    results = {}
+    for label, (raw, count) in messages.items():
+        for name, func in paths.items():
+            loops = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                func(raw)
+                loops += 1
+            elapsed = time.perf_counter() - start
+            results[(label, name)] = loops * count / elapsed
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover - elle calistirilan olcum
+    for (label, name), rate in benchmark().items():
+        print(f"{label:14s} {name:24s} {rate:12,.0f} mesaj/s")
@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from bot import rate_limiter
+from bot.api_endpoints import EndpointRouter
+
+A = "https://api.binance.com"
+B = "https://api1.binance.com"
+
+
+class FakeResponse:
+    def __init__(self, status, text):
+        self.status_code = status
+        self.text = text
+        self.headers = {}
+        self.request = None
+
+
+def test_router_prefers_fast_healthy_endpoint():
+    router = EndpointRouter([A, B, "https://api2.binance.com"], cooldown=10)
+    router.record(A, 0.2)
+    router.record(B, 0.05)
+    # ölçülmemiş adres önce denenir
+    assert router.pick() == "https://api2.binance.com"
+    router.record("https://api2.binance.com", 0.1)
+    assert router.ranked() == [B, "https://api2.binance.com", A]
+    router.fail(B)
+    assert router.ranked()[-1] == B
+    assert router.base_of(A + "/api/v3/klines") == A
+    assert router.base_of("https://testnet.binance.vision/api/v3/klines") is None
+
+
+def test_slow_decision_get_is_hedged(monkeypatch):
+    router = EndpointRouter([A, B])
+    for _ in range(20):
+        router.record(A, 0.01)
+        router.record(B, 0.02)
+    monkeypatch.setattr(rate_limiter, "endpoints", router)
+    calls = []
+
+    async def fake_send(self, method, uri, signed, force_params=False, **kwargs):
+        calls.append(uri)
+        await asyncio.sleep(1 if uri.startswith(A) else 0.01)
+        return {"from": uri.split("/api/")[0]}
+
+    monkeypatch.setattr(rate_limiter, "_send_request", fake_send)
+
+    async def run():
+        start = time.monotonic()
+        with rate_limiter.priority(rate_limiter.PRIORITY_DECISION):
+            result = await rate_limiter._routed_request(None, "get", A + "/api/v3/depth", False, data={"symbol": "X"})
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == {"from": B}
+    assert elapsed < 0.5
+    assert router.hedges == 1 and router.hedge_wins == 1
+    assert [c.split("/api/")[0] for c in calls] == [A, B]
+
+
+def test_only_tagged_light_gets_are_hedged():
+    hedge = rate_limiter._hedgeable
+    assert not hedge("get", A + "/api/v3/klines", False)  # etiketsiz
+    with rate_limiter.priority(rate_limiter.PRIORITY_DECISION):
+        assert hedge("get", A + "/api/v3/klines", False)
+        assert not hedge("get", A + "/api/v3/account", True)
+        assert not hedge("get", A + "/api/v3/myTrades", True)
+        assert not hedge("get", A + "/api/v3/exchangeInfo", False)
+    with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+        assert not hedge("get", A + "/api/v3/klines", False)
+
+
+def test_order_with_unknown_status_is_queried_then_retried(monkeypatch):
+    router = EndpointRouter([A, B])
+    router.record(A, 0.01)
+    router.record(B, 0.02)
+    monkeypatch.setattr(rate_limiter, "endpoints", router)
+    monkeypatch.setattr(rate_limiter, "ORDER_STATUS_TIMEOUT", 0)
+    monkeypatch.setattr(rate_limiter, "ORDER_RESEND_TYPES", {"LIMIT_MAKER"})
+    posts = []
+
+    async def fake_send(self, method, uri, signed, force_params=False, **kwargs):
+        if method == "post":
+            posts.append((uri.split("/api/")[0], kwargs["data"]["newClientOrderId"]))
+            if uri.startswith(A):
+                raise asyncio.TimeoutError()
+            return {"orderId": 1, "fills": []}
+        return {}
+
+    class Client:
+        queried = []
+
+        async def get_order(self, symbol, origClientOrderId):
+            self.queried.append(origClientOrderId)
+            text = '{"code":-2013,"msg":"Order does not exist."}'
+            raise BinanceAPIException(FakeResponse(400, text), 400, text)
+
+    monkeypatch.setattr(rate_limiter, "_send_request", fake_send)
+    client = Client()
+    data = {"symbol": "BTCUSDT", "side": "SELL", "type": "LIMIT_MAKER", "quantity": 1, "price": 1}
+    result = asyncio.run(rate_limiter._routed_request(client, "post", A + "/api/v3/order", True, data=data))
+    assert result["orderId"] == 1
+    assert [p[0] for p in posts] == [A, B]
+    assert posts[0][1] == posts[1][1] == client.queried[0]
+    assert router.order_retries == 1
+
+
+def test_order_found_after_timeout_is_not_resent(monkeypatch):
+    router = EndpointRouter([A, B])
+    monkeypatch.setattr(rate_limiter, "endpoints", router)
+    posts = []
+
+    async def fake_send(self, method, uri, signed, force_params=False, **kwargs):
+        posts.append(uri)
+        raise asyncio.TimeoutError()
+
+    class Client:
+        async def get_order(self, symbol, origClientOrderId):
+            return {"status": "FILLED", "clientOrderId": origClientOrderId}
+
+    monkeypatch.setattr(rate_limiter, "_send_request", fake_send)
+    data = {"symbol": "BTCUSDT", "newClientOrderId": "abc"}
+    result = asyncio.run(rate_limiter._routed_request(Client(), "post", A + "/api/v3/order", True, data=data))
+    assert result == {"status": "FILLED", "clientOrderId": "abc"}
+    assert len(posts) == 1
+
+    # iş kuralı hatası yeniden denenmez
+    async def rejected(self, method, uri, signed, force_params=False, **kwargs):
+        text = '{"code":-2010,"msg":"insufficient balance"}'
+        raise BinanceAPIException(FakeResponse(400, text), 400, text)
+
+    monkeypatch.setattr(rate_limiter, "_send_request", rejected)
+    with pytest.raises(BinanceAPIException):
+        asyncio.run(rate_limiter._routed_request(Client(), "post", A + "/api/v3/order", True, data=dict(data)))
+
+
+def test_market_order_late_fill_is_found_not_resent(monkeypatch):
+    router = EndpointRouter([A, B])
+    monkeypatch.setattr(rate_limiter, "endpoints", router)
+    monkeypatch.setattr(rate_limiter, "backoff_delay", lambda attempt, maximum=60.0: 0)
+    posts = []
+
+    async def fake_send(self, method, uri, signed, force_params=False, **kwargs):
+        posts.append(uri)
+        raise asyncio.TimeoutError()
+
+    class Client:
+        queries = 0
+
+        async def get_order(self, symbol, origClientOrderId):
+            # Eşleştirme motoru emri sorgudan sonra işliyor
+            Client.queries += 1
+            if Client.queries < 3:
+                text = '{"code":-2013,"msg":"Order does not exist."}'
+                raise BinanceAPIException(FakeResponse(400, text), 400, text)
+            return {"status": "FILLED", "clientOrderId": origClientOrderId}
+
+    monkeypatch.setattr(rate_limiter, "_send_request", fake_send)
+    data = {"symbol": "BTCUSDT", "type": "MARKET", "newClientOrderId": "abc"}
+    result = asyncio.run(rate_limiter._routed_request(Client(), "post", A + "/api/v3/order", True, data=data))
+    assert result["status"] == "FILLED"
+    assert Client.queries == 3
+    assert len(posts) == 1
+
+    # süre dolduğunda bile bulunamayan MARKET emri yeniden gönderilmez
+    monkeypatch.setattr(rate_limiter, "ORDER_STATUS_TIMEOUT", 0)
+    Client.queries = -100
+    posts.clear()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(rate_limiter._routed_request(Client(), "post", A + "/api/v3/order", True, data=dict(data)))
+    assert len(posts) == 1
+    assert router.order_retries == 0
@@ -0,0 +1,131 @@
+import asyncio
+
+from bot.balance_book import BalanceBook
+
+
+class CountingClient:
+    def __init__(self):
+        self.account_calls = 0
+        self.balance_calls = 0
+
+    async def get_account(self):
+        self.account_calls += 1
+        await asyncio.sleep(0)
+        return {"balances": [{"asset": "BTC", "free": "1.5", "locked": "0.5"}]}
+
+    async def get_asset_balance(self, asset):
+        self.balance_calls += 1
+        return {"asset": asset, "free": "9", "locked": "0"}
+
+
+def test_not_live_falls_back_to_rest():
+    client = CountingClient()
+    book = BalanceBook(client)
+    bal = asyncio.run(book.get_asset_balance("BTC"))
+    assert bal["free"] == "9"
+    assert client.balance_calls == 1
+
+
+def test_live_book_serves_from_events():
+    client = CountingClient()
+    book = BalanceBook(client)
+
+    async def run():
+        await book.seed()
+        book.set_live(True)
+        first = await book.get_asset_balance("BTC")
+        book.apply({"e": "outboundAccountPosition", "u": 10, "B": [{"a": "BTC", "f": "2", "l": "0"}]})
+        second = await book.get_asset_balance("BTC")
+        book.apply({"e": "balanceUpdate", "a": "USDT", "d": "15", "T": 11})
+        account = await book.get_account()
+        return first, second, account
+
+    first, second, account = asyncio.run(run())
+    assert float(first["free"]) == 1.5
+    assert float(second["free"]) == 2.0
+    assets = {b["asset"]: float(b["free"]) for b in account["balances"]}
+    assert assets == {"BTC": 2.0, "USDT": 15.0}
+    assert client.account_calls == 1
+    assert client.balance_calls == 0
+
+
+def test_balance_update_not_applied_twice():
+    book = BalanceBook(CountingClient())
+    book.apply({"e": "outboundAccountPosition", "u": 20, "B": [{"a": "USDT", "f": "15", "l": "0"}]})
+    book.apply({"e": "balanceUpdate", "a": "USDT", "d": "15", "T": 20})
+    assert book.balances["USDT"] == (15.0, 0.0)
+
+
+def test_filled_asset_reads_rest_until_account_event():
+    client = CountingClient()
+    book = BalanceBook(client)
+
+    async def run():
+        await book.seed()
+        book.set_live(True)
+        book.mark_stale("BTC")
+        await book.get_asset_balance("BTC")
+        book.apply({"e": "outboundAccountPosition", "u": 5, "B": [{"a": "BTC", "f": "3", "l": "0"}]})
+        return await book.get_asset_balance("BTC")
+
+    bal = asyncio.run(run())
+    assert client.balance_calls == 1
+    assert float(bal["free"]) == 3.0
+
+
+def test_concurrent_seeds_share_one_request():
+    client = CountingClient()
+    book = BalanceBook(client)
+
+    async def run():
+        await asyncio.gather(book.seed(), book.seed(), book.seed())
+
+    asyncio.run(run())
+    assert client.account_calls == 1
+
+
+def test_reconcile_after_interval():
+    client = CountingClient()
+    book = BalanceBook(client, reconcile_seconds=60)
+
+    async def run():
+        await book.seed()
+        book.set_live(True)
+        book.seeded_at -= 120
+        await book.get_asset_balance("BTC")
+
+    asyncio.run(run())
+    assert client.account_calls == 2
+
+
+def test_event_during_slow_seed_survives_snapshot():
+    class SlowClient(CountingClient):
+        def __init__(self):
+            super().__init__()
+            self.release = None
+
+        async def get_account(self):
+            self.account_calls += 1
+            self.release = asyncio.Event()
+            await self.release.wait()
+            # Görüntü, olaydan önceki bakiyeyi taşıyor
+            return {"updateTime": 100, "balances": [{"asset": "BTC", "free": "1.5", "locked": "0"}]}
+
+    client = SlowClient()
+    book = BalanceBook(client)
+
+    async def run():
+        seeding = asyncio.ensure_future(book.seed())
+        while client.release is None:
+            await asyncio.sleep(0)
+        book.apply({"e": "outboundAccountPosition", "u": 150, "B": [{"a": "BTC", "f": "2.5", "l": "0"}]})
+        book.apply({"e": "outboundAccountPosition", "u": 90, "B": [{"a": "ETH", "f": "7", "l": "0"}]})
+        book.mark_stale("USDT")
+        client.release.set()
+        await seeding
+
+    asyncio.run(run())
+    assert book.balances["BTC"] == (2.5, 0.0)
+    # görüntüden eski olay yeniden uygulanmaz
+    assert "ETH" not in book.balances
+    assert "USDT" in book._stale
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from bot import rate_limiter
+from bot.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerBoard,
+    CircuitBreaker,
+    CircuitOpenError,
+    endpoint_family,
+    is_degraded,
+)
+
+
+class FakeResponse:
+    def __init__(self, status, text):
+        self.status_code = status
+        self.text = text
+        self.headers = {}
+        self.request = None
+
+
+def api_error(status, code):
+    return BinanceAPIException(FakeResponse(status, f'{{"code":{code},"msg":"x"}}'), status, f'{{"code":{code},"msg":"x"}}')
+
+
+def test_breaker_state_machine():
+    breaker = CircuitBreaker("market", failures=3, base=1, maximum=8)
+    for _ in range(2):
+        breaker.failure(now=100)
+    assert breaker.state == CLOSED
+    breaker.failure(now=100)
+    assert breaker.state == OPEN
+    assert 100.5 <= breaker.open_until <= 101
+    assert not breaker.allow(now=100.2)
+
+    assert breaker.allow(now=101)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(now=101)  # tek deneme istegi
+    breaker.failure(now=101)
+    assert breaker.state == OPEN
+    assert 102 <= breaker.open_until <= 103  # ikinci acilista sure iki katina cikar
+
+    assert breaker.allow(now=103)
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.trips == 0
+
+
+def test_degraded_errors_and_families():
+    assert is_degraded(api_error(503, -1001))
+    assert is_degraded(api_error(429, -1003))
+    assert is_degraded(asyncio.TimeoutError())
+    assert not is_degraded(api_error(400, -2010))
+    base = "https://api.binance.com/api/"
+    assert endpoint_family(base + "v3/klines") == "market"
+    assert endpoint_family(base + "v3/order") == "order"
+    assert endpoint_family(base + "v3/myTrades") == "account"
+
+
+def test_open_breaker_fast_fails_but_lets_orders_through(monkeypatch):
+    calls = []
+
+    async def fake_request(self, method, uri, signed, force_params=False, **kwargs):
+        calls.append(uri)
+        if "klines" in uri:
+            raise api_error(503, -1001)
+        self.response = FakeResponse(200, "{}")
+        return {}
+
+    monkeypatch.setattr(rate_limiter, "_original_request", fake_request)
+    monkeypatch.setattr(rate_limiter, "breakers", BreakerBoard(failures=2, base=30, maximum=30))
+
+    class Client:
+        response = None
+
+    client = Client()
+    base = "https://api.binance.com/api/"
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(BinanceAPIException):
+                await rate_limiter._limited_request(client, "get", base + "v3/klines", False)
+        with pytest.raises(CircuitOpenError), rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+            await rate_limiter._limited_request(client, "get", base + "v3/ticker/price", False)
+        await rate_limiter._limited_request(client, "post", base + "v3/order", True)
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    stats = rate_limiter.breakers.stats()
+    assert stats["market"]["state"] == OPEN
+    assert stats["market"]["rejected"] == 1
+    assert stats["order"]["state"] == CLOSED
+
+
+def test_decision_call_waits_for_half_open_probe(monkeypatch):
+    failing = [True]
+    calls = []
+
+    async def fake_request(self, method, uri, signed, force_params=False, **kwargs):
+        calls.append(uri)
+        if failing[0]:
+            raise api_error(503, -1001)
+        self.response = FakeResponse(200, "{}")
+        return {"ok": True}
+
+    monkeypatch.setattr(rate_limiter, "_original_request", fake_request)
+    monkeypatch.setattr(rate_limiter, "breakers", BreakerBoard(failures=1, base=0.05, maximum=0.05))
+
+    class Client:
+        response = None
+
+    client = Client()
+    uri = "https://api.binance.com/api/v3/klines"
+
+    async def run():
+        with rate_limiter.priority(rate_limiter.PRIORITY_DECISION):
+            with pytest.raises(BinanceAPIException):
+                await rate_limiter._send_request(client, "get", uri, False)
+            failing[0] = False
+            # devre açık; karar isteği reddedilmez, süre dolunca deneme olarak gider
+            return await rate_limiter._send_request(client, "get", uri, False)
+
+    assert asyncio.run(run()) == {"ok": True}
+    assert len(calls) == 2
+    assert rate_limiter.breakers.stats()["market"]["state"] == CLOSED
+    assert rate_limiter.breakers.stats()["market"]["rejected"] == 0
@@ -0,0 +1,120 @@
+import asyncio
+
+from bot.dispatcher import OrderedEventQueue, TickDispatcher
+
+
+def test_ticks_coalesce_while_symbol_busy():
+    seen = []
+    gate = None
+
+    async def handler(symbol, price):
+        seen.append((symbol, price))
+        if len(seen) == 1:
+            await gate.wait()
+
+    async def run():
+        nonlocal gate
+        gate = asyncio.Event()
+        dispatcher = TickDispatcher(handler, workers=2)
+        dispatcher.submit("AUSDT", 1.0)
+        await asyncio.sleep(0)
+        for price in (2.0, 3.0, 4.0):
+            dispatcher.submit("AUSDT", price)
+        gate.set()
+        await asyncio.sleep(0.01)
+        stats = dispatcher.stats()
+        await dispatcher.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert seen == [("AUSDT", 1.0), ("AUSDT", 4.0)]
+    assert stats["coalesced"] == 2
+    assert stats["evaluated"] == 2
+
+
+def test_slow_symbol_does_not_block_others():
+    seen = []
+
+    async def handler(symbol, price):
+        if symbol == "SLOW":
+            await asyncio.sleep(1)
+        seen.append(symbol)
+
+    async def run():
+        dispatcher = TickDispatcher(handler, workers=2)
+        dispatcher.submit("SLOW", 1.0)
+        dispatcher.submit("FAST", 1.0)
+        await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert seen == ["FAST"]
+
+
+def test_discard_counts_dropped():
+    async def handler(symbol, price):
+        pass
+
+    async def run():
+        dispatcher = TickDispatcher(handler, workers=1)
+        dispatcher.submit("AUSDT", 1.0)
+        dispatcher.discard("AUSDT")
+        await asyncio.sleep(0)
+        stats = dispatcher.stats()
+        await dispatcher.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["dropped"] == 1
+    assert stats["evaluated"] == 0
+
+
+def test_event_queue_keeps_order_per_key():
+    seen = []
+    gate = asyncio.Event()
+
+    async def handler(event):
+        if event["k"] == "A" and event["n"] == 1:
+            await gate.wait()
+        seen.append((event["k"], event["n"]))
+
+    async def run():
+        queue = OrderedEventQueue(handler, workers=2)
+        queue.submit("A", {"k": "A", "n": 1})
+        queue.submit("A", {"k": "A", "n": 2})
+        queue.submit("B", {"k": "B", "n": 1})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # A'nin ilk olayi beklerken B islenmis, A'nin ikinci olayi beklemede
+        before = list(seen)
+        depth = queue.depth()
+        gate.set()
+        await queue.join()
+        await queue.stop()
+        return before, depth, queue.stats()
+
+    before, depth, stats = asyncio.run(run())
+    assert before == [("B", 1)]
+    assert depth == 2
+    assert seen == [("B", 1), ("A", 1), ("A", 2)]
+    assert stats["processed"] == 3
+    assert stats["max_depth"] == 3
+
+
+def test_event_queue_survives_handler_error():
+    seen = []
+
+    async def handler(event):
+        if event["n"] == 1:
+            raise RuntimeError("hata")
+        seen.append(event["n"])
+
+    async def run():
+        queue = OrderedEventQueue(handler, workers=1)
+        queue.submit("A", {"n": 1})
+        queue.submit("A", {"n": 2})
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(run())
+    assert seen == [2]
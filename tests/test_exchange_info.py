@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from bot import exchange_info
+from bot.exchange_info import ExchangeInfoCache, cache_for
+
+
+class InfoClient:
+    def __init__(self, step="0.001"):
+        self.calls = 0
+        self.step = step
+
+    async def get_exchange_info(self):
+        self.calls += 1
+        return {
+            "symbols": [
+                {
+                    "symbol": "BTCUSDT",
+                    "filters": [
+                        {"filterType": "LOT_SIZE", "minQty": "0.001", "stepSize": self.step},
+                        {"filterType": "NOTIONAL", "minNotional": "5"},
+                    ],
+                }
+            ]
+        }
+
+
+def test_loads_once_and_restarts_from_disk(tmp_path):
+    path = str(tmp_path / "info.json")
+    client = InfoClient()
+    cache = ExchangeInfoCache(client, path)
+
+    async def lookups(c):
+        return await asyncio.gather(*(c.get_symbol_info("BTCUSDT") for _ in range(5)))
+
+    infos = asyncio.run(lookups(cache))
+    assert client.calls == 1
+    assert infos[0]["symbol"] == "BTCUSDT"
+    assert asyncio.run(cache.get_symbol_info("ETHUSDT")) is None
+    assert asyncio.run(cache.symbol_filters("BTCUSDT"))["NOTIONAL"]["minNotional"] == "5"
+
+    fresh_client = InfoClient()
+    restarted = ExchangeInfoCache(fresh_client, path)
+    assert asyncio.run(restarted.get_symbol_info("BTCUSDT"))["symbol"] == "BTCUSDT"
+    assert fresh_client.calls == 0
+
+
+def test_invalidate_and_expiry_refresh(tmp_path):
+    client = InfoClient()
+    cache = ExchangeInfoCache(client, str(tmp_path / "info.json"), refresh_seconds=3600)
+    asyncio.run(cache.get_symbol_info("BTCUSDT"))
+
+    client.step = "0.01"
+    cache.invalidate()
+    info = asyncio.run(cache.get_symbol_info("BTCUSDT"))
+    assert client.calls == 2
+    assert info["filters"][0]["stepSize"] == "0.01"
+
+    # süresi geçen veri beklemeden döner, yenileme arka planda yapılır
+    cache.loaded_at = time.time() - 7200
+    client.step = "0.1"
+
+    async def stale_lookup():
+        info = await cache.get_symbol_info("BTCUSDT")
+        await asyncio.sleep(0.05)
+        return info
+
+    info = asyncio.run(stale_lookup())
+    assert info["filters"][0]["stepSize"] == "0.01"
+    assert client.calls == 3
+    assert cache.filters["BTCUSDT"]["LOT_SIZE"]["stepSize"] == "0.1"
+
+
+def test_filter_failure_invalidates(monkeypatch, tmp_path):
+    class FakeResponse:
+        status_code = 400
+        text = '{"code":-1013,"msg":"Filter failure: LOT_SIZE"}'
+        headers = {}
+        request = None
+
+    async def failing(self, **params):
+        raise BinanceAPIException(FakeResponse(), 400, FakeResponse.text)
+
+    monkeypatch.setattr(exchange_info, "EXCHANGE_INFO_PATH", str(tmp_path / "info.json"))
+    monkeypatch.setattr(exchange_info, "_original_create_order", failing)
+    client = InfoClient()
+    asyncio.run(cache_for(client).get_symbol_info("BTCUSDT"))
+    with pytest.raises(BinanceAPIException):
+        asyncio.run(exchange_info._create_order(client, symbol="BTCUSDT"))
+    asyncio.run(cache_for(client).get_symbol_info("BTCUSDT"))
+    assert client.calls == 2
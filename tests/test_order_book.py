@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from bot.order_book import OrderBookMirror
+
+
+class SnapshotClient:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.calls = 0
+
+    async def get_order_book(self, symbol, limit=100):
+        self.calls += 1
+        return self.snapshot
+
+
+def diff(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "s": "AUSDT", "U": first, "u": last, "b": list(bids), "a": list(asks)}
+
+
+def make_mirror():
+    client = SnapshotClient(
+        {
+            "lastUpdateId": 10,
+            "bids": [["1.00", "5"], ["0.99", "10"], ["0.98", "20"]],
+            "asks": [["1.01", "4"], ["1.02", "8"]],
+        }
+    )
+    mirror = OrderBookMirror(client)
+    mirror.reset(["AUSDT"])
+    return mirror, client
+
+
+def test_snapshot_resync_applies_buffered_diffs():
+    mirror, client = make_mirror()
+    assert mirror.apply_diff(diff(5, 9, bids=[["1.00", "1"]])) is True
+    assert mirror.apply_diff(diff(10, 11, bids=[["1.00", "7"]])) is True
+    assert mirror.best_bid("AUSDT") is None
+    asyncio.run(mirror.resync("AUSDT"))
+    assert mirror.best_bid("AUSDT") == (1.0, 7.0)
+    assert mirror.best_ask("AUSDT") == (1.01, 4.0)
+    mirror.apply_diff(diff(12, 12, bids=[["1.00", "0"]], asks=[["1.005", "1"]]))
+    assert mirror.best_bid("AUSDT") == (0.99, 10.0)
+    assert mirror.best_ask("AUSDT") == (1.005, 1.0)
+    assert client.calls == 1
+
+
+def test_gap_triggers_resync():
+    mirror, _client = make_mirror()
+    mirror.apply_diff(diff(11, 11))
+    asyncio.run(mirror.resync("AUSDT"))
+    assert mirror.best_bid("AUSDT") is not None
+    assert mirror.apply_diff(diff(15, 16)) is True
+    assert mirror.best_bid("AUSDT") is None
+
+
+def test_estimate_sell_walks_bids():
+    mirror, _client = make_mirror()
+    mirror.apply_diff(diff(11, 11))
+    asyncio.run(mirror.resync("AUSDT"))
+    avg, slippage = mirror.estimate_sell("AUSDT", 10)
+    assert avg == pytest.approx((5 * 1.00 + 5 * 0.99) / 10)
+    assert slippage == pytest.approx((1.0 - avg) / 1.0)
+    assert mirror.estimate_sell("AUSDT", 100) is None
+
+
+def test_failed_snapshot_backs_off_and_buffer_is_capped(monkeypatch):
+    import bot.order_book as order_book
+
+    monkeypatch.setattr(order_book, "ORDER_BOOK_BUFFER_LIMIT", 3)
+
+    class FailingClient:
+        calls = 0
+
+        async def get_order_book(self, symbol, limit=100):
+            FailingClient.calls += 1
+            raise ConnectionError("429")
+
+    mirror = OrderBookMirror(FailingClient())
+    mirror.reset(["AUSDT"])
+    assert mirror.apply_diff(diff(1, 1)) is True
+    asyncio.run(mirror.resync("AUSDT"))
+    # sonraki olaylar bekleme suresi dolana kadar yeni goruntu istemez
+    assert [mirror.apply_diff(diff(i, i)) for i in range(2, 6)] == [False] * 4
+    assert FailingClient.calls == 1
+    assert len(mirror.books["AUSDT"].buffer) <= 3
+    mirror._retry_at["AUSDT"] = 0.0
+    assert mirror.apply_diff(diff(6, 6)) is True
+
+
+def test_scheduled_resync_is_tracked_and_cancelled_on_stop():
+    class SlowClient:
+        calls = 0
+
+        async def get_order_book(self, symbol, limit=100):
+            SlowClient.calls += 1
+            await asyncio.Event().wait()
+
+    async def run():
+        mirror = OrderBookMirror(SlowClient())
+        mirror.reset(["AUSDT"])
+        mirror.schedule_resync("AUSDT")
+        mirror.schedule_resync("AUSDT")  # ikinci gorev baslamaz
+        await asyncio.sleep(0)
+        task = mirror._tasks["AUSDT"]
+        mirror.stop()
+        await asyncio.sleep(0)
+        return task, mirror._tasks
+
+    task, tasks = asyncio.run(run())
+    assert SlowClient.calls == 1
+    assert task.cancelled()
+    assert tasks == {}
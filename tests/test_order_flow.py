@@ -0,0 +1,45 @@
+import pytest
+
+from bot.order_flow import OrderFlowStore
+
+
+def test_not_warm_returns_none():
+    store = OrderFlowStore(ring_size=3)
+    assert store.volumes("AUSDT", 1, now=1000.0) is None
+    store.mark_connected(["AUSDT"], now=1000.0)
+    store.add_trade("AUSDT", 10.0, 1.0, False, now=1000.5)
+    assert store.volumes("AUSDT", 1, now=1030.0) is None
+    assert store.recent("AUSDT") is None
+
+
+def test_rolling_windows_drop_old_buckets():
+    store = OrderFlowStore()
+    store.mark_connected(["AUSDT"], now=0.0)
+    store.add_trade("AUSDT", 10.0, 1.0, False, now=1000.0)  # 10 alis
+    store.add_trade("AUSDT", 10.0, 2.0, True, now=1200.0)  # 20 satis
+    store.add_trade("AUSDT", 10.0, 3.0, False, now=1290.0)  # 30 alis
+    assert store.volumes("AUSDT", 1, now=1299.0) == pytest.approx((30.0, 0.0))
+    assert store.volumes("AUSDT", 5, now=1299.0) == pytest.approx((40.0, 20.0))
+    assert store.volumes("AUSDT", 15, now=1299.0) == pytest.approx((40.0, 20.0))
+    assert store.volumes("AUSDT", 5, now=1499.0) == pytest.approx((30.0, 20.0))
+    assert store.volumes("AUSDT", 5, now=1501.0) == pytest.approx((30.0, 0.0))
+    assert store.volumes("AUSDT", 1, now=1400.0) == pytest.approx((0.0, 0.0))
+    assert store.volumes("AUSDT", 15, now=3000.0) == pytest.approx((0.0, 0.0))
+
+
+def test_ring_keeps_last_n_trades():
+    store = OrderFlowStore(ring_size=3)
+    store.mark_connected(["AUSDT"], now=0.0)
+    for qty, maker in [(5.0, True), (1.0, False), (2.0, False), (3.0, True)]:
+        store.add_trade("AUSDT", 1.0, qty, maker, now=10.0)
+    assert store.recent("AUSDT") == pytest.approx((3.0, 3.0))
+    store.mark_connected(["AUSDT"], now=20.0)
+    assert store.recent("AUSDT") is None
+
+
+def test_untracked_symbol_ignored():
+    store = OrderFlowStore()
+    store.add_trade("BUSDT", 1.0, 1.0, False, now=1.0)
+    store.mark_connected(["AUSDT"], now=0.0)
+    store.forget([])
+    assert store.flows == {}
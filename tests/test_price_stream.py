@@ -0,0 +1,310 @@
+import asyncio
+import time
+
+import bot.price_stream as price_stream
+from bot.price_stream import ShardedPriceStream
+
+
+def make_stream(max_streams, started):
+    async def listener(symbols, status):
+        started.append(list(symbols))
+        status.connected = True
+        status.last_message = time.monotonic()
+        await asyncio.Event().wait()
+
+    return ShardedPriceStream(listener, max_streams=max_streams)
+
+
+def test_symbols_split_by_limit():
+    started = []
+
+    async def run():
+        stream = make_stream(2, started)
+        await stream.update(["A", "B", "C", "D", "E"])
+        await asyncio.sleep(0)
+        sizes = sorted(len(s.symbols) for s in stream.shards)
+        health = stream.health()
+        await stream.stop()
+        return sizes, health
+
+    sizes, health = asyncio.run(run())
+    assert sizes == [1, 2, 2]
+    assert len(started) == 3
+    assert all(h["connected"] for h in health)
+
+
+def test_new_symbol_only_restarts_one_shard():
+    started = []
+
+    async def run():
+        stream = make_stream(2, started)
+        await stream.update(["A", "B", "C"])
+        await asyncio.sleep(0)
+        started.clear()
+        await stream.update(["A", "B", "C", "D"])
+        await asyncio.sleep(0)
+        await stream.stop()
+
+    asyncio.run(run())
+    assert started == [["C", "D"]]
+
+
+def test_removed_symbols_consolidate_shards():
+    started = []
+
+    async def run():
+        stream = make_stream(2, started)
+        await stream.update(["A", "B", "C", "D"])
+        await asyncio.sleep(0)
+        await stream.update(["A", "C"])
+        await asyncio.sleep(0)
+        result = [sorted(s.symbols) for s in stream.shards]
+        await stream.stop()
+        return result
+
+    shards = asyncio.run(run())
+    assert shards == [["A", "C"]]
+
+
+def test_failed_shard_reports_error():
+    async def listener(symbols, status):
+        raise RuntimeError("baglanti koptu")
+
+    async def run():
+        stream = ShardedPriceStream(listener, max_streams=5)
+        await stream.update(["A"])
+        await asyncio.sleep(0)
+        health = stream.health()
+        await stream.stop()
+        return health
+
+    health = asyncio.run(run())
+    assert health[0]["last_error"] == "baglanti koptu"
+    assert health[0]["connected"] is False
+
+
+def test_feed_stream_names():
+    assert price_stream.stream_names(["BTCUSDT"], "miniTicker") == ["btcusdt@miniTicker"]
+    assert price_stream.stream_names(["BTCUSDT"], "bookTicker") == ["btcusdt@bookTicker"]
+    assert price_stream.stream_names(["A", "B"], "allMiniTicker") == ["!miniTicker@arr"]
+    assert price_stream.resolve_feed("MINITICKER") == "miniTicker"
+    assert price_stream.resolve_feed("nope") == "ticker"
+
+
+def test_extract_price_by_feed():
+    assert price_stream.extract_price({"s": "A", "c": "1.5"}, "miniTicker") == 1.5
+    assert price_stream.extract_price({"s": "A", "b": "2.5", "a": "2.6"}, "bookTicker") == 2.5
+    assert price_stream.extract_price({"s": "A"}, "ticker") is None
+
+
+def test_all_market_feed_keeps_single_connection():
+    started = []
+
+    async def listener(symbols, status):
+        started.append(list(symbols))
+        await asyncio.Event().wait()
+
+    async def run():
+        stream = ShardedPriceStream(listener, max_streams=1, feed="allMiniTicker")
+        await stream.update(["A", "B"])
+        await asyncio.sleep(0)
+        await stream.update(["A", "B", "C"])
+        await asyncio.sleep(0)
+        result = (len(stream.shards), stream.symbols())
+        await stream.stop()
+        return result
+
+    count, symbols = asyncio.run(run())
+    assert count == 1
+    assert symbols == {"A", "B", "C"}
+    assert len(started) == 1
+
+
+def test_listen_price_socket_filters_all_market(monkeypatch):
+    import bot.sell_bot as bot_module
+
+    monkeypatch.setattr(bot_module, "PRICE_FEED", "allMiniTicker")
+
+    class FakeStream:
+        def __init__(self):
+            self.messages = [
+                [{"s": "AUSDT", "c": "2"}, {"s": "ZZZUSDT", "c": "9"}],
+            ]
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def recv(self):
+            if self.messages:
+                return self.messages.pop(0)
+            await asyncio.sleep(0.01)
+            raise asyncio.CancelledError()
+
+    class FakeBsm:
+        def __init__(self):
+            self.paths = []
+
+        def _get_socket(self, path):
+            self.paths.append(path)
+            return FakeStream()
+
+    class Dummy:
+        pass
+
+    watcher = bot_module.SellBot(Dummy())
+    watcher.positions["AUSDT"] = bot_module.Position(bot_module.FifoTracker(), 0.0, 0.0)
+    checked = []
+
+    async def fake_check(self, symbol, position, price=None):
+        checked.append((symbol, price))
+
+    monkeypatch.setattr(bot_module.SellBot, "_check_symbol", fake_check)
+    bsm = FakeBsm()
+    try:
+        asyncio.run(watcher.listen_price_socket(bsm))
+    except asyncio.CancelledError:
+        pass
+    assert bsm.paths == ["!miniTicker@arr"]
+    assert checked == [("AUSDT", 2.0)]
+
+
+def test_failed_shard_reconnects(monkeypatch):
+    monkeypatch.setattr(price_stream, "backoff_delay", lambda attempt, maximum=60.0: 0)
+    attempts = []
+
+    async def listener(symbols, status):
+        attempts.append(list(symbols))
+        if len(attempts) < 3:
+            raise RuntimeError("baglanti koptu")
+        status.connected = True
+        await asyncio.Event().wait()
+
+    async def run():
+        stream = ShardedPriceStream(listener, max_streams=5)
+        await stream.update(["A"])
+        for _ in range(10):
+            await asyncio.sleep(0)
+        health = stream.health()
+        await stream.stop()
+        return health
+
+    health = asyncio.run(run())
+    assert len(attempts) == 3
+    assert health[0]["connected"] is True
+    assert health[0]["restarts"] == 2
+
+
+def test_check_stale_restarts_silent_shard():
+    started = []
+
+    async def run():
+        stream = make_stream(5, started)
+        await stream.update(["A"])
+        await asyncio.sleep(0)
+        fresh = await stream.check_stale(stale_after=60)
+        stream.shards[0].status.last_message -= 120
+        stale = await stream.check_stale(stale_after=60)
+        await asyncio.sleep(0)
+        await stream.stop()
+        return fresh, stale
+
+    fresh, stale = asyncio.run(run())
+    assert fresh == 0
+    assert stale == 1
+    assert started == [["A"], ["A"]]
+
+
+def test_concurrent_updates_leave_one_listener_per_shard():
+    live = []
+
+    async def listener(symbols, status):
+        live.append(symbols)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await asyncio.sleep(0)
+            live.remove(symbols)
+
+    async def run():
+        stream = ShardedPriceStream(listener, max_streams=5)
+        await stream.update(["A"])
+        await asyncio.sleep(0)
+        await asyncio.gather(stream.update(["A", "B"]), stream.update(["A", "B", "C"]))
+        await asyncio.sleep(0)
+        during = len(live)
+        await stream.update([])
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return during, len(stream.shards), len(live)
+
+    during, shards, after = asyncio.run(run())
+    assert during == 1
+    assert shards == 0 and after == 0
+
+
+def test_agg_trades_bucketed_by_trade_time(monkeypatch):
+    import bot.sell_bot as bot_module
+
+    monkeypatch.setattr(bot_module, "PRICE_FEED", "ticker")
+    monkeypatch.setattr(bot_module, "ORDER_FLOW_ENABLED", True)
+    monkeypatch.setattr(bot_module, "ORDER_BOOK_ENABLED", False)
+    trade_ms = int((time.time() - 120) * 1000)
+
+    class FakeStream:
+        def __init__(self):
+            # Gecikmeyle ulasan islem: iki dakika onceki T alanina gore sayilmali
+            self.messages = [
+                {"e": "aggTrade", "s": "AUSDT", "p": "2", "q": "5", "T": trade_ms, "m": False},
+            ]
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def recv(self):
+            if self.messages:
+                return self.messages.pop(0)
+            raise asyncio.CancelledError()
+
+    class FakeBsm:
+        def _get_socket(self, path):
+            return FakeStream()
+
+    class Dummy:
+        pass
+
+    watcher = bot_module.SellBot(Dummy())
+    watcher.positions["AUSDT"] = bot_module.Position(bot_module.FifoTracker(), 0.0, 0.0)
+    try:
+        asyncio.run(watcher.listen_price_socket(FakeBsm()))
+    except asyncio.CancelledError:
+        pass
+    flow = watcher.order_flow.flows["AUSDT"]
+    now = time.time()
+    assert flow.volumes(60, now) == (0.0, 0.0)
+    assert flow.volumes(300, now) == (10.0, 0.0)
+
+
+def test_shard_task_does_not_inherit_caller_priority():
+    from bot import rate_limiter
+
+    seen = []
+
+    async def listener(symbols, status):
+        seen.append(rate_limiter.request_priority.get())
+        await asyncio.Event().wait()
+
+    async def run():
+        stream = ShardedPriceStream(listener, max_streams=5)
+        with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+            await stream.update(["A"])
+        await asyncio.sleep(0)
+        await stream.stop()
+
+    asyncio.run(run())
+    assert seen == [None]
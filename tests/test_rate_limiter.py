@@ -1,34 +1,361 @@
 import asyncio
 import time
+
+import pytest
+
 from bot.rate_limiter import RequestLimiter
 
 
-def test_limiter_waits():
-    limiter = RequestLimiter(limit=2, interval=0.5)
+def _fake_clock(monkeypatch, start=1000.0):
+    """time.monotonic/time.time ve asyncio.sleep için sanal saat.
+
+    Uyuyan görevlerden en erken uyanacak olan, diğer görevler birkaç tur
+    ilerleyip boşa çıktıktan sonra saati kendi zamanına ilerletir; böylece
+    testler gerçek bekleme ve CI yüküne bağlı kalmadan kesin zamanları ölçer.
+    """
+    from bot import rate_limiter
+
+    clock = [start]
+    sleepers = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(secs):
+        if secs <= 0:
+            await real_sleep(0)
+            return
+        deadline = clock[0] + secs
+        sleepers.append(deadline)
+        try:
+            idle = 0
+            while clock[0] < deadline:
+                await real_sleep(0)
+                idle = idle + 1 if deadline == min(sleepers) else 0
+                if idle >= 5:
+                    clock[0] = deadline
+        finally:
+            sleepers.remove(deadline)
+
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return clock
+
+
+def test_limiter_waits(monkeypatch):
+    clock = _fake_clock(monkeypatch)
+    limiter = RequestLimiter(limit=2, interval=0.5, shares={})
 
-    start = time.monotonic()
     asyncio.run(limiter.acquire())
     asyncio.run(limiter.acquire())
     asyncio.run(limiter.acquire())  # üçüncü çağrı sınırı aşar
-    elapsed = time.monotonic() - start
-    assert elapsed >= 0.5
+    assert clock[0] - 1000.0 == pytest.approx(0.5)
 
 
 def test_limiter_ban(monkeypatch):
+    clock = _fake_clock(monkeypatch)
     limiter = RequestLimiter(limit=2, interval=0.5)
+
+    limiter.ban_until = clock[0] + 0.2
+    asyncio.run(limiter.acquire())
+    assert clock[0] - 1000.0 == pytest.approx(0.2)
+    assert limiter.used == 1
+
+
+def test_update_used():
+    limiter = RequestLimiter()
+    asyncio.run(limiter.update_used(5))
+    assert limiter.used == 5
+
+
+def test_endpoint_weights():
+    from bot.rate_limiter import endpoint_weight
+
+    base = "https://api.binance.com/api/"
+    assert endpoint_weight("get", base + "v3/account", {}) == 20
+    assert endpoint_weight("get", base + "v3/myTrades", {"symbol": "A"}) == 20
+    assert endpoint_weight("get", base + "v3/exchangeInfo") == 20
+    assert endpoint_weight("get", base + "v3/ticker/24hr", {}) == 80
+    assert endpoint_weight("get", base + "v3/ticker/24hr", {"symbol": "A"}) == 2
+    assert endpoint_weight("get", base + "v3/ticker/24hr", {"symbols": '["A"' + ',"B"' * 30 + "]"}) == 40
+    assert endpoint_weight("get", base + "v3/depth", {"symbol": "A", "limit": 500}) == 25
+    assert endpoint_weight("get", base + "v3/order", {}) == 4
+    assert endpoint_weight("post", base + "v3/order", {}) == 1
+    assert endpoint_weight("get", base + "v3/unknown", {}) == 1
+    assert endpoint_weight("post", "https://api.binance.com/sapi/v1/x", {}) == 1
+
+
+def test_header_only_raises_reserved_weight():
+    limiter = RequestLimiter()
+    asyncio.run(limiter.acquire(20))
+    asyncio.run(limiter.update_used(3))
+    assert limiter.used == 20
+    asyncio.run(limiter.update_used(50))
+    assert limiter.used == 50
+
+
+def test_background_deferred_while_orders_pass(monkeypatch):
+    from bot.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_ORDER, priority
+
+    clock = _fake_clock(monkeypatch)
+    limiter = RequestLimiter(limit=10, interval=0.3)
+    limiter.shares[PRIORITY_BACKGROUND] = 0.5
+    done = []
+
+    async def background():
+        with priority(PRIORITY_BACKGROUND):
+            await limiter.acquire(5)
+            await limiter.acquire(1)
+        done.append(("background", clock[0] - 1000.0))
+
+    async def order():
+        await asyncio.sleep(0.05)
+        await limiter.acquire(4, PRIORITY_ORDER)
+        done.append(("order", clock[0] - 1000.0))
+
+    async def run():
+        await asyncio.gather(background(), order())
+
+    asyncio.run(run())
+    assert done == [("order", pytest.approx(0.05)), ("background", pytest.approx(0.3))]
+    assert limiter.deferred[PRIORITY_BACKGROUND] == 1
+
+
+def test_waiters_released_in_order_as_window_slides(monkeypatch):
+    clock = _fake_clock(monkeypatch)
+    limiter = RequestLimiter(limit=3, interval=0.3, shares={})
+    done = []
+
+    async def request(name, delay):
+        await asyncio.sleep(delay)
+        await limiter.acquire(1)
+        done.append((name, clock[0] - 1000.0))
+
+    async def run():
+        # ilk üç istek farklı anlarda yer ayırır; sonrakiler sırayla düşen kayıtları bekler
+        await asyncio.gather(
+            request("a", 0), request("b", 0.1), request("c", 0.15),
+            request("d", 0.2), request("e", 0.21),
+        )
+
+    asyncio.run(run())
+    names = [name for name, _ in done]
+    assert names == ["a", "b", "c", "d", "e"]
+    times = dict(done)
+    # "d" ilk kaydın düştüğü anda, "e" ikincisinin düştüğü anda geçer
+    assert times["d"] == pytest.approx(0.3)
+    assert times["e"] == pytest.approx(0.4)
+    assert limiter.used == 3
+
+
+def test_concurrent_requests_pass_near_cap(monkeypatch):
+    clock = _fake_clock(monkeypatch)
+    limiter = RequestLimiter(limit=10, interval=1, shares={})
+    asyncio.run(limiter.update_used(7))
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire(1) for _ in range(3)))
+
+    asyncio.run(run())
+    assert clock[0] == 1000.0
+    assert limiter.used == 10
+    assert limiter.deferred == {p: 0 for p in limiter.deferred}
+
+
+def test_shared_window_between_processes(tmp_path, monkeypatch):
+    from bot.rate_limiter import SharedWindow
+
+    clock = _fake_clock(monkeypatch)
+    path = str(tmp_path / "weight.json")
+    first = RequestLimiter(limit=10, interval=0.3, shares={}, shared=SharedWindow(path, 0.3))
+    second = RequestLimiter(limit=10, interval=0.3, shares={}, shared=SharedWindow(path, 0.3))
+
+    asyncio.run(first.acquire(8))
+    clock[0] += 0.1
+    asyncio.run(second.acquire(2))
+    assert second.used == 10
+    asyncio.run(second.acquire(1))  # ortak bütçe dolu, ilk kayıt düşene kadar bekler
+    assert clock[0] - 1000.0 == pytest.approx(0.3)
+    assert second.used == 3
+
+    asyncio.run(first.update_used(9))
+    assert first.used >= 9
+
+
+def test_shared_ban_applies_to_other_process(tmp_path, monkeypatch):
+    from bot.rate_limiter import SharedWindow
+
+    clock = _fake_clock(monkeypatch)
+    path = str(tmp_path / "weight.json")
+    first = RequestLimiter(limit=10, interval=1, shared=SharedWindow(path, 1))
+    second = RequestLimiter(limit=10, interval=1, shared=SharedWindow(path, 1))
+
+    asyncio.run(first.set_ban_until(clock[0] + 0.2))
+    asyncio.run(second.acquire(1))
+    assert clock[0] - 1000.0 == pytest.approx(0.2)
+
+
+def test_order_limiter_paces_burst(monkeypatch):
+    from bot import rate_limiter
+
+    clock = [1000.0]
     waits = []
 
     async def fake_sleep(secs):
         waits.append(secs)
+        clock[0] += secs
 
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
     monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    orders = rate_limiter.OrderRateLimiter({10: 3, 86400: 100})
 
-    limiter.ban_until = time.monotonic() + 0.2
-    asyncio.run(limiter.acquire())
-    assert waits and waits[0] >= 0.19
+    async def burst():
+        for _ in range(4):
+            await orders.acquire()
 
+    clock[0] = 1002.0
+    asyncio.run(burst())
+    assert waits == [8.0]
+    assert orders.waits == 1
+    assert orders.counts[10] == (1010.0, 1)
+    assert orders.counts[86400][1] == 4
 
-def test_update_used():
-    limiter = RequestLimiter()
-    asyncio.run(limiter.update_used(5))
-    assert limiter.used == 5
+
+def test_order_limiter_follows_headers(monkeypatch):
+    from bot import rate_limiter
+
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 1003.0)
+    orders = rate_limiter.OrderRateLimiter({10: 5, 86400: 100})
+    orders.update({"X-MBX-ORDER-COUNT-10S": "5", "X-MBX-ORDER-COUNT-1D": "40"})
+    assert orders._wait(1003.0) == 7.0
+    assert orders.counts[86400][1] == 40
+    orders.update({"X-MBX-ORDER-COUNT-10S": "1"})
+    assert orders.counts[10] == (1000.0, 5)
+
+
+def test_adaptive_concurrency_aimd():
+    from bot.rate_limiter import AdaptiveConcurrency
+
+    ctl = AdaptiveConcurrency(initial=4, maximum=6, target=0.6, backoff=0.85, cooldown=0)
+    for _ in range(20):
+        ctl.observe(1000, 6000)
+    assert ctl.allowed == 6
+    ctl.observe(4000, 6000)  # hedef ile eşik arasında sabit kalır
+    assert ctl.allowed == 6
+    ctl.observe(5500, 6000)
+    assert ctl.allowed == 3
+    ctl.backoff()
+    ctl.backoff()
+    ctl.backoff()
+    assert ctl.allowed == 1
+
+
+def test_adaptive_concurrency_limits_inflight():
+    from bot.rate_limiter import AdaptiveConcurrency
+
+    ctl = AdaptiveConcurrency(initial=2, maximum=4, cooldown=0)
+    peak = []
+
+    async def work():
+        async with ctl:
+            peak.append(ctl.inflight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+    assert ctl.inflight == 0
+
+
+def test_egress_routing_spreads_requests(monkeypatch):
+    from aiohttp import web
+    from binance import AsyncClient
+    from bot import rate_limiter
+    from bot.rate_limiter import Egress, EgressRouter
+
+    seen = []
+    weights = {}
+
+    async def ticker(request):
+        remote = request.remote
+        seen.append(remote)
+        weights[remote] = weights.get(remote, 0) + 2
+        return web.json_response(
+            {"symbol": "BTCUSDT", "price": "1"},
+            headers={"X-MBX-USED-WEIGHT-1M": str(weights[remote])},
+        )
+
+    router = EgressRouter([
+        Egress("a", local_addr="127.0.0.1", limiter=RequestLimiter(limit=100)),
+        Egress("b", local_addr="127.0.0.2", limiter=RequestLimiter(limit=100)),
+    ])
+    monkeypatch.setattr(rate_limiter, "router", router)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/api/v3/ticker/price", ticker)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = AsyncClient("key", "secret")
+        client.API_URL = f"http://127.0.0.1:{port}/api"
+        try:
+            for i in range(6):
+                await client.get_symbol_ticker(symbol=f"S{i}USDT")
+            headers = client.response.headers
+        finally:
+            await client.close_connection()
+            await runner.cleanup()
+        return headers
+
+    headers = asyncio.run(run())
+    assert seen.count("127.0.0.1") == 3
+    assert seen.count("127.0.0.2") == 3
+    assert router.stats() == {"a": 3, "b": 3}
+    assert router.egresses[1].limiter.used == 6
+    assert "X-MBX-USED-WEIGHT-1M" in headers
+
+
+def test_orders_use_primary_egress():
+    from bot.rate_limiter import PRIORITY_DECISION, PRIORITY_ORDER, Egress, EgressRouter
+
+    router = EgressRouter([Egress("a"), Egress("b")])
+    asyncio.run(router.egresses[0].limiter.update_used(50))
+    assert router.pick(PRIORITY_DECISION).name == "b"
+    assert router.pick(PRIORITY_ORDER).name == "a"
+    router.egresses[1].limiter.ban_until = time.monotonic() + 60
+    assert router.pick(PRIORITY_DECISION).name == "a"
+
+
+def test_shared_waiter_promoted_when_priority_rises():
+    from bot.rate_limiter import (
+        PRIORITY_BACKGROUND,
+        PRIORITY_DECISION,
+        PRIORITY_ORDER,
+        SharedPriority,
+        shared_priority,
+    )
+
+    limiter = RequestLimiter(limit=10, interval=60)
+    shared = SharedPriority(PRIORITY_BACKGROUND)
+
+    async def waiter():
+        with shared_priority(shared):
+            await limiter.acquire(1, shared.effective())
+
+    async def run():
+        await limiter.acquire(10, PRIORITY_ORDER)
+        task = asyncio.ensure_future(waiter())
+        await asyncio.sleep(0)
+        before = len(limiter._waiters[PRIORITY_BACKGROUND])
+        shared.raise_to(PRIORITY_DECISION)
+        after = (len(limiter._waiters[PRIORITY_BACKGROUND]), len(limiter._waiters[PRIORITY_DECISION]))
+        task.cancel()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert before == 1
+    assert after == (0, 1)
@@ -0,0 +1,117 @@
+import asyncio
+
+from bot import rate_limiter
+from bot.response_cache import ResponseCache
+
+BASE = "https://api.binance.com/api/"
+
+
+def test_concurrent_identical_requests_coalesce(monkeypatch):
+    monkeypatch.setattr("bot.response_cache.seconds_until_candle_close", lambda interval: 300.0)
+    cache = ResponseCache()
+    calls = []
+
+    async def send():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [[1, "1", "2"]]
+
+    async def run():
+        params = {"symbol": "BTCUSDT", "interval": "15m", "limit": 20}
+        return await asyncio.gather(
+            *(cache.fetch(BASE + "v3/klines", dict(params), send) for _ in range(3))
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results[0] is results[1] is results[2]
+    assert cache.stats()["coalesced"] == 2
+
+    # mum kapanana kadar onbellekten doner
+    asyncio.run(cache.fetch(BASE + "v3/klines", {"limit": 20, "interval": "15m", "symbol": "BTCUSDT"}, send))
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_ticker_ttl_and_errors_not_cached(monkeypatch):
+    cache = ResponseCache()
+    clock = [100.0]
+    monkeypatch.setattr("bot.response_cache.time.monotonic", lambda: clock[0])
+    calls = []
+
+    async def send():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("down")
+        return {"price": str(len(calls))}
+
+    async def get():
+        return await cache.fetch(BASE + "v3/ticker/price", {"symbol": "ETHUSDT"}, send)
+
+    try:
+        asyncio.run(get())
+    except RuntimeError:
+        pass
+    assert asyncio.run(get()) == {"price": "2"}
+    clock[0] += 0.5
+    assert asyncio.run(get()) == {"price": "2"}
+    clock[0] += 1
+    assert asyncio.run(get()) == {"price": "3"}
+    # kuralı olmayan uç noktalar sadece birleştirilir
+    asyncio.run(cache.fetch(BASE + "v3/depth", {"symbol": "ETHUSDT"}, send))
+    asyncio.run(cache.fetch(BASE + "v3/depth", {"symbol": "ETHUSDT"}, send))
+    assert len(calls) == 5
+
+
+def test_signed_requests_bypass_cache(monkeypatch):
+    calls = []
+
+    async def fake_send(self, method, uri, signed, force_params=False, **kwargs):
+        calls.append(uri.split("/api/", 1)[1])
+        return {}
+
+    monkeypatch.setattr(rate_limiter, "_send_request", fake_send)
+    monkeypatch.setattr(rate_limiter, "response_cache", ResponseCache())
+
+    async def run():
+        for _ in range(2):
+            await rate_limiter._limited_request(None, "get", BASE + "v3/exchangeInfo", False)
+            await rate_limiter._limited_request(None, "get", BASE + "v3/account", True)
+
+    asyncio.run(run())
+    assert calls.count("v3/exchangeInfo") == 1
+    assert calls.count("v3/account") == 2
+
+
+def test_shared_fetch_runs_at_highest_waiting_priority(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "response_cache", ResponseCache())
+    seen = []
+    gate = {}
+
+    async def fake_routed(self, method, uri, signed, force_params=False, **kwargs):
+        # Görev çağıranın request_priority bağlamını devralmaz
+        seen.append((rate_limiter.request_priority.get(), rate_limiter.current_priority()))
+        await gate["release"].wait()
+        seen.append((None, rate_limiter.current_priority()))
+        return {"price": "1"}
+
+    monkeypatch.setattr(rate_limiter, "_routed_request", fake_routed)
+    uri = BASE + "v3/ticker/price"
+
+    async def run():
+        gate["release"] = asyncio.Event()
+        with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+            first = asyncio.ensure_future(rate_limiter._limited_request(None, "get", uri, False, data={"symbol": "X"}))
+        await asyncio.sleep(0.01)
+        with rate_limiter.priority(rate_limiter.PRIORITY_DECISION):
+            second = asyncio.ensure_future(rate_limiter._limited_request(None, "get", uri, False, data={"symbol": "X"}))
+            await asyncio.sleep(0.01)
+        gate["release"].set()
+        return await asyncio.gather(first, second)
+
+    results = asyncio.run(run())
+    assert results[0] is results[1]
+    assert seen == [
+        (None, rate_limiter.PRIORITY_BACKGROUND),
+        (None, rate_limiter.PRIORITY_DECISION),
+    ]
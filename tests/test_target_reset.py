@@ -36,3 +36,66 @@ def test_targets_reset_peak(monkeypatch):
     decision = asyncio.run(watcher.should_sell("CAKEUSDT", 3.18, 3.0))
     assert decision is False
     assert watcher.positions["CAKEUSDT"].peak == 3.18
+
+
+def test_ladder_cached_until_inputs_change(monkeypatch):
+    calls = []
+
+    async def counting_vol(*_args, **_kwargs):
+        calls.append("vol")
+        return 0.1
+
+    monkeypatch.setattr(bot_module.SellBot, "get_last_open_price", fake_open)
+    monkeypatch.setattr(bot_module.SellBot, "get_volatility", counting_vol)
+    bot_module.FEE_BUY = bot_module.FEE_SELL = bot_module.MIN_PROFIT = 0.0
+    bot_module.TARGET_STEPS = 1
+    watcher = bot_module.SellBot(DummyClient())
+    watcher.btc_above_sma7 = True
+    events = []
+    watcher.ladder_listeners.append(lambda symbol, ladder: events.append(ladder.targets))
+    tracker = FifoTracker()
+    tracker.add_trade(1, 3.0)
+    pos = Position(tracker, 0.0, 0.0)
+    watcher.positions["CAKEUSDT"] = pos
+
+    asyncio.run(watcher.should_sell("CAKEUSDT", 3.18, 3.0))
+    first = pos.ladder
+    asyncio.run(watcher.should_sell("CAKEUSDT", 3.19, 3.0))
+    assert pos.ladder is first
+    assert calls == ["vol"]
+    assert len(events) == 1
+
+    watcher.btc_above_sma7 = False
+    asyncio.run(watcher.should_sell("CAKEUSDT", 3.19, 3.0))
+    assert pos.ladder is not first
+    assert pos.ladder.targets == [3.0]
+    assert len(events) == 2
+
+
+def test_failed_candle_fetch_is_not_cached(monkeypatch):
+    outcomes = [ConnectionError("devre acik"), 0.1, 0.2]
+
+    async def flaky_vol(*_args, **_kwargs):
+        result = outcomes.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(bot_module.SellBot, "get_last_open_price", fake_open)
+    monkeypatch.setattr(bot_module.SellBot, "get_volatility", flaky_vol)
+    watcher = bot_module.SellBot(DummyClient())
+
+    async def run():
+        return [await watcher.candle_inputs("CAKEUSDT") for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert first == (0.0, 3.25)
+    # hata saklanmadı; ikinci çağrı yeniden istedi ve sonucu mum sonuna kadar sakladı
+    assert second == third == (0.1, 3.25)
+    assert outcomes == [0.2]
+
+
+def test_float_noise_is_not_a_ladder_change():
+    assert bot_module._same_targets([3.0, 3.1], [3.0, 3.1 + 1e-15])
+    assert not bot_module._same_targets([3.0, 3.1], [3.0, 3.1001])
+    assert not bot_module._same_targets([3.0], [3.0, 3.1])
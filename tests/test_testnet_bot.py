@@ -23,12 +23,14 @@ def test_wait_on_api_error(monkeypatch):
             pass
 
     class FakeSell:
+        balances = None
+
         async def start(self):
             pass
         async def check_positions(self):
             raise Exception("oops")
 
-    monkeypatch.setattr(module, "BuyBot", lambda c: FakeBuy())
+    monkeypatch.setattr(module, "BuyBot", lambda c, **_kw: FakeBuy())
     monkeypatch.setattr(module, "SellBot", lambda c: FakeSell())
     monkeypatch.setattr(module, "start_listener", lambda *a, **k: None)
     monkeypatch.setattr(module, "send_telegram", lambda *a, **k: None)
@@ -0,0 +1,94 @@
+import asyncio
+import importlib
+
+import bot.sell_bot as bot_module
+from bot.triggers import TriggerBook, TriggerIndex
+
+
+def test_index_detects_crossing():
+    index = TriggerIndex([110.0, 120.0, 95.0], price=100.0)
+    assert not index.crossed(105.0)
+    assert index.crossed(111.0)
+    assert index.crossed(94.0)
+    assert index.crossed(110.0)
+
+
+def test_index_armed_zone_always_wakes():
+    index = TriggerIndex([110.0], price=115.0, armed_above=110.0)
+    assert index.crossed(115.5)
+
+
+def test_book_skips_until_peak_or_expiry():
+    book = TriggerBook()
+    assert book.should_evaluate("AUSDT", 100.0, peak=100.0)
+    book.publish("AUSDT", [110.0], price=100.0)
+    assert not book.should_evaluate("AUSDT", 101.0, peak=105.0)
+    assert book.should_evaluate("AUSDT", 106.0, peak=105.0)
+    book.publish("AUSDT", [110.0], price=100.0, ttl=0.0)
+    assert book.should_evaluate("AUSDT", 101.0, peak=105.0)
+    assert book.skipped == 1
+
+
+def test_websocket_tick_skips_should_sell(monkeypatch):
+    module = importlib.reload(bot_module)
+
+    class Client:
+        async def get_asset_balance(self, asset):
+            return {"free": "1", "locked": "0"}
+
+        async def get_symbol_ticker(self, symbol):
+            return {"price": "101"}
+
+    watcher = module.SellBot(Client())
+    tracker = module.FifoTracker()
+    tracker.add_trade(1, 100.0)
+    pos = module.Position(tracker, 0.0, 0.0)
+    pos.peak = 105.0
+    watcher.positions["AUSDT"] = pos
+    calls = []
+
+    async def fake_should_sell(self, symbol, last_price, avg_price):
+        calls.append(last_price)
+        return False
+
+    monkeypatch.setattr(module.SellBot, "should_sell", fake_should_sell)
+    watcher.triggers.publish("AUSDT", [110.0], price=101.0)
+    asyncio.run(watcher._check_symbol("AUSDT", pos, price=102.0))
+    assert calls == []
+    asyncio.run(watcher._check_symbol("AUSDT", pos, price=111.0))
+    assert calls == [111.0]
+    # REST yoklamasi esiklere bakmadan degerlendirir
+    watcher.triggers.publish("AUSDT", [200.0], price=101.0)
+    asyncio.run(watcher._check_symbol("AUSDT", pos))
+    assert calls == [111.0, 101.0]
+
+
+def test_should_sell_publishes_targets(monkeypatch):
+    module = importlib.reload(bot_module)
+
+    class Client:
+        async def get_recent_trades(self, symbol, limit=60):
+            return []
+
+    async def fake_none(*_args, **_kwargs):
+        return None
+
+    async def fake_vol(*_args, **_kwargs):
+        return 0.0
+
+    monkeypatch.setattr(module.SellBot, "get_keltner_upper", fake_none)
+    monkeypatch.setattr(module.SellBot, "get_last_open_price", fake_none)
+    monkeypatch.setattr(module.SellBot, "get_volatility", fake_vol)
+    module.FEE_BUY = module.FEE_SELL = 0.0
+    module.MIN_PROFIT = 0.01
+    module.STOP_LOSS_ENABLED = False
+    watcher = module.SellBot(Client())
+    tracker = module.FifoTracker()
+    tracker.add_trade(1, 100.0)
+    watcher.positions["AUSDT"] = module.Position(tracker, 0.0, 0.0)
+    assert asyncio.run(watcher.should_sell("AUSDT", 100.5, 100.0)) is False
+    index = watcher.triggers.get("AUSDT")
+    assert index is not None
+    assert abs(index.armed_above - 101.0) < 1e-9
+    assert not index.crossed(100.7)
+    assert index.crossed(101.0)
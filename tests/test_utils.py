@@ -1,5 +1,6 @@
 
 import os
+import random
 import sys
 from datetime import datetime, timezone
 
@@ -16,8 +17,14 @@ from bot.utils import (
     extract_min_qty,
     extract_max_qty,
     extract_min_notional,
+    SymbolFilters,
+    symbol_filters,
+    quantize_orders,
+    floor_to_step,
     seconds_until_next_midnight,
     seconds_until_next_six_hour,
+    interval_to_seconds,
+    seconds_until_candle_close,
 )
 
 
@@ -152,3 +159,76 @@ def test_load_env_warning(monkeypatch):
     utils.load_env()
     assert any('Uyarı' in r for r in records)
     assert 'loaded' in records
+
+
+def test_interval_to_seconds():
+    assert interval_to_seconds("1m") == 60
+    assert interval_to_seconds("15m") == 900
+    assert interval_to_seconds("4h") == 4 * 3600
+    assert interval_to_seconds("1d") == 86400
+
+
+def test_seconds_until_candle_close():
+    now = datetime(2024, 1, 1, 10, 7, 30, tzinfo=timezone.utc)
+    assert seconds_until_candle_close("1m", now) == 30
+    assert seconds_until_candle_close("15m", now) == 7 * 60 + 30
+    assert seconds_until_candle_close("1h", now) == 52 * 60 + 30
+    # 2024-01-01 pazartesidir; haftalik mum bir sonraki pazartesi kapanir
+    assert seconds_until_candle_close("1w", now) == 7 * 86400 - (10 * 3600 + 7 * 60 + 30)
+    assert seconds_until_candle_close("1M", now) == 31 * 86400 - (10 * 3600 + 7 * 60 + 30)
+
+
+def test_backoff_delay_grows_and_caps():
+    from bot.utils import backoff_delay
+
+    assert 0.5 <= backoff_delay(1) <= 1.0
+    assert 4.0 <= backoff_delay(4) <= 8.0
+    assert 30.0 <= backoff_delay(20, maximum=60.0) <= 60.0
+
+
+def test_symbol_filters_compiled_once():
+    info = {
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "0", "tickSize": "0.01000000"},
+            {"filterType": "LOT_SIZE", "minQty": "0.10000000", "maxQty": "9000.00000000", "stepSize": "0.10000000"},
+            {"filterType": "NOTIONAL", "minNotional": "5.00000000", "applyMinToMarket": True,
+             "maxNotional": "9000000.00000000", "applyMaxToMarket": False},
+        ]
+    }
+    filters = symbol_filters(info)
+    assert symbol_filters(info) is filters
+    assert (filters.step_units, filters.qty_scale) == (1, 1)
+    assert (filters.tick_units, filters.price_scale) == (1, 2)
+    assert filters.min_notional == 5 and filters.market_min_notional == 5
+    assert filters.market_max_notional == float("inf")
+    assert filters.max_price == float("inf")
+    # 0.3 / 0.1 kayan noktada 2.9999... olur; tam sayı ölçek bunu doğru yuvarlar
+    assert filters.floor_qty(0.3) == 0.3
+    assert filters.floor_qty(12.37) == 12.3
+    assert filters.floor_price(1.239) == 1.23
+    assert not hasattr(filters, "__dict__")
+
+
+def test_quantize_orders_batch():
+    lot = SymbolFilters(step_size="0.001", min_qty="0.001", max_qty="10", min_notional="5")
+    coarse = SymbolFilters(step_size="1", min_qty="1", min_notional="10")
+    batch = quantize_orders([lot, lot, coarse, lot], [0.123456, 50, 0.9, 0.01], [100, 100, 50, 0])
+    assert list(batch.qty) == [0.123, 10.0, 0.0, 0.01]
+    assert list(batch.ok) == [True, True, False, True]
+    small = quantize_orders([lot], [0.04], [100])
+    assert not small.ok[0]  # 4 USDT < minNotional
+
+
+def test_quantize_matches_decimal_on_fine_steps():
+    rng = random.Random(7)
+    for step in ("0.00000001", "0.000001", "0.0001"):
+        lot = SymbolFilters(step_size=step)
+        places = len(step.split(".")[1])
+        values = [0.29, 2.675, 16.3477218] + [
+            round(rng.uniform(0, 50000), rng.randint(0, places)) for _ in range(2000)
+        ]
+        expected = [floor_to_step(v, float(step)) for v in values]
+        assert [lot.floor_qty(v) for v in values] == expected
+        batch = quantize_orders([lot] * len(values), values, [0] * len(values))
+        assert list(batch.qty) == expected
+    assert SymbolFilters(step_size="0.00000001").floor_qty(0.29) == 0.29
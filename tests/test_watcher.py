@@ -593,6 +593,22 @@ def test_execute_sell_checks_balance():
     assert abs(client.sent_qty - 0.4) < 1e-8
 
 
+def test_execute_sell_accepts_order_without_fills():
+    class SellClient(DummyClient):
+        async def get_asset_balance(self, asset="BTC"):
+            return {"free": "0.4", "locked": "0"}
+
+        async def create_order(self, symbol, side, type, quantity):
+            # yeniden denenen emirde sorgu yanıtı döner, fills alanı yoktur
+            return {"status": "FILLED", "executedQty": "0.4", "cummulativeQuoteQty": "44"}
+
+    watcher = SellBot(SellClient())
+    asyncio.run(watcher.load_balances())
+    qty = watcher.positions["BTCUSDT"].tracker.total_qty()
+    asyncio.run(watcher.execute_sell("BTCUSDT", qty))
+    assert "BTCUSDT" not in watcher.positions
+
+
 def test_execute_sell_removes_when_zero():
     class ZeroClient(DummyClient):
         def __init__(self):
@@ -613,6 +629,74 @@ def test_execute_sell_removes_when_zero():
     assert not client.orders
 
 
+def test_execute_sell_drops_dust_below_min_notional():
+    class DustClient(DummyClient):
+        def __init__(self):
+            self.orders = []
+
+        async def get_asset_balance(self, asset="BTC"):
+            return {"free": "0.0004", "locked": "0"}
+
+        async def create_order(self, **kwargs):
+            self.orders.append(kwargs)
+
+    client = DustClient()
+    watcher = SellBot(client)
+    asyncio.run(watcher.load_balances())
+    watcher.positions["BTCUSDT"].last_price = 10000.0
+    asyncio.run(watcher.execute_sell("BTCUSDT", 0.0004))
+    # 4 USDT < minNotional: her tikte yeniden denenmesin diye takipten çıkar
+    assert "BTCUSDT" not in watcher.positions
+    assert not client.orders
+
+
+def test_sell_all_positions_prechecks_in_one_batch(monkeypatch):
+    class BulkClient(DummyClient):
+        def __init__(self):
+            self.orders = []
+
+        async def get_account(self):
+            return {
+                "balances": [
+                    {"asset": "BTC", "free": "0.5", "locked": "0"},
+                    {"asset": "ETH", "free": "0.001", "locked": "0"},
+                ]
+            }
+
+        async def get_symbol_ticker(self, symbol=None):
+            prices = {"BTCUSDT": "10000", "ETHUSDT": "1000"}
+            if symbol:
+                return {"symbol": symbol, "price": prices[symbol]}
+            return [{"symbol": s, "price": p} for s, p in prices.items()]
+
+        async def get_asset_balance(self, asset="BTC"):
+            return {"free": "0.5", "locked": "0"}
+
+        async def create_order(self, symbol, side, type, quantity):
+            self.orders.append((symbol, quantity))
+            return {"fills": [{"price": "10000"}]}
+
+    batches = []
+    original = bot_module.quantize_orders
+
+    def spy(filters, qtys, prices):
+        batches.append(list(qtys))
+        return original(filters, qtys, prices)
+
+    monkeypatch.setattr(bot_module, "quantize_orders", spy)
+    client = BulkClient()
+    watcher = SellBot(client)
+    for symbol in ("BTCUSDT", "ETHUSDT"):
+        tracker = FifoTracker()
+        tracker.add_trade(0.5, 100.0)
+        watcher.positions[symbol] = Position(tracker, 0.0001, 5.0)
+    asyncio.run(watcher.sell_all_positions())
+    # cüzdan bakiyeleriyle tek toplu denetim; ETH tozu emir gönderilmeden düşer
+    assert batches[0] == [0.5, 0.001]
+    assert client.orders == [("BTCUSDT", 0.5)]
+    assert watcher.positions == {}
+
+
 def test_execute_sell_records_timestamp(tmp_path, monkeypatch):
     class SellClient(DummyClient):
         async def get_asset_balance(self, asset="BTC"):
@@ -1174,3 +1258,193 @@ def test_should_sell_on_keltner_negative_with_stop(monkeypatch):
 
     decision = asyncio.run(watcher.should_sell("BTCUSDT", 101.0, 102.0))
     assert decision is True
+
+
+def test_backfill_applies_only_missed_fills(monkeypatch):
+    module = importlib.reload(bot_module)
+    requested = []
+
+    class TradeClient(DummyClient):
+        async def get_my_trades(self, symbol, limit=1000, fromId=None):
+            requested.append(fromId)
+            return [
+                {"id": 5, "qty": "1", "price": "10", "isBuyer": True},
+                {"id": 6, "qty": "0.5", "price": "12", "isBuyer": False},
+            ]
+
+    bot = module.SellBot(TradeClient())
+    tracker = module.FifoTracker()
+    tracker.add_trade(1.0, 8.0)
+    bot.positions["AAAUSDT"] = module.Position(tracker, 0.1, 0.0, last_trade_id=4)
+    asyncio.run(bot.backfill_fills())
+    pos = bot.positions["AAAUSDT"]
+    assert requested == [5]
+    assert pos.last_trade_id == 6
+    assert pos.tracker.total_qty() == pytest.approx(1.5)
+
+
+def test_user_socket_reconnects_and_backfills(monkeypatch):
+    module = importlib.reload(bot_module)
+    monkeypatch.setattr(module, "backoff_delay", lambda attempt, maximum=60.0: 0)
+
+    class FakeUserStream:
+        def __init__(self, messages):
+            self.messages = messages
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def recv(self):
+            if self.messages:
+                return self.messages.pop(0)
+            raise asyncio.CancelledError()
+
+    class FakeBsm:
+        def __init__(self):
+            self.streams = [
+                FakeUserStream([{"e": "error", "m": "koptu"}]),
+                FakeUserStream([]),
+            ]
+
+        def user_socket(self):
+            return self.streams.pop(0)
+
+    bot = module.SellBot(DummyClient())
+    backfilled = []
+
+    async def fake_backfill(self):
+        backfilled.append(True)
+
+    monkeypatch.setattr(module.SellBot, "backfill_fills", fake_backfill)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(bot.listen_user_socket(FakeBsm()))
+    assert backfilled == [True]
+
+
+def test_user_events_do_not_block_other_symbols(monkeypatch):
+    module = importlib.reload(bot_module)
+    bot = module.SellBot(DummyClient())
+    gate = asyncio.Event()
+    handled = []
+
+    async def slow_add(self, symbol, qty, price, *_args):
+        if symbol == "AAAUSDT":
+            await gate.wait()
+        handled.append(symbol)
+
+    monkeypatch.setattr(module.SellBot, "add_buy", slow_add)
+
+    def fill(symbol):
+        return {"e": "executionReport", "s": symbol, "X": "FILLED", "S": "BUY", "x": "TRADE", "z": "1", "L": "10"}
+
+    async def run():
+        bot.route_user_event(fill("AAAUSDT"))
+        bot.route_user_event(fill("BBBUSDT"))
+        bot.route_user_event({"e": "outboundAccountPosition", "u": 1, "B": [{"a": "USDT", "f": "7", "l": "0"}]})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        before = list(handled)
+        gate.set()
+        await bot.user_events.join()
+        await bot.user_events.stop()
+        return before
+
+    before = asyncio.run(run())
+    assert before == ["BBBUSDT"]
+    assert handled == ["BBBUSDT", "AAAUSDT"]
+    assert bot.balances.balances["USDT"] == (7.0, 0.0)
+
+
+def test_concurrent_checks_join_running_evaluation(monkeypatch):
+    module = importlib.reload(bot_module)
+    bot = module.SellBot(DummyClient())
+    pos = module.Position(module.FifoTracker(), 0.0, 0.0)
+    bot.positions["AAAUSDT"] = pos
+    calls = []
+
+    async def fake_evaluate(self, symbol, position, price=None):
+        calls.append(price)
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(module.SellBot, "_evaluate_symbol", fake_evaluate)
+
+    async def run():
+        await asyncio.gather(
+            bot._check_symbol("AAAUSDT", pos, price=1.0),
+            bot._check_symbol("AAAUSDT", pos),
+            bot._check_symbol("AAAUSDT", pos, price=2.0),
+            bot._check_symbol("AAAUSDT", pos, price=3.0),
+        )
+
+    asyncio.run(run())
+    assert calls == [1.0, 3.0]
+    assert bot.joined_evaluations == 3
+    assert bot.rerun_evaluations == 1
+
+
+def test_execute_sell_skips_while_order_pending(monkeypatch):
+    module = importlib.reload(bot_module)
+    bot = module.SellBot(DummyClient())
+    submitted = []
+
+    async def slow_submit(self, symbol, qty, notify=True):
+        submitted.append(symbol)
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(module.SellBot, "_submit_sell", slow_submit)
+
+    async def run():
+        await asyncio.gather(
+            bot.execute_sell("AAAUSDT", 1.0),
+            bot.execute_sell("AAAUSDT", 1.0),
+        )
+        await bot.execute_sell("AAAUSDT", 1.0)
+
+    asyncio.run(run())
+    assert submitted == ["AAAUSDT", "AAAUSDT"]
+    assert bot.duplicate_sells == 1
+
+
+def test_check_positions_polls_only_stale_symbols(monkeypatch):
+    module = importlib.reload(bot_module)
+    module.GROUP_SIZE = 10
+    watcher = module.SellBot(DummyClient())
+    pos = module.Position(module.FifoTracker(), 0.0, 0.0)
+    for sym in ("AUSDT", "BUSDT", "CUSDT"):
+        watcher.positions[sym] = pos
+    watcher.last_tick["AUSDT"] = time.monotonic()
+    watcher.last_tick["BUSDT"] = time.monotonic() - module.STALE_TICK_SECONDS - 5
+
+    called = []
+
+    async def fake_check(self, symbol, position, price=None):
+        called.append(symbol)
+
+    async def no_new_balances(self):
+        return None
+
+    monkeypatch.setattr(module.SellBot, "_check_symbol", fake_check)
+    # xx:55'te yeni bakiye taramasi DummyClient'in BTCUSDT'sini eklemesin
+    monkeypatch.setattr(module.SellBot, "check_new_balances", no_new_balances)
+    asyncio.run(watcher.check_positions())
+    assert called == ["BUSDT", "CUSDT"]
+    assert watcher.fallback_count == 2
+
+
+def test_recent_volumes_use_order_flow_store(monkeypatch):
+    module = importlib.reload(bot_module)
+
+    class NoRestClient(DummyClient):
+        async def get_aggregate_trades(self, **_kw):
+            raise AssertionError("REST cagrilmamali")
+
+    watcher = module.SellBot(NoRestClient())
+    now = time.time()
+    watcher.order_flow.mark_connected(["AUSDT"], now=now - 600)
+    watcher.order_flow.add_trade("AUSDT", 2.0, 5.0, True, now=now - 10)
+    watcher.order_flow.add_trade("AUSDT", 2.0, 1.0, False, now=now - 5)
+    buy, sell = asyncio.run(watcher.get_recent_volumes("AUSDT"))
+    assert (buy, sell) == pytest.approx((2.0, 10.0))
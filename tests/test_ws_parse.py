@@ -0,0 +1,77 @@
+import json
+
+from bot.ws_parse import PriceParser, Tick, Trade, benchmark, _sample_ticker
+
+
+def test_parse_ticker_array():
+    raw = json.dumps(
+        [_sample_ticker("AUSDT", 1.5), _sample_ticker("BUSDT", 2.25)], separators=(",", ":")
+    )
+    ticks = PriceParser("ticker").parse(raw)
+    assert ticks == [Tick("AUSDT", 1.5), Tick("BUSDT", 2.25)]
+
+
+def test_parse_book_ticker_uses_bid():
+    raw = '{"u":400900217,"s":"BNBUSDT","b":"25.35","B":"31.21","a":"25.36","A":"40.66"}'
+    assert PriceParser("bookTicker").parse(raw) == [Tick("BNBUSDT", 25.35)]
+
+
+def test_parse_mini_ticker_bytes():
+    raw = b'{"e":"24hrMiniTicker","E":1,"s":"ETHUSDT","c":"3000.1","o":"2900","h":"3100","l":"2800","v":"1","q":"1"}'
+    assert PriceParser("miniTicker").parse(raw) == [Tick("ETHUSDT", 3000.1)]
+
+
+def test_non_price_message_falls_back_to_json():
+    parser = PriceParser("ticker")
+    assert parser.parse('{"result":null,"id":1}') == [{"result": None, "id": 1}]
+    # Bosluklu JSON da tam ayristirma ile okunur
+    assert parser.parse('{"s": "AUSDT", "c": "2"}') == [Tick("AUSDT", 2.0)]
+
+
+def test_normalize_library_dicts():
+    parser = PriceParser("ticker")
+    items = parser.normalize({"s": "AUSDT", "c": "3"})
+    assert items == [Tick("AUSDT", 3.0)]
+    error = {"e": "error", "m": "koptu"}
+    assert parser.normalize([error]) == [error]
+
+
+def test_install_replaces_handler():
+    class Stream:
+        _is_binary = False
+
+        def _handle_message(self, evt):
+            return json.loads(evt)
+
+    stream = Stream()
+    assert PriceParser("ticker").install(stream)
+    assert stream._handle_message('{"s":"AUSDT","c":"1"}') == [Tick("AUSDT", 1.0)]
+
+
+def test_benchmark_reports_rates():
+    results = benchmark(symbols=5, seconds=0.01)
+    assert ("!ticker@arr", "hizli yol") in results
+    assert all(rate > 0 for rate in results.values())
+
+
+def test_agg_trade_fast_path():
+    parser = PriceParser("ticker")
+    raw = json.dumps(
+        {"e": "aggTrade", "E": 1, "s": "BNBUSDT", "a": 5, "p": "300.5", "q": "2", "f": 1,
+         "l": 2, "T": 3, "m": True, "M": True},
+        separators=(",", ":"),
+    )
+    trades = parser.parse(raw)
+    assert trades == [Trade("BNBUSDT", 300.5, 2.0, True, 0.003)]
+    assert parser.normalize({"e": "aggTrade", "s": "A", "p": "1", "q": "3", "m": False}) == [
+        Trade("A", 1.0, 3.0, False)
+    ]
+    assert parser.normalize({"e": "aggTrade", "s": "A", "p": "1", "q": "3", "T": 1500, "m": False}) == [
+        Trade("A", 1.0, 3.0, False, 1.5)
+    ]
+
+
+def test_depth_update_passes_through():
+    parser = PriceParser("bookTicker")
+    event = {"e": "depthUpdate", "E": 1, "s": "AUSDT", "U": 1, "u": 2, "b": [["1", "2"]], "a": []}
+    assert parser.parse(json.dumps(event, separators=(",", ":"))) == [event]